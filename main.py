@@ -4,13 +4,14 @@ CO3061 Nhập môn AI - Trường Đại học Bách Khoa TP.HCM
 """
 import pygame
 import sys
-import time
-import psutil
 import os
-from collections import deque
-import heapq
+import sqlite3
 from copy import deepcopy
 
+import sokoban_solver
+from sokoban_solver import HEURISTIC_METHODS, SEARCH_MODES, HeuristicEngine, LevelMap, SolutionCache, SolutionReplay
+from sokoban_solver.background import DONE, FAILED, PROGRESS, BackgroundSolver
+
 # Khởi tạo Pygame
 pygame.init()
 
@@ -19,6 +20,8 @@ WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
 TILE_SIZE = 48
 FPS = 60
+TEXT_CACHE_SIZE = 512  # số dòng chữ đã render được giữ lại
+ANYTIME_TIME_LIMIT = 10  # giây cho anytime A* (phím 3)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -38,14 +41,29 @@ class SokobanGame:
         
         # Load assets
         self.load_assets()
+        self.sprites = {'@': self.worker, '+': self.worker_docked, '$': self.box, '*': self.box_docked}
+        
+        # Rendering: nền tĩnh của level, các dòng của matrix đã vẽ, lớp phủ (tên -> (dòng, surface, rect)),
+        # cache chữ đã render và deadlock của trạng thái đang hiển thị
+        self.static_layer = None
+        self.rendered_rows = None
+        self.full_redraw = True
+        self.overlays = {}
+        self.text_cache = {}
+        self.current_deadlocks = []
         
         # Game state
         self.current_level = 0
-        self.levels = []
+        self.levels = []  # (LevelCollection, chỉ số trong file): level chỉ được đọc khi được chọn
         self.original_level = None
+        self.level_map = None  # Phần tĩnh của level hiện tại (tường, dock, ô chết)
         self.game_matrix = []
         self.player_pos = (0, 0)
         self.algorithm_running = False
+        # "move" (lời giải ít bước đi nhất như BFS/A* ban đầu) hoặc "push" (ít nước đẩy nhất), phím M để đổi
+        self.search_mode = "move"
+        self.heuristic_method = HEURISTIC_METHODS[0]  # "hungarian" hoặc "greedy"
+        self.macros = False  # Nước đẩy gộp qua đường hầm/vào phòng đích (chế độ "push")
         self.solution_path = []
         self.solution_index = 0
         
@@ -53,12 +71,30 @@ class SokobanGame:
         self.auto_playing = False
         self.auto_play_speed = 500  # milliseconds between moves
         self.last_move_time = 0
-        self.solution_matrix_history = []  # Lưu trữ lịch sử các state
+        self.solution_replay = None  # SolutionReplay: delta từng nước đi để tiến/lùi/nhảy bước
         
         # Statistics
         self.bfs_stats = {"time": 0, "memory": 0, "nodes": 0, "solution_length": 0}
         self.astar_stats = {"time": 0, "memory": 0, "nodes": 0, "solution_length": 0}
         
+        # Bộ nhớ đệm lời giải trên đĩa: giải lại level đã giải trả về ngay
+        try:
+            self.solution_cache = SolutionCache()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Solution cache disabled: {e}")
+            self.solution_cache = None
+        
+        # BFS/A* (phím 1, 2) chạy trong tiến trình nền, tiến độ được đọc mỗi frame (xem update_solver)
+        self.solver = None
+        self.solver_level = None
+        self.solver_progress = None
+        
+        # Anytime A* (phím 3) chạy trong tiến trình nền riêng, các lời giải (path, stats) được thêm dần
+        # vào anytime_solutions (xem update_anytime)
+        self.anytime_solver = None
+        self.anytime_solutions = []
+        self.anytime_level = None
+        
         # Load levels from files
         self.load_levels_from_file("MicroCosmos.txt")
         self.load_levels_from_file("MiniCosmos.txt")
@@ -125,21 +161,8 @@ class SokobanGame:
     def load_levels_from_file(self, filename):
         """Đọc levels từ file"""
         try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                content = file.read()
-                levels_text = content.split('Level ')
-                
-                for level_text in levels_text[1:]:  # Bỏ qua phần đầu trống
-                    lines = level_text.strip().split('\n')
-                    if len(lines) > 1:
-                        level_matrix = []
-                        for line in lines[1:]:  # Bỏ qua dòng số level
-                            if line.strip():  # Chỉ thêm dòng không rỗng
-                                level_matrix.append(list(line))
-                        
-                        if level_matrix:  # Chỉ thêm level không rỗng
-                            self.levels.append(level_matrix)
-                            
+            collection = sokoban_solver.LevelCollection(filename)
+            self.levels.extend((collection, index) for index in range(len(collection)))
         except FileNotFoundError:
             print(f"Không tìm thấy file: {filename}")
         except Exception as e:
@@ -149,10 +172,14 @@ class SokobanGame:
         """Load một level cụ thể"""
         if 0 <= level_index < len(self.levels):
             self.current_level = level_index
-            self.game_matrix = deepcopy(self.levels[level_index])
-            self.original_level = deepcopy(self.levels[level_index])
+            collection, index = self.levels[level_index]
+            self.original_level = collection[index]
+            self.game_matrix = deepcopy(self.original_level)
+            self.level_map = LevelMap(self.original_level)
+            self.build_static_layer()
             self.find_player_position()
             self.solution_path = []
+            self.solution_replay = None
             self.solution_index = 0
     
     def find_player_position(self):
@@ -163,119 +190,21 @@ class SokobanGame:
                     self.player_pos = (x, y)
                     return
     
-    def print_game(self, matrix):
-        """Hiển thị game theo matrix được truyền vào"""
-        self.screen.fill(GRAY)
-        x = 0
-        y = 0
-        
-        for row in matrix:
-            for char in row:
-                if char == ' ':  # floor
-                    self.screen.blit(self.floor, (x, y))
-                elif char == '#':  # wall
-                    self.screen.blit(self.wall, (x, y))
-                elif char == '@':  # worker on floor
-                    self.screen.blit(self.floor, (x, y))
-                    self.screen.blit(self.worker, (x, y))
-                elif char == '.':  # dock
-                    self.screen.blit(self.docker, (x, y))
-                elif char == '*':  # box on dock
-                    self.screen.blit(self.box_docked, (x, y))
-                elif char == '$':  # box
-                    self.screen.blit(self.floor, (x, y))
-                    self.screen.blit(self.box, (x, y))
-                elif char == '+':  # worker on dock
-                    self.screen.blit(self.docker, (x, y))
-                    self.screen.blit(self.worker_docked, (x, y))
-                x += TILE_SIZE
-            x = 0
-            y += TILE_SIZE
-    
     def is_level_completed(self, matrix):
         """Kiểm tra xem level đã hoàn thành chưa"""
-        for row in matrix:
-            for cell in row:
-                if cell == '$':  # Còn box chưa đặt vào dock
-                    return False
-        return True
+        return sokoban_solver.is_level_completed(matrix)
     
     def get_valid_moves(self, matrix, player_pos):
         """Lấy danh sách các nước đi hợp lệ từ vị trí hiện tại"""
-        moves = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # left, right, up, down
-        px, py = player_pos
-        
-        for dx, dy in directions:
-            new_x, new_y = px + dx, py + dy
-            
-            # Kiểm tra biên
-            if 0 <= new_y < len(matrix) and 0 <= new_x < len(matrix[new_y]):
-                target_cell = matrix[new_y][new_x]
-                
-                # Nếu ô đích là tường thì không thể di chuyển
-                if target_cell == '#':
-                    continue
-                
-                # Nếu ô đích là box
-                if target_cell in ['$', '*']:
-                    # Kiểm tra ô phía sau box
-                    box_new_x, box_new_y = new_x + dx, new_y + dy
-                    if (0 <= box_new_y < len(matrix) and 
-                        0 <= box_new_x < len(matrix[box_new_y])):
-                        behind_box = matrix[box_new_y][box_new_x]
-                        # Box chỉ có thể đẩy nếu ô phía sau trống hoặc là dock
-                        if behind_box in [' ', '.']:
-                            moves.append((dx, dy))
-                else:
-                    # Di chuyển bình thường (không có box)
-                    moves.append((dx, dy))
-        
-        return moves
+        return sokoban_solver.get_valid_moves(matrix, player_pos)
     
     def apply_move(self, matrix, player_pos, move):
         """Áp dụng một nước đi và trả về matrix mới cùng vị trí player mới"""
-        new_matrix = [row[:] for row in matrix]
-        px, py = player_pos
-        dx, dy = move
-        new_x, new_y = px + dx, py + dy
-        
-        target_cell = new_matrix[new_y][new_x]
-        
-        # Xử lý vị trí cũ của player
-        if new_matrix[py][px] == '@':
-            new_matrix[py][px] = ' '
-        elif new_matrix[py][px] == '+':
-            new_matrix[py][px] = '.'
-        
-        # Nếu đẩy box
-        if target_cell in ['$', '*']:
-            box_new_x, box_new_y = new_x + dx, new_y + dy
-            behind_box = new_matrix[box_new_y][box_new_x]
-            
-            # Di chuyển box
-            if behind_box == ' ':
-                new_matrix[box_new_y][box_new_x] = '$'
-            elif behind_box == '.':
-                new_matrix[box_new_y][box_new_x] = '*'
-            
-            # Đặt player vào vị trí box cũ
-            if target_cell == '$':
-                new_matrix[new_y][new_x] = '@'
-            elif target_cell == '*':
-                new_matrix[new_y][new_x] = '+'
-        else:
-            # Di chuyển bình thường
-            if target_cell == ' ':
-                new_matrix[new_y][new_x] = '@'
-            elif target_cell == '.':
-                new_matrix[new_y][new_x] = '+'
-        
-        return new_matrix, (new_x, new_y)
+        return sokoban_solver.apply_move(matrix, player_pos, move)
     
     def matrix_to_string(self, matrix):
         """Chuyển matrix thành string để hash"""
-        return ''.join(''.join(row) for row in matrix)
+        return sokoban_solver.matrix_to_string(matrix)
     
     # =======================
     # DEADLOCK DETECTION
@@ -286,9 +215,10 @@ class SokobanGame:
         Returns True nếu bị deadlock (không thể giải được)
         """
         boxes = self.get_boxes(matrix)
+        box_set = self.box_cells(matrix)
         
         for box_pos in boxes:
-            if self.is_box_deadlock(matrix, box_pos):
+            if self.is_box_deadlock(matrix, box_pos, box_set):
                 return True
         
         return False
@@ -302,6 +232,13 @@ class SokobanGame:
                     boxes.append((x, y))
         return boxes
     
+    def box_cells(self, matrix):
+        """Tập chỉ số ô (theo level_map) của tất cả các box, dựng một lần cho mỗi lần kiểm tra deadlock"""
+        if self.level_map is None:
+            return set()
+        level = self.level_map
+        return {level.index(x, y) for y, row in enumerate(matrix) for x, cell in enumerate(row) if cell in ('$', '*')}
+    
     def get_docks(self, matrix):
         """Lấy danh sách vị trí của tất cả các dock"""
         docks = []
@@ -311,18 +248,48 @@ class SokobanGame:
                     docks.append((x, y))
         return docks
     
-    def is_box_deadlock(self, matrix, box_pos):
-        """Kiểm tra một box cụ thể có bị deadlock không"""
+    def is_box_deadlock(self, matrix, box_pos, box_set=None):
+        """Kiểm tra một box cụ thể có bị deadlock không, box_set: kết quả box_cells(matrix) nếu đã có"""
         x, y = box_pos
         
         # 1. Corner Deadlock - Box bị kẹt ở góc
         if self.is_corner_deadlock(matrix, box_pos):
             return True
         
+        # 2. Dead Square - Box ở ô không thể đẩy tới dock nào (bảng tính sẵn khi load level)
+        if self.is_dead_square(box_pos):
+            return True
         
+        # 3. Freeze / 2x2 Block Deadlock - Box bị đóng băng cùng các box xung quanh
+        if self.get_box_deadlock_type(matrix, box_pos, box_set):
+            return True
         
         return False
     
+    def get_box_deadlock_type(self, matrix, box_pos, box_set=None):
+        """
+        Trả về "Freeze", "2x2 block" hoặc None cho box tại box_pos
+        box_set: kết quả box_cells(matrix), truyền vào khi kiểm tra nhiều box để không quét lại matrix
+        """
+        if self.level_map is None:
+            return None
+        level = self.level_map
+        if box_set is None:
+            box_set = self.box_cells(matrix)
+        box = level.index(*box_pos)
+        if level.deadlocks.is_block_deadlock(box_set, box):
+            return "2x2 block"
+        if level.deadlocks.is_freeze_deadlock(box_set, box):
+            return "Freeze"
+        return None
+    
+    def is_dead_square(self, box_pos):
+        """Tra bảng ô chết của level hiện tại"""
+        if self.level_map is None:
+            return False
+        x, y = box_pos
+        return bool(self.level_map.dead_squares[self.level_map.index(x, y)])
+    
     def is_corner_deadlock(self, matrix, box_pos):
         """
         Kiểm tra Corner Deadlock
@@ -356,14 +323,19 @@ class SokobanGame:
         """
         deadlocks = []
         boxes = self.get_boxes(matrix)
+        box_set = self.box_cells(matrix)
         
         for box_pos in boxes:
             x, y = box_pos
             
             if self.is_corner_deadlock(matrix, box_pos):
                 deadlocks.append(f"Corner deadlock at ({x}, {y})")
-            
-            
+            elif self.is_dead_square(box_pos):
+                deadlocks.append(f"Dead square at ({x}, {y})")
+            else:
+                deadlock_type = self.get_box_deadlock_type(matrix, box_pos, box_set)
+                if deadlock_type:
+                    deadlocks.append(f"{deadlock_type} deadlock at ({x}, {y})")
         
         return deadlocks
     
@@ -397,35 +369,29 @@ class SokobanGame:
         print(f"   • Solution length: {len(self.solution_path)}")
         print(f"   • Auto-playing: {self.auto_playing}")
         print(f"   • Speed: {self.auto_play_speed}ms per move")
-        print(f"   • History states: {len(self.solution_matrix_history)}")
+        if self.solution_replay is not None:
+            print(f"   • Replay keyframes: {len(self.solution_replay.keyframes)}")
         print("Auto-play will start in 1 second...")
     
     def generate_solution_history(self):
-        """Tạo lịch sử tất cả states trong solution"""
-        self.solution_matrix_history = []
-        current_matrix = deepcopy(self.original_level)
-        
-        # Tìm player position trong original level
-        current_player_pos = None
-        for y, row in enumerate(current_matrix):
-            for x, cell in enumerate(row):
-                if cell in ['@', '+']:  # @ = player on floor, + = player on dock
-                    current_player_pos = (x, y)
-                    break
-            if current_player_pos:
-                break
-        
-        if not current_player_pos:
-            print("Cannot find player position in original level!")
+        """Tạo bộ phát lại solution (delta từng nước đi) dùng chung ma trận với màn hình"""
+        try:
+            self.solution_replay = SolutionReplay(self.original_level, self.solution_path)
+        except ValueError as e:
+            print(f"Cannot replay solution: {e}")
+            self.solution_replay = None
             return
-        
-        # Lưu state ban đầu
-        self.solution_matrix_history.append((deepcopy(current_matrix), current_player_pos))
-        
-        # Apply từng move và lưu state
-        for move in self.solution_path:
-            current_matrix, current_player_pos = self.apply_move(current_matrix, current_player_pos, move)
-            self.solution_matrix_history.append((deepcopy(current_matrix), current_player_pos))
+        self.game_matrix = self.solution_replay.matrix
+        self.player_pos = self.solution_replay.player_pos
+    
+    def seek_solution(self, step):
+        """Nhảy tới trạng thái sau step nước đi của solution"""
+        if self.solution_replay is None:
+            return
+        self.solution_replay.seek(step)
+        self.solution_index = self.solution_replay.index
+        self.game_matrix = self.solution_replay.matrix
+        self.player_pos = self.solution_replay.player_pos
     
     def update_auto_play(self):
         """Update auto-play logic"""
@@ -460,8 +426,11 @@ class SokobanGame:
             print(f"   Current pos: {self.player_pos}")
             
             # Apply the move
-            self.game_matrix, self.player_pos = self.apply_move(self.game_matrix, self.player_pos, move)
-            self.solution_index += 1
+            if self.solution_replay is not None:
+                self.seek_solution(self.solution_index + 1)
+            else:
+                self.game_matrix, self.player_pos = self.apply_move(self.game_matrix, self.player_pos, move)
+                self.solution_index += 1
             
             print(f"   New pos: {self.player_pos}")
             
@@ -478,12 +447,10 @@ class SokobanGame:
     
     def step_solution_backward(self):
         """Lùi lại một bước trong solution"""
-        if self.solution_index > 0:
-            self.solution_index -= 1
-            # Restore state từ history
-            if self.solution_index < len(self.solution_matrix_history):
-                self.game_matrix, self.player_pos = deepcopy(self.solution_matrix_history[self.solution_index])
-                print(f"Step {self.solution_index}/{len(self.solution_path)} (backward)")
+        if self.solution_index > 0 and self.solution_replay is not None:
+            # Hoàn tác delta của nước đi vừa rồi
+            self.seek_solution(self.solution_index - 1)
+            print(f"Step {self.solution_index}/{len(self.solution_path)} (backward)")
     
     def toggle_auto_play(self):
         """Toggle auto-play on/off"""
@@ -509,322 +476,225 @@ class SokobanGame:
     # =======================
     # BFS ALGORITHM TEMPLATE
     # =======================
-    def solve_bfs(self):
+    def solve_bfs(self, mode=None, exact=False):
         """
-        Thuật toán BFS để tìm đường đi trong Sokoban
+        Thuật toán BFS để tìm đường đi trong Sokoban (chạy bằng sokoban_solver.solve_bfs, tra cache trước)
+        mode: "push" (mỗi node là một nước đẩy) hoặc "move" (mỗi node là một bước đi), mặc định self.search_mode
+        exact: so sánh đầy đủ trạng thái khi trùng khóa Zobrist
         """
-        # phần chuẩn bị thông số để đo thời gian và bộ nhớ 
-        print("Start Solver using BFS...")
-        start_time = time.time() # thời điểm bắt đầu
-        #lấy thông tin tiến trình hiện tại  
-        process = psutil.Process(os.getpid()) 
-        #chuyển đổi sang MB
-        start_memory = process.memory_info().rss / 1024 / 1024  # MB
-        
-        # TODO: Implement BFS logic here
-        # Hint: Sử dụng queue (deque) để lưu trữ các trạng thái giống hồi học DSA á =))))
-        # Cần track: current_matrix, player_position, path_to_reach_this_state
-
-        # Placeholder implementation
-        nodes_explored = 0
-        solution_found = False
-        solution_path = []
-
-        visited = set()
-        queue = deque()
-        player_pos = self.player_pos #lấy thông tin vị trí người chơi hiện tại
-        matrix = deepcopy(self.game_matrix) #bản đồ hiện tại
-        matrix_key = self.matrix_to_string(matrix) # biến ma trận thành chuỗi 
-        queue.append((matrix, player_pos, []))
-        visited.add((matrix_key, player_pos))
-
-        while queue:
-            nodes_explored += 1 # tăng bộ đếm
-            current_matrix, current_player_pos, path = queue.popleft() # lấy phần tử đầu tiên của queue
-            if self.is_level_completed(current_matrix): # nếu level đã hoàn thành thì break
-                solution_found = True
-                solution_path = path
-                break
-            #kiểm tra deadlock
-            deadlock = self.detect_all_deadlocks(current_matrix)
-            if not deadlock:                
-                # danh sách các hướng đi khả thi của player
-                valid_move = self.get_valid_moves(current_matrix, current_player_pos) 
-                #lặp qua từng hướng để thử mở rộng
-                for direction in valid_move:
-                    #Áp dụng bước đi
-                    new_current_matrix, new_current_player_pos = self.apply_move(current_matrix, current_player_pos, direction)
-                    new_matrix_key = self.matrix_to_string(new_current_matrix)
-                    # tránh lặp trạng thái đã visited nếu chưa có thì thêm vào visited
-                    if (new_matrix_key, new_current_player_pos) not in visited:
-                        visited.add((new_matrix_key, new_current_player_pos))
-                        new_path = path + [direction]
-                        queue.append((new_current_matrix, new_current_player_pos, new_path))
-                    
-        # Tính toán thống kê
-        # ghi lại thời gian kết thúc và bộ nhớ chiếm dụng (MB)
-        end_time = time.time() 
-        end_memory = process.memory_info().rss / 1024 / 1024  # MB
+        mode = mode or self.search_mode
+        print(f"Start Solver using BFS ({mode} mode)...")
+        solution_path, self.bfs_stats = sokoban_solver.solve_cached(self.solution_cache, self.game_matrix, "bfs",
+                                                                    mode, exact, macros=self.macros)
         
-        self.bfs_stats = {
-            "time": end_time - start_time,
-            "memory": end_memory - start_memory,
-            "nodes": nodes_explored,
-            "solution_length": len(solution_path) if solution_found else 0
-        }
+        self.print_solver_result("BFS", solution_path, self.bfs_stats)
         
-        if solution_found:
-            print(f"Solution found!")
-            print(f"BFS completed in {self.bfs_stats['time']:.3f}s")
-            print(f"Nodes explored: {self.bfs_stats['nodes']}")
-            print(f"Memory used: {self.bfs_stats['memory']:.2f} MB")
-            print(f"Solution length: {self.bfs_stats['solution_length']}")
-        else:
-            print("No solution found!")
-            print(f"BFS completed in {self.bfs_stats['time']:.3f}s")
-            print(f"Nodes explored: {self.bfs_stats['nodes']}")
-            print(f"Memory used: {self.bfs_stats['memory']:.2f} MB")
-            print(f"Solution length: {self.bfs_stats['solution_length']}")
-
-
-        return solution_path if solution_found else None
+        return solution_path
     
     # =======================
     # A* ALGORITHM TEMPLATE
     # =======================
     def heuristic(self, matrix, player_pos):
         """
-        Hàm heuristic cho A* - Manhattan distance từ các box đến dock gần nhất
+        Hàm heuristic cho A* - số nước đẩy tối thiểu khi ghép cặp box/dock (xem HeuristicEngine)
         """
-        total_distance = 0
-        boxes = []
-        docks = []
-        
-        # Tìm tất cả boxes và docks
-        for y, row in enumerate(matrix):
-            for x, cell in enumerate(row):
-                if cell == '$':  # Box chưa đặt đúng chỗ
-                    boxes.append((x, y))
-                elif cell in ['.', '+', '*']:  # Dock hoặc có đối tượng trên dock
-                    docks.append((x, y))
-        
-        # Tính Manhattan distance từ mỗi box đến dock gần nhất
-        for box in boxes:
-            if docks:  # Nếu có dock
-                min_dist = float('inf')
-                for dock in docks:
-                    dist = abs(box[0] - dock[0]) + abs(box[1] - dock[1])
-                    min_dist = min(min_dist, dist)
-                total_distance += min_dist
-        
-        return total_distance
+        engine = HeuristicEngine(LevelMap(matrix), self.heuristic_method)
+        return engine.evaluate(engine.level.initial_state.boxes)
     
-    def solve_astar(self):
+    def solve_astar(self, mode=None, exact=False, heuristic_method=None):
         """
-        Thuật toán A* để tìm đường đi tối ưu trong Sokoban
+        Thuật toán A* để tìm đường đi tối ưu trong Sokoban (chạy bằng sokoban_solver.solve_astar, tra cache trước)
+        mode: "push" (tối ưu số nước đẩy) hoặc "move" (tối ưu số bước đi), mặc định self.search_mode
+        exact: so sánh đầy đủ trạng thái khi trùng khóa Zobrist
+        heuristic_method: "hungarian" hoặc "greedy", mặc định self.heuristic_method
         """
-        print("Start Solver using A*...")
-        start_time = time.time()
-        process = psutil.Process(os.getpid())
-        start_memory = process.memory_info().rss / (1024 * 1024)  # MB
-        
-        # Khởi tạo
-        initial_state = (self.matrix_to_string(self.game_matrix), self.player_pos)
-        visited = set()  # Set of visited vertices
-        open_list = []  # Priority queue (heap)
-        
-        # Dictionary để lưu trữ g_score (distance from start) và predecessor
-        g_scores = {initial_state: 0}
-        predecessors = {initial_state: None}
-        
-        # Tính f_score cho trạng thái đầu
-        h_score = self.heuristic(self.game_matrix, self.player_pos)
-        f_score = 0 + h_score
-        
-        # Push start node vào open_list với priority = f_score
-        heapq.heappush(open_list, (f_score, 0, self.game_matrix, self.player_pos, []))
-        
-        nodes_explored = 0
-        
-        while open_list:
-            # Pop node có f_score thấp nhất
-            current_f, current_g, current_matrix, current_player_pos, current_path = heapq.heappop(open_list)
-            current_state = (self.matrix_to_string(current_matrix), current_player_pos)
-            
-            # Kiểm tra nếu đã visited thì skip
-            if current_state in visited:
-                continue
-                
-            # Add vào visited
-            visited.add(current_state)
-            nodes_explored += 1
-            
-            # Kiểm tra goal state
-            if self.is_level_completed(current_matrix):
-                print(f"Solution found!")
-                
-                # Tính toán thống kê
-                end_time = time.time()
-                end_memory = process.memory_info().rss / (1024 * 1024)  # MB
-                
-                self.astar_stats = {
-                    "time": end_time - start_time,
-                    "memory": end_memory - start_memory,
-                    "nodes": nodes_explored,
-                    "solution_length": len(current_path)
-                }
-                
-                print(f"A* completed in {self.astar_stats['time']:.3f}s")
-                print(f"Nodes explored: {self.astar_stats['nodes']}")
-                print(f"Memory used: {self.astar_stats['memory']:.2f} MB")
-                print(f"Solution length: {self.astar_stats['solution_length']}")
-                
-                return current_path
-            
-            # Skip deadlock states để tối ưu (early pruning)
-            if self.is_deadlock(current_matrix):
-                continue
-            
-            # Expand các successor (neighbor states)
-            valid_moves = self.get_valid_moves(current_matrix, current_player_pos)
-            
-            for move in valid_moves:
-                # Apply move để tạo successor state
-                succ_matrix, succ_player_pos = self.apply_move(current_matrix, current_player_pos, move)
-                succ_state = (self.matrix_to_string(succ_matrix), succ_player_pos)
-                succ_path = current_path + [move]
-                
-                # Kiểm tra nếu successor đã visited thì skip
-                if succ_state in visited:
-                    continue
-                
-                # Kiểm tra deadlock cho successor state trước khi add vào queue
-                if self.is_deadlock(succ_matrix):
-                    continue  # Skip deadlock states
-                
-                # Tính g_score mới (distance from start)
-                new_g_score = current_g + 1  # cost = 1 cho mỗi move
-                
-                # Tính h_score (heuristic)
-                h_score = self.heuristic(succ_matrix, succ_player_pos)
-                
-                # Tính f_score = g + h
-                f_score = new_g_score + h_score
-                
-                # Kiểm tra nếu successor đã có trong g_scores và có đường tốt hơn
-                if succ_state in g_scores:
-                    if new_g_score < g_scores[succ_state]:
-                        # Update distance và predecessor
-                        g_scores[succ_state] = new_g_score
-                        predecessors[succ_state] = current_state
-                        
-                        # Add/update vào open_list
-                        heapq.heappush(open_list, (f_score, new_g_score, succ_matrix, succ_player_pos, succ_path))
-                else:
-                    # Successor chưa được explore
-                    g_scores[succ_state] = new_g_score
-                    predecessors[succ_state] = current_state
-                    
-                    # Add vào open_list
-                    heapq.heappush(open_list, (f_score, new_g_score, succ_matrix, succ_player_pos, succ_path))
-        
-        # Không tìm thấy solution
-        print("No solution found!")
+        heuristic_method = heuristic_method or self.heuristic_method
+        mode = mode or self.search_mode
+        print(f"Start Solver using A* ({mode} mode)...")
+        solution_path, self.astar_stats = sokoban_solver.solve_cached(self.solution_cache, self.game_matrix, "astar",
+                                                                      mode, exact, heuristic_method,
+                                                                      macros=self.macros)
         
-        # Tính toán thống kê
-        end_time = time.time()
-        end_memory = process.memory_info().rss / (1024 * 1024)  # MB
+        self.print_solver_result("A*", solution_path, self.astar_stats)
         
-        self.astar_stats = {
-            "time": end_time - start_time,
-            "memory": end_memory - start_memory,
-            "nodes": nodes_explored,
-            "solution_length": 0
-        }
-        
-        print(f"A* completed in {self.astar_stats['time']:.3f}s")
-        print(f"Nodes explored: {self.astar_stats['nodes']}")
-        print(f"Memory used: {self.astar_stats['memory']:.2f} MB")
-        print(f"Solution length: {self.astar_stats['solution_length']}")
-        
-        return None
+        return solution_path
     
-    def display_statistics(self):
-        """Hiển thị thống kê BFS và A* Algorithm"""
-        y_offset = 10
-        stats_surface = pygame.Surface((450, 350))
-        stats_surface.fill(WHITE)
-        stats_surface.set_alpha(230)
-        
-        # Tiêu đề
-        title = self.font.render("ALGORITHM COMPARISON", True, BLACK)
-        stats_surface.blit(title, (10, y_offset))
-        y_offset += 30
-        
-        # BFS Stats
-        bfs_title = self.font.render("BFS Algorithm:", True, (0, 150, 0))
-        stats_surface.blit(bfs_title, (10, y_offset))
-        y_offset += 25
-        
-        bfs_time = self.font.render(f"Time: {self.bfs_stats['time']:.3f}s", True, BLACK)
-        stats_surface.blit(bfs_time, (20, y_offset))
-        y_offset += 20
-        
-        bfs_memory = self.font.render(f"Memory: {self.bfs_stats['memory']:.2f}MB", True, BLACK)
-        stats_surface.blit(bfs_memory, (20, y_offset))
-        y_offset += 20
-        
-        bfs_nodes = self.font.render(f"Nodes: {self.bfs_stats['nodes']}", True, BLACK)
-        stats_surface.blit(bfs_nodes, (20, y_offset))
-        y_offset += 20
-        
-        bfs_length = self.font.render(f"Solution: {self.bfs_stats['solution_length']}", True, BLACK)
-        stats_surface.blit(bfs_length, (20, y_offset))
-        y_offset += 30
-        
-        # A* Stats
-        astar_title = self.font.render("A* Algorithm:", True, (220, 0, 0))
-        stats_surface.blit(astar_title, (10, y_offset))
-        y_offset += 25
-        
-        astar_time = self.font.render(f"Time: {self.astar_stats['time']:.3f}s", True, BLACK)
-        stats_surface.blit(astar_time, (20, y_offset))
-        y_offset += 20
+    def print_solver_result(self, name, solution_path, stats):
+        """In kết quả một lần giải BFS/A* ra console"""
+        if stats.get("cached"):
+            print("Loaded from solution cache")
+        if solution_path is not None:
+            print(f"Solution found!")
+        else:
+            print(f"No solution found! ({stats['status']})")
+        print(f"{name} completed in {stats['time']:.3f}s")
+        print(f"Nodes explored: {stats['nodes']}")
+        print(f"Memory used: {stats['memory']:.2f} MB (peak RSS {stats.get('peak_rss', 0):.1f} MB)")
+        print(self.structures_text(stats))
+        print(f"Solution length: {stats['solution_length']}")
 
-        astar_memory = self.font.render(f"Memory: {self.astar_stats['memory']:.2f}MB", True, BLACK)
-        stats_surface.blit(astar_memory, (20, y_offset))
-        y_offset += 20
-        
-        astar_nodes = self.font.render(f"Nodes: {self.astar_stats['nodes']}", True, BLACK)
-        stats_surface.blit(astar_nodes, (20, y_offset))
-        y_offset += 20
-        
-        astar_length = self.font.render(f"Solution: {self.astar_stats['solution_length']}", True, BLACK)
-        stats_surface.blit(astar_length, (20, y_offset))
-        y_offset += 25
+    def start_solver(self, algorithm):
+        """
+        Giải level hiện tại bằng "bfs" hoặc "astar" trong tiến trình nền (BackgroundSolver) để game vẫn chạy 60 FPS
+        Kết quả được nhận trong update_solver, phím C hủy
+        """
+        if self.solver is not None:
+            print(f"{self.solver.algorithm} solver is still running, press C to cancel it")
+            return
+        name = "BFS" if algorithm == "bfs" else "A*"
+        print(f"Start Solver using {name} ({self.search_mode} mode) in background, press C to cancel...")
+        cache_path = self.solution_cache.path if self.solution_cache is not None else None
+        self.solver = BackgroundSolver(self.game_matrix, algorithm, self.search_mode, False, self.heuristic_method,
+                                       cache_path=cache_path, macros=self.macros)
+        self.solver_level = self.current_level
+        self.solver_progress = None
+
+    def update_solver(self):
+        """Đọc tin nhắn của tiến trình giải (không chờ): cập nhật tiến độ, nhận kết quả và auto-play"""
+        if self.solver is None:
+            return
+        for message in self.solver.poll():
+            if message[0] == PROGRESS:
+                self.solver_progress = message[1]
+            elif message[0] == DONE:
+                _, solution_path, stats = message
+                if self.solver.algorithm == "bfs":
+                    self.bfs_stats = stats
+                    self.print_solver_result("BFS", solution_path, stats)
+                else:
+                    self.astar_stats = stats
+                    self.print_solver_result("A*", solution_path, stats)
+                if solution_path and self.solver_level == self.current_level:
+                    self.start_auto_play(solution_path)
+            elif message[0] == FAILED:
+                print(f"Solver failed: {message[1]}")
+        if not self.solver.running():
+            self.solver = None
+
+    def cancel_solver(self):
+        """Dừng ngay lần giải đang chạy ở nền (BFS/A* và anytime A*)"""
+        if self.anytime_solver is not None:
+            self.anytime_solver.cancel()
+            print("anytime solver cancelled")
+            self.anytime_solver = None
+        if self.solver is None:
+            return
+        self.solver.cancel()
+        print(f"{self.solver.algorithm} solver cancelled")
+        self.solver = None
+        self.solver_progress = None
+
+    def solve_anytime(self, mode=None, heuristic_method=None, time_limit=ANYTIME_TIME_LIMIT):
+        """
+        Chạy anytime A* (sokoban_solver.anytime_astar) trong tiến trình nền (BackgroundSolver) để game không bị treo
+        Lời giải đầu tiên được auto-play ngay khi có (xem update_anytime), các lời giải tốt hơn được lưu lại
+        Nếu level hiện tại đã có lời giải anytime thì phát lời giải tốt nhất hiện có
+        """
+        if self.anytime_level == self.current_level and self.anytime_solutions:
+            solution_path, stats = self.anytime_solutions[-1]
+            print(f"Playing best anytime solution: cost {stats['cost']} (bound {stats['bound']:.2f})")
+            self.start_auto_play(solution_path)
+            return
+        if self.anytime_solver is not None:
+            print("Anytime A* is still running, press C to cancel it")
+            return
+
+        mode = mode or self.search_mode
+        heuristic_method = heuristic_method or self.heuristic_method
+        print(f"Start Solver using anytime A* ({mode} mode, {time_limit}s) in background...")
+        self.anytime_solutions = []
+        self.anytime_level = self.current_level
+        self.anytime_solver = BackgroundSolver(self.game_matrix, "anytime", mode, False, heuristic_method,
+                                               time_limit=time_limit)
+
+    def update_anytime(self):
+        """Đọc các lời giải mới của tiến trình anytime A* (không chờ), auto-play lời giải đầu tiên"""
+        if self.anytime_solver is None:
+            return
+        for message in self.anytime_solver.poll():
+            if message[0] == PROGRESS:
+                stats = dict(message[1])
+                solution_path = stats.pop("solution")
+                print(f"Anytime A*: cost {stats['cost']} (bound {stats['bound']:.2f}) "
+                      f"after {stats['time']:.3f}s, {stats['nodes']} nodes")
+                self.astar_stats = stats
+                self.anytime_solutions.append((solution_path, stats))
+                if len(self.anytime_solutions) == 1 and self.anytime_level == self.current_level:
+                    self.start_auto_play(solution_path)
+            elif message[0] == DONE:
+                if not self.anytime_solutions:
+                    print(f"Anytime A*: no solution found! ({message[2]['status']})")
+            elif message[0] == FAILED:
+                print(f"Anytime A* failed: {message[1]}")
+        if not self.anytime_solver.running():
+            self.anytime_solver = None
+
+    def memory_text(self, stats):
+        """Dòng bộ nhớ của bảng thống kê: RSS tăng thêm tới đỉnh trong lần giải và RSS đỉnh"""
+        return f"Memory: {stats['memory']:.2f}MB (peak {stats.get('peak_rss', 0):.1f}MB)"
+
+    def structures_text(self, stats):
+        """Kích thước ước lượng của frontier/closed/tree/heuristic (MB) trong stats["structures"]"""
+        structures = stats.get("structures") or {}
+        if not structures:
+            return "Structures: -"
+        names = "/".join(name[:5].capitalize() for name in structures)
+        sizes = "/".join(f"{size:.2f}" for size in structures.values())
+        return f"{names}: {sizes}MB"
+
+    def solver_status_text(self):
+        """Dòng tiến độ thứ nhất khi đang giải ở nền: số node và tốc độ"""
+        name = "BFS" if self.solver.algorithm == "bfs" else "A*"
+        progress = self.solver_progress
+        if progress is None:
+            return f"Solving {name}... (C: cancel)"
+        return f"Solving {name}: {progress['nodes']} nodes, {progress['nodes_per_sec']:.0f}/s"
+
+    def solver_progress_text(self):
+        """Dòng tiến độ thứ hai: độ sâu (BFS) hoặc f nhỏ nhất (A*), bộ nhớ và thời gian đã chạy"""
+        progress = self.solver_progress
+        if progress is None:
+            return ""
+        if "depth" in progress:
+            bound = f"Depth {progress['depth']}"
+        else:
+            bound = f"f >= {progress['f_bound']}"
+        return f"{bound}, {progress['memory']:.1f}MB, {progress['time']:.1f}s (C: cancel)"
+
+    def statistics_lines(self):
+        """Các dòng (text, color, (x, y)) của bảng thống kê BFS và A* Algorithm"""
+        lines = [("ALGORITHM COMPARISON", BLACK, (10, 10))]
+        y_offset = 40
+        for name, stats, color in (("BFS", self.bfs_stats, (0, 150, 0)), ("A*", self.astar_stats, (220, 0, 0))):
+            lines.append((f"{name} Algorithm:", color, (10, y_offset)))
+            y_offset += 25
+            for text in (f"Time: {stats['time']:.3f}s", self.memory_text(stats), self.structures_text(stats),
+                         f"Nodes: {stats['nodes']}", f"Solution: {stats['solution_length']}"):
+                lines.append((text, BLACK, (20, y_offset)))
+                y_offset += 20
+            y_offset += 10
+        y_offset -= 5
         
         # Deadlock info
-        deadlocks = self.detect_all_deadlocks(self.game_matrix)
-        deadlock_count = len(deadlocks)
+        deadlock_count = len(self.current_deadlocks)
         deadlock_color = (255, 0, 0) if deadlock_count > 0 else (0, 150, 0)
-        deadlock_text = self.font.render(f"Deadlocks: {deadlock_count}", True, deadlock_color)
-        stats_surface.blit(deadlock_text, (15, y_offset))
+        lines.append((f"Deadlocks: {deadlock_count}", deadlock_color, (15, y_offset)))
         y_offset += 20
         
         # Status
-        if self.astar_stats['solution_length'] > 0 or self.bfs_stats['solution_length'] > 0:
-            status_text = self.font.render("Solution Found!", True, (0, 150, 0))
+        if self.solver is not None:
+            lines.append((self.solver_status_text(), (0, 0, 200), (15, y_offset)))
+            lines.append((self.solver_progress_text(), (0, 0, 200), (15, y_offset + 20)))
+        elif self.astar_stats['solution_length'] > 0 or self.bfs_stats['solution_length'] > 0:
+            lines.append(("Solution Found!", (0, 150, 0), (15, y_offset)))
         elif self.astar_stats['nodes'] > 0 or self.bfs_stats['nodes'] > 0:
-            status_text = self.font.render("No Solution", True, (200, 0, 0))
+            lines.append(("No Solution", (200, 0, 0), (15, y_offset)))
         else:
-            status_text = self.font.render("Ready to solve", True, (0, 0, 200))
-        
-        stats_surface.blit(status_text, (15, y_offset))
-        
-        self.screen.blit(stats_surface, (WINDOW_WIDTH - 460, 10))
+            lines.append(("Ready to solve", (0, 0, 200), (15, y_offset)))
+        return lines
     
-    def display_ui_info(self):
-        """Hiển thị thông tin điều khiển và level"""
+    def ui_info_lines(self):
+        """Các dòng thông tin điều khiển và level"""
         if not self.solution_path:
             # Normal game controls
             info_texts = [
@@ -836,6 +706,11 @@ class SokobanGame:
                 "P: Previous Level",
                 "1: Run BFS Solver",
                 "2: Run A* Solver",
+                "3: Run Anytime A*",
+                "C: Cancel Solver",
+                f"M: Search Mode ({self.search_mode})",
+                f"H: Heuristic ({self.heuristic_method})",
+                f"G: Macro Pushes ({'on' if self.macros else 'off'})",
                 "D: Check Deadlocks",
                 "ESC: Quit"
             ]
@@ -849,46 +724,142 @@ class SokobanGame:
                 "Solution Controls:",
                 "SPACE: Play/Pause auto-play",
                 "Z/X: Step backward/forward",
+                "Home/End: Jump to start/end",
                 "+/-: Speed control",
+                "3: Best anytime solution",
                 f"Speed: {self.auto_play_speed}ms/move",
                 "",
                 "R: Reset Level",
                 "D: Check Deadlocks",
                 "ESC: Quit"
             ]
-        
-        y_offset = WINDOW_HEIGHT - 240
-        for text in info_texts:
-            color = WHITE
-            color = (128, 128, 128) if "Not implemented" in text else color  # Gray for not implemented
-            
-            text_surface = self.font.render(text, True, color)
-            self.screen.blit(text_surface, (10, y_offset))
-            y_offset += 20
+        # Gray for not implemented
+        return [(text, (128, 128, 128) if "Not implemented" in text else WHITE, (0, 20 * index))
+                for index, text in enumerate(info_texts)]
+    
+    def deadlock_lines(self):
+        """Các dòng cảnh báo deadlock (tối đa 5 deadlock), rỗng nếu không có"""
+        deadlocks = self.current_deadlocks
+        if not deadlocks:
+            return []
+        lines = [("⚠️ DEADLOCK DETECTED!", (150, 0, 0), (10, 5))]
+        for index, deadlock in enumerate(deadlocks[:5]):
+            lines.append((f"• {deadlock}", (100, 0, 0), (15, 30 + 25 * index)))
+        return lines
+    
+    # =======================
+    # RENDERING
+    # =======================
+    def build_static_layer(self):
+        """Vẽ sẵn nền tĩnh của level (sàn, tường, dock) một lần khi load level"""
+        self.static_layer = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.static_layer.fill(GRAY)
+        for y, row in enumerate(self.original_level):
+            for x, char in enumerate(row):
+                if char == '#':
+                    tile = self.wall
+                elif char in ('.', '+', '*'):
+                    tile = self.docker
+                else:
+                    tile = self.floor
+                self.static_layer.blit(tile, (x * TILE_SIZE, y * TILE_SIZE))
+        self.full_redraw = True
+    
+    def render_text(self, text, color):
+        """Surface của một dòng chữ, dùng lại nếu đã render (cache được xóa khi quá TEXT_CACHE_SIZE dòng)"""
+        key = (text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = self.font.render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+    
+    def overlay_specs(self):
+        """(tên, các dòng, vị trí, kích thước, màu nền) của các lớp phủ theo thứ tự vẽ; màu nền None là trong suốt"""
+        info_lines = self.ui_info_lines()
+        deadlock_lines = self.deadlock_lines()
+        return [
+            ("ui_info", info_lines, (10, WINDOW_HEIGHT - 20 * len(info_lines) - 10), (440, 20 * len(info_lines)),
+             None),
+            ("statistics", self.statistics_lines(), (WINDOW_WIDTH - 460, 10), (450, 410), WHITE),
+            ("deadlocks", deadlock_lines, (10, 10), (450, min(180, 35 + len(self.current_deadlocks) * 25)),
+             (255, 200, 200)),
+        ]
+    
+    def update_overlays(self):
+        """Dựng lại lớp phủ nào có nội dung thay đổi, trả về các vùng màn hình cần vẽ lại"""
+        dirty = []
+        for name, lines, position, size, background in self.overlay_specs():
+            cached = self.overlays.get(name)
+            if cached is not None and cached[0] == lines:
+                continue
+            if cached is not None and cached[1] is not None:
+                dirty.append(cached[2])
+            if not lines:
+                self.overlays[name] = (lines, None, None)
+                continue
+            if background is None:
+                surface = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                surface = pygame.Surface(size)
+                surface.fill(background)
+                surface.set_alpha(230)
+            for text, color, offset in lines:
+                surface.blit(self.render_text(text, color), offset)
+            rect = pygame.Rect(position, size)
+            self.overlays[name] = (lines, surface, rect)
+            dirty.append(rect)
+        return dirty
+    
+    def repaint(self, rect, rows):
+        """Vẽ lại một vùng màn hình: nền tĩnh, box/player trong vùng rồi các lớp phủ chồng lên vùng"""
+        screen = self.screen
+        screen.set_clip(rect)
+        screen.blit(self.static_layer, rect, rect)
+        first_row, last_row = rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE
+        first_column, last_column = rect.left // TILE_SIZE, (rect.right - 1) // TILE_SIZE
+        for y in range(first_row, min(last_row + 1, len(rows))):
+            row = rows[y]
+            for x in range(first_column, min(last_column + 1, len(row))):
+                sprite = self.sprites.get(row[x])
+                if sprite is not None:
+                    screen.blit(sprite, (x * TILE_SIZE, y * TILE_SIZE))
+        for _, surface, overlay_rect in self.overlays.values():
+            if surface is not None and overlay_rect.colliderect(rect):
+                screen.blit(surface, overlay_rect)
+        screen.set_clip(None)
     
-    def display_deadlock_info(self):
-        """Hiển thị thông tin deadlock nếu có"""
-        deadlocks = self.detect_all_deadlocks(self.game_matrix)
+    def render(self):
+        """
+        Vẽ frame hiện tại: chỉ các ô box/player thay đổi so với frame trước và các lớp phủ có nội dung mới
+        được vẽ lại rồi cập nhật bằng pygame.display.update(dirty_rects); không có gì đổi thì không vẽ gì
+        """
+        rows = [''.join(row) for row in self.game_matrix]
+        if rows != self.rendered_rows:
+            self.current_deadlocks = self.detect_all_deadlocks(self.game_matrix)
         
-        if deadlocks:
-            # Tạo surface cho deadlock warning
-            warning_surface = pygame.Surface((450, min(180, 35 + len(deadlocks) * 25)))
-            warning_surface.fill((255, 200, 200))  # Light red background
-            warning_surface.set_alpha(230)
-            
-            # Tiêu đề warning
-            warning_title = self.font.render("⚠️ DEADLOCK DETECTED!", True, (150, 0, 0))
-            warning_surface.blit(warning_title, (10, 5))
-            
-            # Liệt kê các deadlock
-            y_offset = 30
-            for deadlock in deadlocks[:5]:  # Chỉ hiển thị tối đa 5 deadlock
-                deadlock_text = self.font.render(f"• {deadlock}", True, (100, 0, 0))
-                warning_surface.blit(deadlock_text, (15, y_offset))
-                y_offset += 25
-            
-            # Hiển thị ở góc trên bên trái
-            self.screen.blit(warning_surface, (10, 10))
+        dirty = []
+        if self.full_redraw or self.rendered_rows is None or len(rows) != len(self.rendered_rows):
+            self.full_redraw = True
+        else:
+            for y, (old_row, new_row) in enumerate(zip(self.rendered_rows, rows)):
+                if old_row == new_row:
+                    continue
+                for x in range(max(len(old_row), len(new_row))):
+                    if old_row[x:x + 1] != new_row[x:x + 1]:
+                        dirty.append(pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+        self.rendered_rows = rows
+        dirty.extend(self.update_overlays())
+        
+        if self.full_redraw:
+            self.full_redraw = False
+            dirty = [self.screen.get_rect()]
+        for rect in dirty:
+            self.repaint(rect, rows)
+        if dirty:
+            pygame.display.update(dirty)
     
     def handle_input(self, event):
         """Xử lý input từ người dùng"""
@@ -911,16 +882,37 @@ class SokobanGame:
                     self.load_level(self.current_level - 1)
             
             elif event.key == pygame.K_1:
-                # Run BFS
-                solution = self.solve_bfs()
-                if solution:
-                    self.start_auto_play(solution)
+                # Run BFS (tiến trình nền)
+                self.start_solver("bfs")
                     
             elif event.key == pygame.K_2:
-                # Run A*
-                solution = self.solve_astar()
-                if solution:
-                    self.start_auto_play(solution)
+                # Run A* (tiến trình nền)
+                self.start_solver("astar")
+            
+            elif event.key == pygame.K_c:
+                # Hủy lần giải đang chạy
+                self.cancel_solver()
+            
+            elif event.key == pygame.K_3:
+                # Anytime A*: chơi lời giải đầu tiên, bấm lại để chơi lời giải tốt nhất
+                self.solve_anytime()
+            
+            elif event.key == pygame.K_m:
+                # Đổi chế độ tìm kiếm push/move
+                index = SEARCH_MODES.index(self.search_mode)
+                self.search_mode = SEARCH_MODES[(index + 1) % len(SEARCH_MODES)]
+                print(f"Search mode: {self.search_mode}")
+            
+            elif event.key == pygame.K_h:
+                # Đổi heuristic của A*
+                index = HEURISTIC_METHODS.index(self.heuristic_method)
+                self.heuristic_method = HEURISTIC_METHODS[(index + 1) % len(HEURISTIC_METHODS)]
+                print(f"Heuristic: {self.heuristic_method}")
+            
+            elif event.key == pygame.K_g:
+                # Bật/tắt nước đẩy gộp qua đường hầm/vào phòng đích
+                self.macros = not self.macros
+                print(f"Macro pushes: {'on' if self.macros else 'off'}")
             
             elif event.key == pygame.K_d:
                 # Check deadlocks
@@ -956,6 +948,12 @@ class SokobanGame:
                     self.auto_playing = False  # Pause auto-play
                     self.step_solution_forward()
             
+            elif event.key in (pygame.K_HOME, pygame.K_END):
+                # Jump to start/end of solution
+                if self.solution_path:
+                    self.auto_playing = False  # Pause auto-play
+                    self.seek_solution(0 if event.key == pygame.K_HOME else len(self.solution_path))
+            
             elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
                 # Increase speed
                 self.adjust_speed(faster=True)
@@ -997,27 +995,24 @@ class SokobanGame:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.full_redraw = True  # Cửa sổ bị che rồi hiện lại
                 else:
                     running = self.handle_input(event)
             
             # Update auto-play if running
+            self.update_solver()
+            self.update_anytime()
             self.update_auto_play()
             
-            # Clear screen
-            self.screen.fill(GRAY)
-            
-            # Draw game
-            self.print_game(self.game_matrix)
-            
-            # Draw UI
-            self.display_ui_info()
-            self.display_statistics()
-            self.display_deadlock_info()
+            # Chỉ vẽ lại phần thay đổi
+            self.render()
             
-            # Update display
-            pygame.display.flip()
             self.clock.tick(FPS)
         
+        self.cancel_solver()
+        if self.solution_cache is not None:
+            self.solution_cache.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,27 @@
+"""
+Sokoban solver không phụ thuộc pygame: mô hình level, sinh nước đi, phát hiện deadlock,
+heuristic và các thuật toán BFS/A* (cả A* song song, BFS hai chiều,
+IDA* và anytime A*). Dùng được từ GUI (main.py), dòng lệnh hoặc các worker batch.
+"""
+from .constants import (ALGORITHMS, DIRECTIONS, HEURISTIC_METHODS, INFINITE_COST, OPPOSITE,
+                        SEARCH_MODES, SOLVER_VERSION, ZOBRIST_SEED)
+from .anytime import ANYTIME_WEIGHTS, anytime_astar, solve_anytime
+from .background import BackgroundSolver
+from .bidirectional import solve_bidirectional
+from .cache import DEFAULT_CACHE_PATH, SolutionCache, solve_cached
+from .collection import LevelCollection, LevelRef
+from .deadlock import DeadlockDetector
+from .external import solve_external_bfs
+from .heuristic import HeuristicEngine
+from .ida import solve_ida
+from .level import LevelMap
+from .macros import MacroPlanner
+from .matrix import (apply_move, find_player, get_valid_moves, is_level_completed, load_levels,
+                     lurd_to_moves, matrix_to_string, moves_to_lurd)
+from .parallel import solve_parallel_astar
+from .profiling import SearchProfiler
+from .replay import SolutionReplay
+from .search import solve, solve_astar, solve_bfs
+from .state import SearchState, SearchTree, StateTable, TranspositionTable, ZobristTable
+
+__version__ = SOLVER_VERSION
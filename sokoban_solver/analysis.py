@@ -0,0 +1,342 @@
+"""
+Phân tích tĩnh của một level (chỉ phụ thuộc tường và dock), tính một lần cho mỗi bố cục rồi dùng lại:
+khung bao đã cắt bỏ phần ngoài tường, các ô bên trong, bảng láng giềng, ô chết, đường hầm, điểm khớp,
+phòng (cùng lối vào duy nhất của các phòng đích) và các bảng khoảng cách đẩy của heuristic
+
+analyze(matrix) tra bộ nhớ đệm trong RAM (MEMO_SIZE bố cục gần nhất) và, nếu đã gọi set_cache_dir(),
+một thư mục trên đĩa để các tiến trình worker không phải tính lại
+"""
+import hashlib
+import os
+import pickle
+from collections import OrderedDict, deque
+
+from .constants import DIRECTIONS, INFINITE_COST, OPPOSITE, SOLVER_VERSION
+
+# Phiên bản định dạng file phân tích trên đĩa
+ANALYSIS_FORMAT = 2
+# Số bố cục được giữ trong bộ nhớ đệm RAM
+MEMO_SIZE = 64
+
+# Cờ của tunnels[cell]: hành lang rộng một ô theo trục ngang (tường trên và dưới) / trục dọc (tường trái và phải)
+HORIZONTAL_TUNNEL = 1
+VERTICAL_TUNNEL = 2
+
+# Ký tự của bố cục tĩnh: box và player được bỏ đi, giữ dock
+_STATIC_CHARS = {'$': ' ', '@': ' ', '*': '.', '+': '.'}
+
+_memo = OrderedDict()
+_cache_dir = None
+
+
+def static_layout(matrix):
+    """Bố cục tĩnh của level dạng chuỗi (tường, sàn, dock), dùng làm khóa của bộ nhớ đệm"""
+    return '\n'.join(''.join(_STATIC_CHARS.get(char, char) for char in row).rstrip() for row in matrix)
+
+
+def set_cache_dir(directory):
+    """Bật (directory) hoặc tắt (None) bộ nhớ đệm phân tích trên đĩa"""
+    global _cache_dir
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _cache_dir = directory
+
+
+def analyze(matrix, cells=()):
+    """
+    LevelAnalysis của level, dùng lại bản đã tính cho cùng bố cục tĩnh
+    cells: các tọa độ (x, y) phải nằm bên trong (player, box); level hở (có ô này ở ngoài tường) thì không cắt
+    """
+    layout = static_layout(matrix)
+    analysis = _lookup(layout, True)
+    if not all(analysis.cell_of(x, y) >= 0 for x, y in cells):
+        analysis = _lookup(layout, False)
+    return analysis
+
+
+def _disk_path(layout, trim):
+    digest = hashlib.sha256(f"{ANALYSIS_FORMAT}|{SOLVER_VERSION}|{trim}|{layout}".encode('utf-8')).hexdigest()
+    return os.path.join(_cache_dir, digest[:32] + ".pickle")
+
+
+def _lookup(layout, trim):
+    key = (layout, trim)
+    analysis = _memo.get(key)
+    if analysis is not None:
+        _memo.move_to_end(key)
+        return analysis
+    if _cache_dir:
+        # File do chính solver ghi trong thư mục người dùng chọn
+        try:
+            with open(_disk_path(layout, trim), 'rb') as file:
+                analysis = pickle.load(file)
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            analysis = None
+    if analysis is None:
+        analysis = LevelAnalysis(layout.split('\n'), trim)
+        analysis.save()
+    _memo[key] = analysis
+    if len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return analysis
+
+
+class LevelAnalysis:
+    """
+    Phần tĩnh của level trên lưới đã cắt: khung bao các ô bên trong (ô không phải tường nằm trong vòng tường)
+    thêm một lớp tường, cell = y * width + x với (x, y) tính từ góc (left, top) của matrix
+    Các ô ngoài tường, ngoài dòng hoặc trong khung nhưng không thuộc bên trong đều được coi là tường
+    trim=False: không loại phần ngoài tường (level hở)
+    """
+
+    def __init__(self, rows, trim=True):
+        self.layout = '\n'.join(rows)
+        self.trim = trim
+        inside = self._inside_cells(rows, trim)
+        if inside:
+            xs = [x for x, _ in inside]
+            ys = [y for _, y in inside]
+            self.left, self.top = max(min(xs) - 1, 0), max(min(ys) - 1, 0)
+            self.width = max(xs) + 2 - self.left
+            self.height = max(ys) + 2 - self.top
+        else:
+            self.left = self.top = 0
+            self.width = max((len(row) for row in rows), default=0)
+            self.height = len(rows)
+        size = self.width * self.height
+
+        # walls[cell]: 1 nếu player/box không đứng được, docks[cell]: 1 nếu là dock
+        self.walls = bytearray(b'\x01' * size)
+        self.docks = bytearray(size)
+        for x, y in inside:
+            cell = (y - self.top) * self.width + x - self.left
+            self.walls[cell] = 0
+            if rows[y][x] == '.':
+                self.docks[cell] = 1
+        self.cells = tuple(cell for cell in range(size) if not self.walls[cell])
+        self.dock_cells = tuple(cell for cell in self.cells if self.docks[cell])
+
+        # Bảng láng giềng: neighbours[cell][d] là ô kề theo DIRECTIONS[d], -1 nếu là tường/ngoài biên
+        self.neighbours = []
+        for cell in range(size):
+            x, y = cell % self.width, cell // self.width
+            row = []
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height and not self.walls[ny * self.width + nx]:
+                    row.append(ny * self.width + nx)
+                else:
+                    row.append(-1)
+            self.neighbours.append(tuple(row))
+
+        self._push_distances = None
+        self._heuristic_tables = None
+        self.dead_squares = self.compute_dead_squares()
+        self.tunnels = self.compute_tunnels()
+        self.articulation_points = self.compute_articulation_points()
+        self.rooms, self.room_of = self.compute_rooms()
+        self.goal_room_entrances = self.compute_goal_room_entrances()
+
+    @staticmethod
+    def _inside_cells(rows, trim):
+        """
+        Tọa độ (x, y) các ô không phải tường của matrix; trim: bỏ các ô nối được ra mép matrix (phía ngoài tường),
+        trừ khi có dock ở phía ngoài (level hở)
+        """
+        open_cells = {(x, y) for y, row in enumerate(rows) for x, char in enumerate(row) if char != '#'}
+        if not trim:
+            return sorted(open_cells)
+        height = len(rows)
+
+        def on_edge(x, y):
+            # Ô kề với phần ngoài matrix hoặc ngoài dòng (khoảng trống phía ngoài)
+            return any(not 0 <= y + dy < height or not 0 <= x + dx < len(rows[y + dy]) for dx, dy in DIRECTIONS)
+
+        stack = [cell for cell in open_cells if on_edge(*cell)]
+        outside = set(stack)
+        while stack:
+            x, y = stack.pop()
+            for dx, dy in DIRECTIONS:
+                neighbour = (x + dx, y + dy)
+                if neighbour in open_cells and neighbour not in outside:
+                    outside.add(neighbour)
+                    stack.append(neighbour)
+        if any(rows[y][x] == '.' for x, y in outside):
+            return sorted(open_cells)
+        return sorted(open_cells - outside)
+
+    def cell_of(self, x, y):
+        """Chỉ số ô của tọa độ (x, y) trong matrix, -1 nếu ô nằm ngoài phần bên trong"""
+        x -= self.left
+        y -= self.top
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        cell = y * self.width + x
+        return -1 if self.walls[cell] else cell
+
+    def coords(self, cell):
+        """Tọa độ (x, y) trong matrix của chỉ số ô"""
+        return cell % self.width + self.left, cell // self.width + self.top
+
+    def compute_dead_squares(self):
+        """
+        Tìm tất cả các ô sàn mà từ đó box không thể tới dock nào
+        Kéo ngược box từ mọi dock: box ở cell kéo được về hướng d nếu ô kề (nơi box tới)
+        và ô kế tiếp (nơi player lùi về) đều không phải tường. Ô nào không kéo tới được là ô chết
+        """
+        live = bytearray(len(self.walls))
+        for distances in self._pull_distances():
+            for cell in self.cells:
+                if distances[cell] != INFINITE_COST:
+                    live[cell] = 1
+        dead = bytearray(len(self.walls))
+        for cell in self.cells:
+            if not live[cell]:
+                dead[cell] = 1
+        return dead
+
+    def _pull_distances(self):
+        """Khoảng cách kéo ngược từ từng dock (xem compute_push_distances), tính một lần"""
+        if self._push_distances is None:
+            self._push_distances = [self.compute_push_distances(dock) for dock in self.dock_cells]
+        return self._push_distances
+
+    def compute_push_distances(self, dock):
+        """BFS theo nước kéo từ dock: số nước đẩy ít nhất để đưa box từ mỗi ô tới dock"""
+        distances = [INFINITE_COST] * len(self.walls)
+        distances[dock] = 0
+        queue = deque([dock])
+        neighbours = self.neighbours
+        while queue:
+            cell = queue.popleft()
+            for d in range(4):
+                target = neighbours[cell][d]
+                if target < 0 or distances[target] != INFINITE_COST:
+                    continue
+                if neighbours[target][d] < 0:  # Không có chỗ cho player đứng để kéo
+                    continue
+                distances[target] = distances[cell] + 1
+                queue.append(target)
+        return distances
+
+    def heuristic_tables(self):
+        """
+        (push_distances, costs, nearest) cho HeuristicEngine
+        push_distances[j][cell]: số nước đẩy ít nhất từ cell tới dock thứ j, costs[cell]: tuple khoảng cách
+        tới từng dock, nearest[cell]: khoảng cách tới dock gần nhất
+        """
+        if self._heuristic_tables is None:
+            push_distances = self._pull_distances()
+            costs = [tuple(distances[cell] for distances in push_distances) for cell in range(len(self.walls))]
+            nearest = [min(cell_costs, default=INFINITE_COST) for cell_costs in costs]
+            self._heuristic_tables = (push_distances, costs, nearest)
+            self.save()
+        return self._heuristic_tables
+
+    def compute_tunnels(self):
+        """Cờ HORIZONTAL_TUNNEL/VERTICAL_TUNNEL của các ô thuộc hành lang rộng một ô"""
+        tunnels = bytearray(len(self.walls))
+        neighbours = self.neighbours
+        for cell in self.cells:
+            left, right, up, down = neighbours[cell]
+            if up < 0 and down < 0 and (left >= 0 or right >= 0):
+                tunnels[cell] |= HORIZONTAL_TUNNEL
+            if left < 0 and right < 0 and (up >= 0 or down >= 0):
+                tunnels[cell] |= VERTICAL_TUNNEL
+        return tunnels
+
+    def compute_articulation_points(self):
+        """Các ô bên trong mà nếu bị chặn (bởi box) thì chia vùng đi lại thành nhiều phần (Tarjan, không đệ quy)"""
+        size = len(self.walls)
+        order = [0] * size  # thứ tự thăm, 0 = chưa thăm
+        low = [0] * size
+        points = set()
+        counter = 1
+        neighbours = self.neighbours
+        for root in self.cells:
+            if order[root]:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            stack = [(root, -1, iter(neighbours[root]))]
+            while stack:
+                cell, parent, children = stack[-1]
+                for target in children:
+                    if target < 0 or target == parent:
+                        continue
+                    if order[target]:
+                        low[cell] = min(low[cell], order[target])
+                        continue
+                    order[target] = low[target] = counter
+                    counter += 1
+                    stack.append((target, cell, iter(neighbours[target])))
+                    break
+                else:
+                    stack.pop()
+                    if parent < 0:
+                        continue
+                    low[parent] = min(low[parent], low[cell])
+                    if parent == root:
+                        root_children += 1
+                    elif low[cell] >= order[parent]:
+                        points.add(parent)
+            if root_children > 1:
+                points.add(root)
+        return tuple(sorted(points))
+
+    def compute_rooms(self):
+        """
+        Chia phần bên trong thành các phòng: vùng liên thông sau khi bỏ các ô đường hầm
+        Trả về (tuple các phòng, mỗi phòng là tuple ô; room_of[cell]: chỉ số phòng, -1 với tường/đường hầm)
+        """
+        room_of = [-1] * len(self.walls)
+        rooms = []
+        neighbours = self.neighbours
+        for start in self.cells:
+            if room_of[start] >= 0 or self.tunnels[start]:
+                continue
+            room = len(rooms)
+            room_of[start] = room
+            members = [start]
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                for target in neighbours[cell]:
+                    if target >= 0 and room_of[target] < 0 and not self.tunnels[target]:
+                        room_of[target] = room
+                        members.append(target)
+                        stack.append(target)
+            rooms.append(tuple(sorted(members)))
+        return tuple(rooms), room_of
+
+    def compute_goal_room_entrances(self):
+        """
+        Lối vào của các phòng đích: phòng có dock và chỉ nối với phần còn lại qua đúng một cặp ô kề
+        (ô ngoài phòng, ô trong phòng). Trả về dict (ô ngoài, hướng từ ô ngoài vào phòng) -> chỉ số phòng
+        """
+        entrances = {}
+        for room, members in enumerate(self.rooms):
+            if not any(self.docks[cell] for cell in members):
+                continue
+            doors = [(outside, OPPOSITE[d]) for cell in members for d, outside in enumerate(self.neighbours[cell])
+                     if outside >= 0 and self.room_of[outside] != room]
+            if len(doors) == 1:
+                entrances[doors[0]] = room
+        return entrances
+
+    def save(self):
+        """Ghi bản phân tích vào thư mục đệm trên đĩa (nếu có), lỗi ghi được bỏ qua"""
+        if not _cache_dir:
+            return
+        path = _disk_path(self.layout, self.trim)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as file:
+                pickle.dump(self, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
@@ -0,0 +1,141 @@
+"""
+Anytime A* kiểu ARA*: weighted A* với trọng số giảm dần, trả về lời giải đầu tiên thật nhanh rồi cải thiện dần
+Mỗi vòng mở rộng node theo khóa g + w·h cho tới khi không node nào có khóa nhỏ hơn chi phí lời giải tốt nhất;
+khi đó lời giải có chi phí <= w lần tối ưu (h nhất quán). g_score và open list được giữ lại giữa các vòng,
+trạng thái đã đóng mà tìm được g tốt hơn được để dành (INCONS) cho vòng sau thay vì mở lại ngay,
+nên mỗi vòng chỉ sửa lại phần cây bị ảnh hưởng thay vì tìm lại từ đầu
+"""
+import heapq
+import time
+
+from .constants import HEURISTIC_METHODS, INFINITE_COST, SEARCH_MODES
+from .heuristic import HeuristicEngine
+from .memory import MemoryMonitor
+from .search import SearchLimits, _finish, _start
+from .state import SearchTree, StateTable
+
+# Trọng số của các vòng, vòng cuối luôn là A* thường
+ANYTIME_WEIGHTS = (5.0, 3.0, 2.0, 1.5, 1.25, 1.0)
+
+
+def anytime_astar(matrix, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+                  time_limit=None, node_limit=None, weights=ANYTIME_WEIGHTS):
+    """
+    Generator trả về (solution_path, stats) mỗi khi có lời giải tốt hơn hoặc cận tối ưu chặt hơn
+    stats có thêm "cost" (số nước đẩy/bước đi theo mode), "weight" và "bound": chi phí <= bound × tối ưu
+    Khi hết vòng hoặc vượt giới hạn, giá trị trả về của generator (StopIteration.value) là stats cuối
+    """
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    level, initial_state, successors = _start(matrix, mode)
+    engine = HeuristicEngine(level, heuristic_method)
+    initial_h, initial_info = engine.initial(initial_state.boxes)
+
+    limits = SearchLimits(time_limit, node_limit, monitor=monitor)
+    nodes_explored = 0
+    status = None
+    tree = SearchTree(mode == "push")
+    g_scores = StateTable(exact)
+    g_scores.set(initial_state, 0)
+    best_path = None
+    best_cost = INFINITE_COST
+    bound = None
+
+    def report(weight):
+        stats = _finish(start_time, monitor, nodes_explored, best_path, None, final=False)
+        stats.update({"cost": best_cost, "weight": weight, "bound": bound})
+        return stats
+
+    # Mỗi entry: (g + w·h, -g, node, state, h, h_info); -g phá hòa về phía node sâu hơn
+    open_list = []
+    incons = []
+    if level.is_goal(initial_state.boxes):
+        best_path, best_cost, bound = [], 0, 1.0
+        weights = ()
+        yield best_path, report(1.0)
+    elif initial_h < INFINITE_COST and not level.is_deadlock(initial_state.boxes):
+        open_list.append((0, 0, 0, initial_state, initial_h, initial_info))
+
+    for weight in weights:
+        # Tính lại khóa theo trọng số mới, gộp INCONS, bỏ entry cũ và node không thể cải thiện lời giải
+        entries = []
+        for _, negative_g, node, state, h_score, h_info in open_list + incons:
+            g = -negative_g
+            if g == g_scores.get(state) and g + h_score < best_cost:
+                entries.append((g + weight * h_score, negative_g, node, state, h_score, h_info))
+        open_list = entries
+        heapq.heapify(open_list)
+        incons = []
+        closed = StateTable(exact)
+        goal_node = None
+
+        while open_list and open_list[0][0] < best_cost:
+            _, negative_g, node, current_state, current_h, current_h_info = heapq.heappop(open_list)
+            current_g = -negative_g
+            if current_g != g_scores.get(current_state) or current_state in closed:
+                continue  # Entry cũ: đã có đường tốt hơn hoặc đã mở rộng trong vòng này
+            closed.set(current_state)
+            nodes_explored += 1
+            status = limits.exceeded(nodes_explored)
+            if status:
+                nodes_explored -= 1  # node này chưa được mở rộng
+                break
+
+            new_g_score = current_g + 1
+            for action, succ_state in successors(current_state):
+                old_g_score = g_scores.get(succ_state)
+                if old_g_score is not None and new_g_score >= old_g_score:
+                    continue
+                h_score, h_info = engine.update(current_state.boxes, current_h, current_h_info,
+                                                level.pushed_box(current_state, action, succ_state),
+                                                succ_state.boxes)
+                if h_score >= INFINITE_COST or new_g_score + h_score >= best_cost:
+                    continue
+                g_scores.set(succ_state, new_g_score)
+                new_node = tree.add(node, action)
+                if level.is_goal(succ_state.boxes):
+                    # Khóa của đích là g, vòng lặp dừng khi không còn khóa nào nhỏ hơn
+                    best_cost = new_g_score
+                    goal_node = new_node
+                    continue
+                entry = (new_g_score + weight * h_score, -new_g_score, new_node, succ_state, h_score, h_info)
+                if succ_state in closed:
+                    incons.append(entry)
+                else:
+                    heapq.heappush(open_list, entry)
+
+        if status:
+            break
+        if goal_node is not None:
+            best_path = level.solution_moves(tree.actions(goal_node), mode)
+        if best_path is None:
+            continue
+        # Cận dưới của tối ưu: g + h nhỏ nhất còn lại (không còn node nào thì lời giải đã tối ưu)
+        lower = min((-entry[1] + entry[4] for entry in open_list + incons
+                     if -entry[1] == g_scores.get(entry[3])), default=best_cost)
+        new_bound = min(weight, best_cost / lower) if lower > 0 else weight
+        if goal_node is not None or bound is None or new_bound < bound:
+            bound = new_bound
+            yield best_path, report(weight)
+        if bound <= 1.0:
+            break
+
+    if best_path is not None:
+        status = None
+    stats = _finish(start_time, monitor, nodes_explored, best_path, status,
+                    {"frontier": (open_list, incons), "closed": g_scores, "tree": tree, "heuristic": engine.tables})
+    stats.update({"cost": best_cost if best_path is not None else None, "bound": bound})
+    return stats
+
+
+def solve_anytime(matrix, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+                  time_limit=None, node_limit=None, weights=ANYTIME_WEIGHTS):
+    """Chạy anytime_astar tới khi hết thời gian/hết vòng, trả về (lời giải tốt nhất, stats cuối)"""
+    solution_path = None
+    solutions = anytime_astar(matrix, mode, exact, heuristic_method, time_limit, node_limit, weights)
+    while True:
+        try:
+            solution_path, _ = next(solutions)
+        except StopIteration as stop:
+            return solution_path, stop.value
@@ -0,0 +1,95 @@
+"""
+Chạy một lần giải trong tiến trình nền cho GUI: tiến trình chính chỉ đọc hàng đợi tin nhắn mỗi frame
+nên không bao giờ bị chặn, và hủy là dừng hẳn tiến trình giải ngay lập tức
+Với "anytime" mỗi lời giải tốt hơn được gửi ngay dưới dạng tin nhắn PROGRESS có khóa "solution"
+"""
+import multiprocessing
+import queue
+import traceback
+
+from .anytime import anytime_astar
+from .cache import SolutionCache, solve_cached
+
+# Loại tin nhắn từ tiến trình giải
+PROGRESS, DONE, FAILED = range(3)
+
+
+def _solver_worker(messages, matrix, algorithm, mode, exact, heuristic_method, time_limit, node_limit, cache_path,
+                   macros):
+    """Chạy trong tiến trình con: gửi PROGRESS định kỳ rồi DONE (solution_path, stats) hoặc FAILED (traceback)"""
+    cache = None
+    try:
+        if algorithm == "anytime":
+            _anytime_worker(messages, matrix, mode, exact, heuristic_method, time_limit, node_limit)
+            return
+        if cache_path:
+            cache = SolutionCache(cache_path)
+        solution_path, stats = solve_cached(cache, matrix, algorithm, mode, exact, heuristic_method, time_limit,
+                                            node_limit, progress=lambda info: messages.put((PROGRESS, info)),
+                                            macros=macros)
+        messages.put((DONE, solution_path, stats))
+    except Exception:
+        messages.put((FAILED, traceback.format_exc()))
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _anytime_worker(messages, matrix, mode, exact, heuristic_method, time_limit, node_limit):
+    """Anytime A*: mỗi lời giải tốt hơn là một PROGRESS (stats kèm "solution"), DONE là lời giải tốt nhất"""
+    solution_path = None
+    solutions = anytime_astar(matrix, mode, exact, heuristic_method, time_limit, node_limit)
+    while True:
+        try:
+            solution_path, stats = next(solutions)
+        except StopIteration as stop:
+            messages.put((DONE, solution_path, stop.value))
+            return
+        messages.put((PROGRESS, dict(stats, solution=solution_path)))
+
+
+class BackgroundSolver:
+    """
+    Một lần giải solve_cached(...) (hoặc anytime_astar với algorithm "anytime", không dùng cache) trong tiến trình riêng
+    poll() trả về các tin nhắn mới mà không chờ: (PROGRESS, dict tiến độ), (DONE, solution_path, stats)
+    hoặc (FAILED, traceback); cancel() dừng tiến trình ngay
+    """
+
+    def __init__(self, matrix, algorithm, mode, exact=False, heuristic_method="hungarian", time_limit=None,
+                 node_limit=None, cache_path=None, macros=False):
+        self.algorithm = algorithm
+        self.messages = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=_solver_worker, daemon=True,
+            args=(self.messages, [row[:] for row in matrix], algorithm, mode, exact, heuristic_method, time_limit,
+                  node_limit, cache_path, macros))
+        self.process.start()
+        self.finished = False
+
+    def poll(self):
+        messages = []
+        while not self.finished:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive() and self.messages.empty():
+                    # Tiến trình chết mà không gửi kết quả (ví dụ bị hệ điều hành dừng vì hết bộ nhớ)
+                    messages.append((FAILED, f"solver process exited with code {self.process.exitcode}"))
+                    self.finished = True
+                break
+            messages.append(message)
+            if message[0] != PROGRESS:
+                self.finished = True
+                self.process.join(timeout=1)
+        return messages
+
+    def running(self):
+        return not self.finished
+
+    def cancel(self):
+        """Dừng tiến trình giải; các tin nhắn chưa đọc bị bỏ"""
+        if not self.finished:
+            self.finished = True
+            self.process.terminate()
+            self.process.join(timeout=1)
+        self.messages.close()
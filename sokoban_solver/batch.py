@@ -0,0 +1,118 @@
+"""
+Giải cả bộ level bằng process pool: mỗi level là một job riêng với giới hạn thời gian, số node và bộ nhớ,
+kết quả được trả về ngay khi từng level giải xong
+"""
+import multiprocessing
+import os
+import traceback
+
+from .analysis import set_cache_dir
+from .matrix import moves_to_lurd
+from .cache import SolutionCache, solve_cached
+from .collection import LevelRef
+
+try:
+    import resource
+except ImportError:  # Windows: không giới hạn được bộ nhớ theo tiến trình
+    resource = None
+
+
+def solution_record(matrix, level_number, solution_path, stats):
+    """Một bản ghi kết quả cho JSON: lời giải dạng LURD và thống kê của solver"""
+    lurd = moves_to_lurd(matrix, solution_path) if solution_path is not None else None
+    record = {
+        "level": level_number,
+        "solved": solution_path is not None,
+        "solution": lurd,
+        "moves": len(lurd) if lurd is not None else 0,
+        "pushes": sum(1 for letter in lurd if letter.isupper()) if lurd is not None else 0,
+    }
+    record.update(stats)
+    return record
+
+
+def _peak_memory_mb():
+    """Bộ nhớ RSS lớn nhất của tiến trình worker (MB), None nếu không đo được"""
+    if resource is None:
+        return None
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _limit_memory(memory_limit):
+    """Giới hạn không gian địa chỉ của worker: bộ nhớ đang dùng + memory_limit (MB)"""
+    if resource is None or not memory_limit:
+        return
+    import psutil
+    current = psutil.Process(os.getpid()).memory_info().vms
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = current + int(memory_limit * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _solve_job(job):
+    """Chạy trong worker: giải một level và luôn trả về một bản ghi (kể cả khi lỗi/hết bộ nhớ)"""
+    level_number, matrix, options = job
+    cache = None
+    try:
+        if isinstance(matrix, LevelRef):
+            matrix = matrix.load()
+        _limit_memory(options["memory_limit"])
+        if options["analysis_cache"]:
+            set_cache_dir(options["analysis_cache"])
+        # Mỗi worker tự mở file cache (kết nối SQLite không chuyển được giữa các tiến trình)
+        if options["cache_path"]:
+            cache = SolutionCache(options["cache_path"])
+        solution_path, stats = solve_cached(cache, matrix, options["algorithm"], options["mode"], options["exact"],
+                                            options["heuristic_method"], options["time_limit"],
+                                            options["node_limit"], table_size=options["table_size"],
+                                            memory_limit=options["memory_limit"], work_dir=options["work_dir"],
+                                            macros=options["macros"])
+        record = solution_record(matrix, level_number, solution_path, stats)
+    except MemoryError:
+        record = solution_record(matrix, level_number, None, {"status": "memory_limit"})
+    except Exception:
+        record = solution_record(matrix, level_number, None, {"status": "error"})
+        record["error"] = traceback.format_exc()
+    finally:
+        if cache is not None:
+            cache.close()
+    record["peak_memory"] = _peak_memory_mb()
+    return record
+
+
+def solve_batch(levels, indices, algorithm, mode, exact=False, heuristic_method="hungarian",
+                time_limit=None, node_limit=None, memory_limit=None, jobs=None, table_size=None, work_dir=None,
+                cache_path=None, analysis_cache=None, macros=False):
+    """
+    Gửi các level levels[i] (i trong indices) vào process pool, mặc định một worker mỗi core
+    levels là list ma trận hoặc LevelCollection; với LevelCollection chỉ vị trí của level trong file (LevelRef)
+    được gửi đi và worker tự đọc level
+    Generator trả về bản ghi kết quả của từng level theo thứ tự giải xong
+    Mỗi job chạy trong một worker mới (maxtasksperchild=1) để giới hạn và đỉnh bộ nhớ là của riêng job đó
+    cache_path: file SolutionCache dùng chung cho các worker (None = không dùng cache)
+    analysis_cache: thư mục lưu LevelAnalysis dùng chung cho các worker (None = chỉ trong bộ nhớ)
+    macros: nước đẩy gộp của "bfs"/"astar" ở chế độ "push" (xem macros.py)
+    """
+    options = {
+        "algorithm": algorithm,
+        "mode": mode,
+        "exact": exact,
+        "heuristic_method": heuristic_method,
+        "time_limit": time_limit,
+        "node_limit": node_limit,
+        "memory_limit": memory_limit,
+        "table_size": table_size,
+        "work_dir": work_dir,
+        "cache_path": cache_path,
+        "analysis_cache": analysis_cache,
+        "macros": macros,
+    }
+    reference = getattr(levels, "reference", None)
+    batch = [(index + 1, reference(index) if reference else levels[index], options) for index in indices]
+    with multiprocessing.Pool(jobs or os.cpu_count(), maxtasksperchild=1) as pool:
+        for record in pool.imap_unordered(_solve_job, batch):
+            yield record
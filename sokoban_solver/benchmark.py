@@ -0,0 +1,202 @@
+"""
+Benchmark lặp lại được trên các bộ level đi kèm (MicroCosmos, MiniCosmos)
+
+    python -m sokoban_solver.benchmark --algorithms bfs astar --time-limit 30 --output bench.json
+    python -m sokoban_solver.benchmark --baseline bench.json --threshold 0.2
+
+Mỗi level chạy trong một tiến trình mới (qua solve_batch, không dùng cache) để thời gian và bộ nhớ đỉnh không
+ảnh hưởng lẫn nhau; seed Zobrist và các giới hạn được ghi vào file kết quả. So sánh với một kết quả cũ (baseline)
+báo các level bị chậm hơn, tốn node/bộ nhớ hơn hoặc lời giải dài hơn quá ngưỡng
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from .batch import solve_batch
+from .cli import parse_level_numbers
+from .constants import ALGORITHMS, HEURISTIC_METHODS, SEARCH_MODES, SOLVER_VERSION, ZOBRIST_SEED
+from .collection import LevelCollection
+
+# Phiên bản định dạng file kết quả
+BENCHMARK_FORMAT = 1
+DEFAULT_LEVEL_FILES = ["MicroCosmos.txt", "MiniCosmos.txt"]
+DEFAULT_THRESHOLD = 0.2
+# Chênh lệch tuyệt đối tối thiểu để tính là chậm đi/tốn bộ nhớ hơn (tránh nhiễu ở các level rất nhanh)
+MIN_TIME_DELTA = 0.05
+MIN_MEMORY_DELTA = 5.0
+
+# Các chỉ số được so sánh: (tên, chênh lệch tuyệt đối tối thiểu)
+COMPARED_METRICS = [("time", MIN_TIME_DELTA), ("nodes", 0), ("peak_memory", MIN_MEMORY_DELTA),
+                    ("solution_length", 0)]
+
+
+def run_benchmark(level_files, algorithms, level_numbers=None, mode=SEARCH_MODES[0],
+                  heuristic_method=HEURISTIC_METHODS[0], exact=False, time_limit=None, node_limit=None,
+                  memory_limit=None, jobs=1, progress=None):
+    """
+    Chạy từng thuật toán trên các level của từng file, trả về dict kết quả (định dạng BENCHMARK_FORMAT)
+    level_numbers: list các đối số "3"/"5-8" như --levels của CLI, None = tất cả level
+    progress: hàm nhận mỗi bản ghi kết quả ngay khi level giải xong
+    """
+    results = []
+    for level_file in level_files:
+        levels = LevelCollection(level_file)
+        indices = parse_level_numbers(level_numbers, len(levels))
+        for algorithm in algorithms:
+            records = solve_batch(levels, indices, algorithm, mode, exact, heuristic_method, time_limit,
+                                  node_limit, memory_limit, jobs)
+            for record in records:
+                result = {
+                    "level_file": os.path.basename(level_file),
+                    "level": record["level"],
+                    "algorithm": algorithm,
+                    "status": record["status"],
+                    "time": record.get("time"),
+                    "nodes": record.get("nodes"),
+                    "nodes_per_sec": record["nodes"] / record["time"] if record.get("time") else None,
+                    "peak_memory": record.get("peak_memory"),
+                    "memory": record.get("memory"),
+                    "structures": record.get("structures"),
+                    "solution_length": record["moves"],
+                    "pushes": record["pushes"],
+                }
+                results.append(result)
+                if progress:
+                    progress(result)
+    results.sort(key=lambda result: (result["level_file"], result["algorithm"], result["level"]))
+
+    return {
+        "format": BENCHMARK_FORMAT,
+        "solver_version": SOLVER_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "zobrist_seed": ZOBRIST_SEED,
+            "mode": mode,
+            "heuristic": heuristic_method,
+            "exact": exact,
+            "time_limit": time_limit,
+            "node_limit": node_limit,
+            "memory_limit": memory_limit,
+            "jobs": jobs,
+        },
+        "summary": summarize(results),
+        "results": results,
+    }
+
+
+def summarize(results):
+    """Tổng hợp theo thuật toán: số level giải được, tổng thời gian và tổng số node"""
+    summary = {}
+    for result in results:
+        entry = summary.setdefault(result["algorithm"], {"levels": 0, "solved": 0, "time": 0.0, "nodes": 0})
+        entry["levels"] += 1
+        entry["solved"] += result["status"] == "solved"
+        entry["time"] += result["time"] or 0.0
+        entry["nodes"] += result["nodes"] or 0
+    return summary
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    So sánh hai kết quả benchmark theo từng (file, level, thuật toán) có mặt ở cả hai
+    Trả về list các regression: level không còn giải được, hoặc chỉ số tăng quá (1 + threshold) lần
+    """
+    if baseline.get("format") != BENCHMARK_FORMAT:
+        raise ValueError(f"Unsupported baseline format: {baseline.get('format')}")
+    previous = {(result["level_file"], result["level"], result["algorithm"]): result
+                for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = (result["level_file"], result["level"], result["algorithm"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        if old["status"] == "solved" and result["status"] != "solved":
+            regressions.append({"level_file": key[0], "level": key[1], "algorithm": key[2], "metric": "status",
+                                "baseline": old["status"], "current": result["status"]})
+            continue
+        if old["status"] != "solved":
+            continue
+        for metric, min_delta in COMPARED_METRICS:
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > min_delta:
+                regressions.append({"level_file": key[0], "level": key[1], "algorithm": key[2], "metric": metric,
+                                    "baseline": before, "current": after,
+                                    "ratio": after / before if before else None})
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sokoban_solver.benchmark",
+                                     description="Benchmark solvers on level collections and compare with a baseline")
+    parser.add_argument("--level-files", nargs="+", default=DEFAULT_LEVEL_FILES)
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=["bfs", "astar"])
+    parser.add_argument("-l", "--levels", nargs="*", default=[],
+                        help="level numbers in every file, ranges like 5-8 allowed (default: all)")
+    parser.add_argument("-m", "--mode", choices=SEARCH_MODES, default=SEARCH_MODES[0])
+    parser.add_argument("--heuristic", choices=HEURISTIC_METHODS, default=HEURISTIC_METHODS[0])
+    parser.add_argument("--exact", action="store_true")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds per level (default: 60)")
+    parser.add_argument("--node-limit", type=int, help="expanded nodes per level")
+    parser.add_argument("--memory-limit", type=float, help="memory limit per level in MB")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="levels solved in parallel (default: 1, keeps timings comparable)")
+    parser.add_argument("-o", "--output", help="JSON results file (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative increase before a metric counts as a regression (default: 0.2)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if "hda" in args.algorithms:
+        print("Error: hda cannot run inside the benchmark process pool", file=sys.stderr)
+        return 2
+
+    def progress(result):
+        print(f"{result['level_file']} #{result['level']:<3} {result['algorithm']:<8} {result['status']:<12} "
+              f"{result['time'] or 0:8.3f}s {result['nodes'] or 0:>10} nodes", file=sys.stderr)
+
+    try:
+        current = run_benchmark(args.level_files, args.algorithms, args.levels, args.mode, args.heuristic,
+                                args.exact, args.time_limit, args.node_limit, args.memory_limit, args.jobs,
+                                progress)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        current["baseline"] = {"file": args.baseline, "solver_version": baseline.get("solver_version"),
+                               "threshold": args.threshold, "regressions": regressions}
+        for regression in regressions:
+            print(f"REGRESSION {regression['level_file']} #{regression['level']} {regression['algorithm']}: "
+                  f"{regression['metric']} {regression['baseline']} -> {regression['current']}", file=sys.stderr)
+        print(f"{len(regressions)} regression(s) against {args.baseline}", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Tìm kiếm hai chiều: BFS đẩy box từ trạng thái đầu gặp BFS kéo box ngược từ các trạng thái đích
+Mỗi bên mở rộng cả một tầng, luôn chọn bên có frontier nhỏ hơn; với lời giải dài d nước đẩy
+số node cỡ 2·b^(d/2) thay vì b^d. Hai bên dùng chung khóa Zobrist (player đã chuẩn hóa) nên
+một trạng thái sinh ra ở bên này được tra thẳng trong bảng của bên kia
+"""
+import time
+
+from .constants import SEARCH_MODES
+from .memory import MemoryMonitor
+from .search import SearchLimits, _finish, _start
+from .state import SearchTree, StateTable
+
+
+def _pull_actions(tree, node):
+    """Dãy nước đẩy xuôi từ node của cây ngược tới trạng thái đích (gốc có hướng -1)"""
+    actions = []
+    while tree.directions[node] >= 0:
+        actions.append((tree.pushed[node], tree.directions[node]))
+        node = tree.parents[node]
+    return actions
+
+
+def solve_bidirectional(matrix, mode=SEARCH_MODES[0], exact=False, time_limit=None, node_limit=None):
+    """
+    BFS hai chiều tối ưu theo số nước đẩy, trả về (solution_path, stats) giống solve_bfs
+    Chỉ hỗ trợ mode "push" vì tìm kiếm ngược kéo từng box
+    """
+    if mode != "push":
+        raise ValueError("Bidirectional search only supports push mode")
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    limits = SearchLimits(time_limit, node_limit, monitor=monitor)
+    nodes_explored = 0
+    solution_path = None
+    status = None
+
+    level, initial_state, _ = _start(matrix, mode)
+    # Bảng mỗi bên: trạng thái -> node id trong cây của bên đó
+    forward_tree = SearchTree(True)
+    forward_table = StateTable(exact)
+    forward_table.set(initial_state, 0)
+    forward_frontier = [(0, initial_state)]
+
+    # Cây ngược: node 0 không dùng, mỗi trạng thái đích là một gốc riêng (hướng -1)
+    backward_tree = SearchTree(True)
+    backward_table = StateTable(exact)
+    backward_frontier = []
+    for goal_state in level.goal_states():
+        if backward_table.add(goal_state):
+            node = backward_tree.add(0, (0, -1))
+            backward_table.set(goal_state, node)
+            backward_frontier.append((node, goal_state))
+
+    # Lời giải tốt nhất: (số nước đẩy, node cây xuôi, nước đẩy nối, node cây ngược)
+    best = None
+    meeting = backward_table.get(initial_state)
+    if meeting is not None:
+        best = (0, 0, None, meeting)
+    elif level.is_deadlock(initial_state.boxes):
+        forward_frontier = []
+    forward_depth = backward_depth = 0
+
+    # Luôn mở rộng trọn một tầng rồi mới dừng: so sánh mọi điểm gặp trong tầng để lời giải ngắn nhất
+    while best is None and forward_frontier and backward_frontier:
+        forward = len(forward_frontier) <= len(backward_frontier)
+        frontier = forward_frontier if forward else backward_frontier
+        next_frontier = []
+        for node, current_state in frontier:
+            nodes_explored += 1
+            status = limits.exceeded(nodes_explored)
+            if status:
+                nodes_explored -= 1  # node này chưa được mở rộng
+                break
+            if forward:
+                for action, new_state in level.push_successors(current_state):
+                    if new_state in forward_table:
+                        continue
+                    meeting = backward_table.get(new_state)
+                    if meeting is not None:
+                        length = forward_depth + 1 + backward_tree.depth(meeting)
+                        if best is None or length < best[0]:
+                            best = (length, node, action, meeting)
+                        continue
+                    new_node = forward_tree.add(node, action)
+                    forward_table.set(new_state, new_node)
+                    next_frontier.append((new_node, new_state))
+            else:
+                for action, new_state in level.pull_successors(current_state):
+                    if new_state in backward_table:
+                        continue
+                    meeting = forward_table.get(new_state)
+                    if meeting is not None:
+                        length = forward_tree.depth(meeting) + 1 + backward_depth
+                        if best is None or length < best[0]:
+                            best = (length, meeting, action, node)
+                        continue
+                    new_node = backward_tree.add(node, action)
+                    backward_table.set(new_state, new_node)
+                    next_frontier.append((new_node, new_state))
+        if status:
+            break
+        if forward:
+            forward_frontier = next_frontier
+            forward_depth += 1
+        else:
+            backward_frontier = next_frontier
+            backward_depth += 1
+
+    # Khi dừng giữa tầng vì vượt giới hạn, điểm gặp đã thấy chưa chắc tối ưu nên bỏ qua
+    if best is not None and status is None:
+        _, forward_node, action, backward_node = best
+        actions = forward_tree.actions(forward_node)
+        if action is not None:
+            actions.append(action)
+        actions.extend(_pull_actions(backward_tree, backward_node))
+        solution_path = level.solution_moves(actions, mode)
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status,
+                    {"frontier": (forward_frontier, backward_frontier),
+                     "closed": (forward_table, backward_table), "tree": (forward_tree, backward_tree)})
+    return solution_path, stats
+
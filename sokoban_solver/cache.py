@@ -0,0 +1,133 @@
+"""
+Bộ nhớ đệm lời giải trên đĩa (SQLite): giải lại cùng một level với cùng thuật toán trả về ngay kết quả đã lưu
+Khóa là hash của bố cục level đã chuẩn hóa, thuật toán, các tùy chọn ảnh hưởng tới lời giải và SOLVER_VERSION.
+Số bản ghi bị giới hạn, bản ghi lâu không dùng nhất bị xóa trước (LRU)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .constants import HEURISTIC_METHODS, SEARCH_MODES, SOLVER_VERSION
+from .matrix import lurd_to_moves, moves_to_lurd
+from .search import solve
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sokoban_solver", "solutions.sqlite")
+DEFAULT_MAX_ENTRIES = 10000
+
+# Chỉ lưu kết quả không phụ thuộc giới hạn thời gian/node/bộ nhớ
+CACHEABLE_STATUSES = ("solved", "no_solution")
+# anytime trả về lời giải tốt nhất trong thời gian cho phép nên kết quả thay đổi theo time_limit
+UNCACHEABLE_ALGORITHMS = ("anytime",)
+
+
+def canonical_layout(matrix):
+    """Bố cục level dạng chuỗi, bỏ khoảng trắng cuối dòng và dòng trống ở đầu/cuối"""
+    rows = [''.join(row).rstrip() for row in matrix]
+    while rows and not rows[0]:
+        rows.pop(0)
+    while rows and not rows[-1]:
+        rows.pop()
+    return '\n'.join(rows)
+
+
+class SolutionCache:
+    """
+    Bảng solutions(key, moves, stats, last_used) trong một file SQLite, mở được đồng thời từ nhiều tiến trình
+    moves là lời giải dạng LURD (NULL nếu không có lời giải), stats là thống kê của lần giải gốc (JSON)
+    Thời điểm dùng của các lần tra trúng được giữ trong RAM và ghi cùng lần ghi kế tiếp (put/close)
+    để lần tra trúng chỉ là một câu SELECT
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.touched = {}  # key -> last_used chưa ghi xuống đĩa
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        # WAL: đọc không bị chặn bởi tiến trình đang ghi, commit không cần fsync mỗi lần
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "key TEXT PRIMARY KEY, moves TEXT, stats TEXT NOT NULL, last_used REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def key(matrix, algorithm, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0]):
+        """Khóa SHA-256 của (bố cục chuẩn hóa, thuật toán, mode, exact, heuristic, phiên bản solver)"""
+        text = '\0'.join([canonical_layout(matrix), algorithm, mode, str(bool(exact)), heuristic_method,
+                          SOLVER_VERSION])
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def get(self, matrix, algorithm, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0]):
+        """Trả về (solution_path, stats) đã lưu, stats["cached"] = True; None nếu chưa có"""
+        key = self.key(matrix, algorithm, mode, exact, heuristic_method)
+        row = self.connection.execute("SELECT moves, stats FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.touched[key] = time.time()
+        moves, stats = row
+        stats = json.loads(stats)
+        stats["cached"] = True
+        return (lurd_to_moves(moves) if moves is not None else None), stats
+
+    def put(self, matrix, algorithm, mode, exact, heuristic_method, solution_path, stats):
+        """Lưu kết quả nếu không phụ thuộc giới hạn (xem CACHEABLE_STATUSES), rồi xóa bớt theo LRU"""
+        if algorithm in UNCACHEABLE_ALGORITHMS or stats.get("status") not in CACHEABLE_STATUSES:
+            return False
+        key = self.key(matrix, algorithm, mode, exact, heuristic_method)
+        moves = moves_to_lurd(matrix, solution_path) if solution_path is not None else None
+        stats = {name: value for name, value in stats.items() if name != "cached"}
+        self._write_touched()
+        self.connection.execute("INSERT OR REPLACE INTO solutions (key, moves, stats, last_used) VALUES (?, ?, ?, ?)",
+                                (key, moves, json.dumps(stats), time.time()))
+        self.connection.execute(
+            "DELETE FROM solutions WHERE key IN "
+            "(SELECT key FROM solutions ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+        self.connection.commit()
+        return True
+
+    def _write_touched(self):
+        if self.touched:
+            self.connection.executemany("UPDATE solutions SET last_used = ? WHERE key = ?",
+                                        [(last_used, key) for key, last_used in self.touched.items()])
+            self.touched = {}
+
+    def clear(self):
+        self.touched = {}
+        self.connection.execute("DELETE FROM solutions")
+        self.connection.commit()
+
+    def close(self):
+        self._write_touched()
+        self.connection.commit()
+        self.connection.close()
+
+
+def solve_cached(cache, matrix, algorithm, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+                 time_limit=None, node_limit=None, **options):
+    """
+    Như solve() nhưng tra cache trước và lưu kết quả sau khi giải; cache None thì chỉ giải
+    options: các tham số còn lại của solve() (workers, table_size, memory_limit, work_dir, profile, macros...)
+    Khi profile thì luôn giải lại: số liệu profile là của từng lần chạy
+    """
+    if options.get("profile") or options.get("profile_path"):
+        cache = None
+    # Lời giải dùng nước đẩy gộp có thể khác lời giải thường nên được lưu dưới tên thuật toán riêng
+    cache_algorithm = f"{algorithm}+macros" if options.get("macros") else algorithm
+    if cache is not None:
+        result = cache.get(matrix, cache_algorithm, mode, exact, heuristic_method)
+        if result is not None:
+            return result
+    solution_path, stats = solve(matrix, algorithm, mode, exact, heuristic_method, time_limit, node_limit, **options)
+    if cache is not None:
+        cache.put(matrix, cache_algorithm, mode, exact, heuristic_method, solution_path, stats)
+    return solution_path, stats
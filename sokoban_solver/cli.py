@@ -0,0 +1,163 @@
+"""
+Giao diện dòng lệnh: giải các level trong một file và ghi lời giải + thống kê ra JSON
+
+    python -m sokoban_solver MicroCosmos.txt --levels 1 3 5-8 --algorithm astar --output result.json
+    python -m sokoban_solver MiniCosmos.txt --batch --jobs 4 --time-limit 60 --memory-limit 2048
+    python -m sokoban_solver MiniCosmos.txt --levels 40 --algorithm hda --workers 4
+    python -m sokoban_solver MiniCosmos.txt --algorithm ida --table-size 1000000 --memory-limit 256
+    python -m sokoban_solver MiniCosmos.txt --levels 12 --profile --profile-out level12.prof
+"""
+import argparse
+import json
+import os
+import sys
+
+from .constants import ALGORITHMS, HEURISTIC_METHODS, SEARCH_MODES
+from .batch import solution_record, solve_batch
+from .analysis import set_cache_dir
+from .cache import DEFAULT_CACHE_PATH, SolutionCache, solve_cached
+from .collection import LevelCollection
+
+
+def parse_level_numbers(values, level_count):
+    """Chuyển các đối số dạng "3" hoặc "5-8" (đánh số từ 1) thành list chỉ số level"""
+    if not values:
+        return list(range(level_count))
+    indices = []
+    for value in values:
+        first, _, last = value.partition('-')
+        start = int(first)
+        end = int(last) if last else start
+        for number in range(start, end + 1):
+            if not 1 <= number <= level_count:
+                raise ValueError(f"Level {number} out of range 1-{level_count}")
+            indices.append(number - 1)
+    return indices
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sokoban_solver",
+                                     description="Headless Sokoban solver (BFS / A*) writing JSON results")
+    parser.add_argument("level_file", help="level collection file (e.g. MicroCosmos.txt)")
+    parser.add_argument("-l", "--levels", nargs="*", default=[],
+                        help="level numbers starting at 1, ranges like 5-8 allowed (default: all)")
+    parser.add_argument("-a", "--algorithm", choices=ALGORITHMS, default="astar")
+    parser.add_argument("-m", "--mode", choices=SEARCH_MODES, default=SEARCH_MODES[0])
+    parser.add_argument("--heuristic", choices=HEURISTIC_METHODS, default=HEURISTIC_METHODS[0])
+    parser.add_argument("--exact", action="store_true",
+                        help="compare full states on Zobrist key collisions")
+    parser.add_argument("--macros", action="store_true",
+                        help="tunnel and goal-room macro pushes (bfs, astar with --mode push): fewer nodes, "
+                             "but solutions may use more pushes than optimal")
+    parser.add_argument("-o", "--output", help="JSON output file (default: stdout)")
+    parser.add_argument("--time-limit", type=float, help="seconds per level")
+    parser.add_argument("--node-limit", type=int, help="expanded nodes per level")
+    parser.add_argument("--batch", action="store_true",
+                        help="solve levels in a process pool and stream one JSON line per finished level")
+    parser.add_argument("-j", "--jobs", type=int, help="batch worker processes (default: one per core)")
+    parser.add_argument("--memory-limit", type=float,
+                        help="memory limit per level in MB (batch workers, IDA* ceiling)")
+    parser.add_argument("--table-size", type=int,
+                        help="IDA* transposition table slots, 0 disables it "
+                             "(default: half of --memory-limit, or 32 MB without it)")
+    parser.add_argument("--work-dir", help="directory for external BFS layer files (default: system temp)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help=f"solution cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="always solve, do not read or write the cache")
+    parser.add_argument("--analysis-cache",
+                        help="directory for per-level static analysis files shared by runs and batch workers")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="processes for one level with --algorithm hda (default: one per core)")
+    parser.add_argument("--profile", action="store_true",
+                        help="per-phase timers and counters in the results (bfs, astar); bypasses the cache")
+    parser.add_argument("--profile-out",
+                        help="write a cProfile/pstats file per solved level (FILE.levelN.ext for several levels)")
+    return parser
+
+
+def profile_path(path, level_number, several):
+    """File pstats của một level: chèn số level trước phần mở rộng khi giải nhiều level"""
+    if not path or not several:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.level{level_number}{extension}"
+
+
+def run_batch(args, levels, indices):
+    """Chế độ batch: mỗi level giải xong được ghi ngay thành một dòng JSON (JSON Lines)"""
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for record in solve_batch(levels, indices, args.algorithm, args.mode, args.exact, args.heuristic,
+                                  args.time_limit, args.node_limit, args.memory_limit, args.jobs,
+                                  args.table_size, args.work_dir, None if args.no_cache else args.cache,
+                                  args.analysis_cache, args.macros):
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        levels = LevelCollection(args.level_file)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    try:
+        indices = parse_level_numbers(args.levels, len(levels))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.analysis_cache:
+        set_cache_dir(args.analysis_cache)
+
+    if args.algorithm == "bidir" and args.mode != "push":
+        print("Error: --algorithm bidir only supports --mode push", file=sys.stderr)
+        return 2
+
+    if args.batch:
+        if args.algorithm == "hda":
+            # worker của process pool không được tạo tiến trình con
+            print("Error: --algorithm hda cannot be combined with --batch", file=sys.stderr)
+            return 2
+        if args.profile or args.profile_out:
+            print("Error: --profile/--profile-out cannot be combined with --batch", file=sys.stderr)
+            return 2
+        return run_batch(args, levels, indices)
+
+    cache = None if args.no_cache else SolutionCache(args.cache)
+    results = []
+    try:
+        for index in indices:
+            matrix = levels[index]
+            solution_path, stats = solve_cached(cache, matrix, args.algorithm, args.mode, args.exact,
+                                                args.heuristic, args.time_limit, args.node_limit,
+                                                workers=args.workers, table_size=args.table_size,
+                                                memory_limit=args.memory_limit, work_dir=args.work_dir,
+                                                profile=args.profile, macros=args.macros,
+                                                profile_path=profile_path(args.profile_out, index + 1,
+                                                                          len(indices) > 1))
+            results.append(solution_record(matrix, index + 1, solution_path, stats))
+    finally:
+        if cache is not None:
+            cache.close()
+
+    output = {
+        "level_file": args.level_file,
+        "algorithm": args.algorithm,
+        "mode": args.mode,
+        "heuristic": args.heuristic,
+        "macros": args.macros,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
@@ -0,0 +1,237 @@
+"""
+Bộ level đọc lười từ file: một lượt quét tạo chỉ mục (vị trí byte, độ dài, tiêu đề) của từng level, level chỉ được
+phân tích khi được chọn hoặc gửi cho worker. Chỉ mục được lưu cạnh file (FILE.idx) và tạo lại khi file đổi mtime/kích
+thước, nên mở một bộ hàng nghìn level không phải đọc lại cả file
+
+Hỗ trợ định dạng "Level N" của các file đi kèm và định dạng XSB/SOK chuẩn:
+- '-' và '_' là sàn, 'p'/'P' là player, 'b'/'B' là box (trên sàn/trên dock)
+- dòng nén run-length ("4#" = "####", '|' ngăn cách các dòng)
+- dòng chú thích bắt đầu bằng ';', tiêu đề là "Title: ..." hoặc dòng chữ ngay trước bàn chơi, các dòng
+  "Key: value" khác (Author, Comment...) và khối "Comment:" ... "Comment-End:" được bỏ qua
+"""
+import json
+import os
+
+# Phiên bản định dạng file chỉ mục
+INDEX_FORMAT = 2
+INDEX_SUFFIX = ".idx"
+
+# Ký tự được phép trong một dòng bàn chơi (kể cả dạng nén run-length)
+BOARD_CHARS = frozenset(" #@+$*.-_pPbB0123456789|")
+# Ký tự XSB/SOK -> ký tự của ma trận
+_CELL_ALIASES = {'-': ' ', '_': ' ', 'p': '@', 'P': '+', 'b': '$', 'B': '*'}
+
+
+def board_rows(line):
+    """
+    Các dòng của ma trận nếu line (đã bỏ xuống dòng) là một dòng bàn chơi, ngược lại None
+    Dòng bàn chơi chỉ gồm ký tự bàn chơi, số đếm run-length luôn đứng trước một ô và mỗi dòng giải nén
+    bắt đầu, kết thúc bằng tường, nên tiêu đề như "#3" không bị coi là một phần của bàn chơi
+    """
+    text = line.rstrip()
+    if '#' not in text or not all(char in BOARD_CHARS for char in text):
+        return None
+    if text[-1].isdigit() or any(char.isdigit() and following == '|' for char, following in zip(text, text[1:])):
+        return None
+    rows = expand_row(text)
+    for row in rows:
+        row = row.strip()
+        if not row or row[0] != '#' or row[-1] != '#':
+            return None
+    return rows
+
+
+def _is_solid(row):
+    """Dòng chỉ có tường (bỏ khoảng trống ngoài bàn chơi ở hai đầu): chỉ có thể là dòng đầu hoặc dòng cuối"""
+    return set(row.strip()) == {'#'}
+
+
+def expand_row(line):
+    """Giải nén một dòng run-length ("3#-2$" -> "### $$"), '|' tách thành nhiều dòng; trả về list các dòng"""
+    rows = []
+    row = []
+    count = ''
+    for char in line:
+        if char.isdigit():
+            count += char
+        elif char == '|':
+            rows.append(''.join(row))
+            row = []
+            count = ''
+        else:
+            row.append(_CELL_ALIASES.get(char, char) * (int(count) if count else 1))
+            count = ''
+    rows.append(''.join(row))
+    return rows
+
+
+def parse_board(lines):
+    """Các dòng bàn chơi của một level -> ma trận ký tự"""
+    matrix = []
+    for line in lines:
+        for row in expand_row(line):
+            matrix.append(list(row))
+    return matrix
+
+
+def _meta_key(text):
+    """Tên khóa của dòng "Key: value" (chữ thường), None nếu không phải dạng đó"""
+    key, separator, _ = text.partition(':')
+    if separator and key and ' ' not in key.strip():
+        return key.strip().lower()
+    return None
+
+
+def build_index(path):
+    """
+    Quét file một lượt, trả về list [offset, length, title] theo byte của phần bàn chơi của từng level
+    Tiêu đề: "Title:" ngay sau bàn chơi (cùng đoạn) thuộc level đó; "Title:" hoặc dòng chữ đứng trước bàn chơi
+    (như "Level 3", "; 3") là của level kế tiếp
+    Bàn chơi kết thúc ở dòng chỉ có tường đứng sau các dòng có ô bên trong; các dòng chỉ có tường không thuộc
+    bàn chơi nào (như tiêu đề "###") được coi là dòng chữ
+    """
+    levels = []
+    pending_title = None  # tiêu đề cho bàn chơi kế tiếp
+    board_start = None  # offset dòng đầu của bàn chơi đang đọc
+    board_end = 0
+    board_text = None  # dòng cuối của bàn chơi đang đọc
+    board_open = False  # bàn chơi đang đọc đã có dòng có ô bên trong
+    board_closed = False  # ... và đã có dòng tường đóng lại sau đó
+    after_board = False  # đang ở đoạn ngay sau một bàn chơi (chưa gặp dòng trống)
+    in_comment = False
+    offset = 0
+    with open(path, 'rb') as file:
+        for raw in file:
+            line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+            line_start = offset
+            offset += len(raw)
+            if in_comment:
+                in_comment = _meta_key(line) != "comment-end"
+                continue
+
+            rows = board_rows(line)
+            if board_start is not None and (rows is None or board_closed):
+                if board_open:
+                    levels.append([board_start, board_end - board_start, pending_title])
+                    pending_title = None
+                    after_board = True
+                else:
+                    # Chỉ có dòng tường: không phải bàn chơi mà là tiêu đề của level kế tiếp
+                    pending_title = board_text
+                board_start = None
+            if rows is not None:
+                if board_start is None:
+                    board_start = line_start
+                    board_open = False
+                board_end = offset
+                board_text = line.strip()
+                if not all(_is_solid(row) for row in rows):
+                    board_open = True
+                board_closed = board_open and _is_solid(rows[-1])
+                continue
+
+            text = line.strip()
+            if not text:
+                after_board = False
+                continue
+            if text.startswith(';'):
+                text = text[1:].strip()
+                if text:
+                    pending_title = text
+                continue
+            key = _meta_key(text)
+            if key == "title":
+                title = text.partition(':')[2].strip()
+                if after_board:
+                    levels[-1][2] = title
+                else:
+                    pending_title = title
+            elif key == "comment" and not text.partition(':')[2].strip():
+                in_comment = True
+            elif key is None:
+                pending_title = text
+    if board_start is not None and board_open:
+        levels.append([board_start, board_end - board_start, pending_title])
+    return levels
+
+
+def _index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def read_index(path):
+    """
+    Chỉ mục của file level: đọc từ FILE.idx nếu còn khớp mtime và kích thước của file, ngược lại quét lại file
+    và ghi FILE.idx (bỏ qua nếu thư mục không ghi được)
+    """
+    info = os.stat(path)
+    signature = {"format": INDEX_FORMAT, "mtime_ns": info.st_mtime_ns, "size": info.st_size}
+    index_path = _index_path(path)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+        if all(cached.get(key) == value for key, value in signature.items()):
+            return cached["levels"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    levels = build_index(path)
+    temporary = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(dict(signature, levels=levels), file)
+        os.replace(temporary, index_path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+    return levels
+
+
+class LevelRef:
+    """Vị trí một level trong file: gửi cho worker thay cho ma trận, worker tự đọc bằng load()"""
+
+    __slots__ = ("path", "offset", "length")
+
+    def __init__(self, path, offset, length):
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    def load(self):
+        """Đọc và phân tích level, trả về ma trận ký tự"""
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(self.length)
+        return parse_board(data.decode('utf-8', errors='replace').splitlines())
+
+
+class LevelCollection:
+    """
+    Các level của một file, truy cập như list: collection[i] đọc và trả về một ma trận mới của level i,
+    len() là số level; chỉ có chỉ mục được giữ trong bộ nhớ
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = read_index(path)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, index):
+        return self.reference(index).load()
+
+    def __iter__(self):
+        for index in range(len(self.index)):
+            yield self[index]
+
+    def reference(self, index):
+        """LevelRef của level index (đánh số từ 0)"""
+        offset, length, _ = self.index[index]
+        return LevelRef(self.path, offset, length)
+
+    def title(self, index):
+        """Tiêu đề của level trong file, None nếu không có"""
+        return self.index[index][2]
@@ -0,0 +1,28 @@
+"""
+Hằng số dùng chung của solver
+"""
+
+# Các hướng di chuyển theo thứ tự của get_valid_moves: left, right, up, down
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+OPPOSITE = [1, 0, 3, 2]  # chỉ số hướng ngược lại của DIRECTIONS[d]
+
+# Chế độ tìm kiếm: "move" mở rộng từng bước đi, "push" chỉ mở rộng các nước đẩy box
+SEARCH_MODES = ["push", "move"]
+
+# Phương pháp tính heuristic của A*: ghép cặp tối ưu (Hungarian) hoặc cận dưới tham lam
+HEURISTIC_METHODS = ["hungarian", "greedy"]
+# Khoảng cách "vô cực": box không thể tới dock
+INFINITE_COST = 1 << 20
+
+# Phiên bản solver: đổi khi lời giải/thống kê của solver thay đổi để bộ nhớ đệm lời giải cũ không còn được dùng
+SOLVER_VERSION = "1.0.0"
+
+# Seed cố định cho bảng Zobrist để số node/thứ tự duyệt lặp lại được giữa các lần chạy
+ZOBRIST_SEED = 0
+
+# Các thuật toán solver hỗ trợ, "hda" là A* song song trên nhiều tiến trình (parallel.py),
+# "bidir" là BFS hai chiều đẩy xuôi/kéo ngược (bidirectional.py, chỉ chế độ "push"),
+# "ida" là IDA* với bộ nhớ tuyến tính theo độ sâu (ida.py),
+# "anytime" là weighted A* giảm dần trọng số, trả về lời giải tốt nhất trong thời gian cho phép (anytime.py),
+# "external" là BFS với frontier/visited trên đĩa (external.py)
+ALGORITHMS = ["bfs", "astar", "hda", "bidir", "ida", "anytime", "external"]
@@ -0,0 +1,74 @@
+"""
+Phát hiện deadlock cục bộ (freeze, 2x2 block) quanh box vừa bị đẩy
+"""
+
+
+class DeadlockDetector:
+    """
+    Phát hiện deadlock cục bộ quanh box vừa bị đẩy, dùng tập box của trạng thái gọn:
+    - 2x2 block: box nằm trong một khối 2x2 toàn tường/box và có box chưa vào dock
+    - Freeze: box bị chặn theo cả hai trục (bởi tường, ô chết hoặc box khác cũng bị đóng băng)
+      và trong nhóm box bị đóng băng có box chưa vào dock
+    """
+
+    def __init__(self, level):
+        self.level = level
+        # Độ lệch chỉ số ô theo DIRECTIONS: left, right, up, down
+        self.offsets = [-1, 1, -level.width, level.width]
+
+    def is_deadlock(self, box_set, box):
+        """Kiểm tra deadlock sau khi box vừa được đẩy tới ô box"""
+        return self.is_block_deadlock(box_set, box) or self.is_freeze_deadlock(box_set, box)
+
+    def is_block_deadlock(self, box_set, box):
+        """Box thuộc một khối 2x2 mà 4 ô đều là tường hoặc box, và có box chưa vào dock"""
+        walls = self.level.walls
+        docks = self.level.docks
+        offsets = self.offsets
+        for horizontal in (offsets[0], offsets[1]):
+            for vertical in (offsets[2], offsets[3]):
+                square = (box, box + horizontal, box + vertical, box + horizontal + vertical)
+                if not all(walls[cell] or cell in box_set for cell in square):
+                    continue
+                if any(cell in box_set and not docks[cell] for cell in square):
+                    return True
+        return False
+
+    def is_freeze_deadlock(self, box_set, box):
+        """Box bị đóng băng (không thể di chuyển nữa) và nhóm box đóng băng có box chưa vào dock"""
+        frozen = []
+        if not self._is_frozen(box, box_set, set(), frozen):
+            return False
+        docks = self.level.docks
+        return any(not docks[cell] for cell in frozen)
+
+    def _is_frozen(self, box, box_set, as_walls, frozen):
+        """Box bị chặn theo cả trục ngang và trục dọc; các box đang xét được coi như tường"""
+        as_walls.add(box)
+        mark = len(frozen)
+        if self._is_blocked(box, 0, box_set, as_walls, frozen) and \
+                self._is_blocked(box, 2, box_set, as_walls, frozen):
+            frozen.append(box)
+            return True
+        # Box không bị đóng băng: bỏ giả định tường, và các box được xác định đóng băng
+        # dựa trên giả định đó cũng không còn đúng
+        as_walls.discard(box)
+        del frozen[mark:]
+        return False
+
+    def _is_blocked(self, box, axis, box_set, as_walls, frozen):
+        """Box bị chặn theo trục axis (0: ngang, 2: dọc)"""
+        neighbours = self.level.neighbours[box]
+        first, second = neighbours[axis], neighbours[axis + 1]
+        # Một bên là tường (hoặc box đang được coi như tường)
+        if first < 0 or second < 0 or first in as_walls or second in as_walls:
+            return True
+        # Cả hai bên đều là ô chết: đẩy theo trục này cũng vô ích
+        dead_squares = self.level.dead_squares
+        if dead_squares[first] and dead_squares[second]:
+            return True
+        # Một bên là box cũng bị đóng băng
+        for cell in (first, second):
+            if cell in box_set and self._is_frozen(cell, box_set, as_walls, frozen):
+                return True
+        return False
@@ -0,0 +1,225 @@
+"""
+BFS ngoài bộ nhớ (external-memory BFS): frontier và tập visited nằm trên đĩa thay vì trong RAM
+Mỗi tầng độ sâu là một file các bản ghi trạng thái đóng gói (uint16 big-endian: các box rồi player) đã sắp xếp,
+nên thứ tự byte cũng là thứ tự của trạng thái. Successor của một tầng được gom vào bộ đệm nhỏ, sắp xếp rồi ghi
+thành các run; các run được trộn (k-way merge) và loại trùng bằng cách trộn song song với file visited đã sắp xếp
+(delayed duplicate detection). Bản ghi là trạng thái đầy đủ nên không có trùng khóa, số bước vẫn tối ưu.
+Đường đi được dựng lại bằng cách lần ngược qua các file tầng
+"""
+import heapq
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from .constants import SEARCH_MODES
+from .memory import MemoryMonitor
+from .search import SearchLimits, _finish, _start
+
+# Số bản ghi tối đa trong bộ đệm successor trước khi ghi ra một run
+BUFFER_RECORDS = 1 << 16
+# Số bản ghi đọc/ghi mỗi lần truy cập file
+IO_RECORDS = 4096
+# Số run tối đa được trộn cùng lúc (giới hạn số file mở)
+MERGE_FAN_IN = 64
+
+
+def _read_records(path, record_size):
+    """Đọc tuần tự các bản ghi kích thước record_size của một file"""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(record_size * IO_RECORDS)
+            if not chunk:
+                return
+            for offset in range(0, len(chunk), record_size):
+                yield chunk[offset:offset + record_size]
+
+
+def _write_run(path, records):
+    """Sắp xếp bộ đệm, bỏ trùng và ghi thành một run"""
+    records.sort()
+    unique = []
+    last = None
+    for record in records:
+        if record != last:
+            unique.append(record)
+            last = record
+    with open(path, 'wb') as file:
+        file.write(b''.join(unique))
+
+
+def _merge_files(paths, out_path, record_size, exclude_path=None):
+    """
+    Trộn các file đã sắp xếp thành out_path (đã sắp xếp, không trùng), bỏ các bản ghi có trong exclude_path
+    Trả về số bản ghi được ghi
+    """
+    merged = heapq.merge(*[_read_records(path, record_size) for path in paths])
+    excluded = _read_records(exclude_path, record_size) if exclude_path else iter(())
+    current_excluded = next(excluded, None)
+    count = 0
+    last = None
+    buffer = []
+    with open(out_path, 'wb') as file:
+        for record in merged:
+            if record == last:
+                continue
+            last = record
+            while current_excluded is not None and current_excluded < record:
+                current_excluded = next(excluded, None)
+            if current_excluded == record:
+                continue
+            buffer.append(record)
+            count += 1
+            if len(buffer) >= IO_RECORDS:
+                file.write(b''.join(buffer))
+                buffer = []
+        file.write(b''.join(buffer))
+    return count
+
+
+class _LayerFiles:
+    """Đặt tên và dọn các file tạm (tầng, run, visited) trong thư mục làm việc"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.counter = 0
+
+    def path(self, prefix):
+        self.counter += 1
+        return os.path.join(self.directory, f"{prefix}_{self.counter}.bin")
+
+    def size_mb(self, paths):
+        return sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+
+
+def solve_external_bfs(matrix, mode=SEARCH_MODES[0], time_limit=None, node_limit=None, work_dir=None,
+                       buffer_records=BUFFER_RECORDS):
+    """
+    BFS với frontier/visited trên đĩa, trả về (solution_path, stats) giống solve_bfs
+    work_dir: thư mục chứa file tạm (mặc định thư mục tạm của hệ thống), được xóa khi giải xong
+    buffer_records: số bản ghi successor giữ trong RAM trước khi ghi ra đĩa
+    stats có thêm "disk": dung lượng file tạm lớn nhất (MB) và "depth": độ sâu của lời giải
+    (số tầng đã sinh nếu không có lời giải)
+    """
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    limits = SearchLimits(time_limit, node_limit, monitor=monitor)
+    nodes_explored = 0
+    solution_path = None
+    status = None
+
+    level, initial_state, successors = _start(matrix, mode)
+    if level.width * level.height > 0xFFFF:
+        raise ValueError("Level too large for 16-bit packed states")
+    packer = struct.Struct(f">{len(initial_state.boxes) + 1}H")
+    record_size = packer.size
+
+    def pack(state):
+        return packer.pack(*state.boxes, state.player)
+
+    def unpack(record):
+        values = packer.unpack(record)
+        return level.make_state(values[:-1], values[-1])
+
+    directory = tempfile.mkdtemp(prefix="sokoban_bfs_", dir=work_dir)
+    files = _LayerFiles(directory)
+    disk_peak = 0.0
+    depth = 0
+    try:
+        layers = [files.path("layer")]
+        with open(layers[0], 'wb') as file:
+            file.write(pack(initial_state))
+        visited = files.path("visited")
+        shutil.copyfile(layers[0], visited)
+
+        goal = pack(initial_state) if level.is_goal(initial_state.boxes) else None
+        while goal is None and status is None:
+            # 1. Mở rộng tầng hiện tại, successor được ghi thành các run đã sắp xếp
+            runs = []
+            buffer = []
+            for record in _read_records(layers[-1], record_size):
+                nodes_explored += 1
+                status = limits.exceeded(nodes_explored)
+                if status:
+                    nodes_explored -= 1  # node này chưa được mở rộng
+                    break
+                current_state = unpack(record)
+                if nodes_explored == 1 and level.is_deadlock(current_state.boxes):
+                    continue
+                for _, new_state in successors(current_state):
+                    if level.is_goal(new_state.boxes):
+                        goal = pack(new_state)
+                        break
+                    buffer.append(pack(new_state))
+                if goal is not None:
+                    break
+                if len(buffer) >= buffer_records:
+                    runs.append(files.path("run"))
+                    _write_run(runs[-1], buffer)
+                    buffer = []
+            if goal is not None or status:
+                for run in runs:
+                    os.remove(run)
+                break
+            if buffer:
+                runs.append(files.path("run"))
+                _write_run(runs[-1], buffer)
+                buffer = []
+
+            # 2. Trộn các run theo nhóm MERGE_FAN_IN, lần trộn cuối bỏ các trạng thái đã có trong visited
+            while len(runs) > MERGE_FAN_IN:
+                merged_runs = []
+                for index in range(0, len(runs), MERGE_FAN_IN):
+                    group = runs[index:index + MERGE_FAN_IN]
+                    merged_runs.append(files.path("run"))
+                    _merge_files(group, merged_runs[-1], record_size)
+                    for run in group:
+                        os.remove(run)
+                runs = merged_runs
+            next_layer = files.path("layer")
+            count = _merge_files(runs, next_layer, record_size, visited)
+            disk_peak = max(disk_peak, files.size_mb(layers + runs + [visited, next_layer]))
+            for run in runs:
+                os.remove(run)
+            if count == 0:
+                os.remove(next_layer)
+                break  # Không còn trạng thái mới: không có lời giải
+
+            # 3. visited mới = visited ∪ tầng mới
+            new_visited = files.path("visited")
+            _merge_files([visited, next_layer], new_visited, record_size)
+            os.remove(visited)
+            visited = new_visited
+            layers.append(next_layer)
+        depth = len(layers) - 1
+
+        if goal is not None:
+            # Lần ngược: ở mỗi tầng tìm một trạng thái có successor là trạng thái đích hiện tại
+            actions = []
+            target = goal
+            for layer in reversed(layers):
+                if target == pack(initial_state):
+                    break
+                for record in _read_records(layer, record_size):
+                    found = None
+                    for action, new_state in successors(unpack(record)):
+                        if pack(new_state) == target:
+                            found = action
+                            break
+                    if found is not None:
+                        actions.append(found)
+                        target = record
+                        break
+            actions.reverse()
+            # Đích có thể được tìm thấy khi đang sinh tầng kế tiếp, sâu hơn tầng cuối một tầng
+            depth = len(actions)
+            solution_path = level.solution_moves(actions, mode)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status)
+    stats["disk"] = disk_peak
+    stats["depth"] = depth
+    return solution_path, stats
@@ -0,0 +1,151 @@
+"""
+Heuristic cho A*: bảng khoảng cách đẩy tính sẵn và ghép cặp box/dock (Hungarian hoặc tham lam)
+"""
+from .constants import HEURISTIC_METHODS, INFINITE_COST
+
+
+def _move_item(values, i, j, value):
+    """Bỏ phần tử thứ i của tuple và chèn value vào vị trí j (giữ thứ tự song song với boxes đã sắp xếp)"""
+    values = values[:i] + values[i + 1:]
+    return values[:j] + (value,) + values[j:]
+
+
+class HeuristicEngine:
+    """
+    Heuristic cho A* dựa trên số nước đẩy thực sự (có tính tường) từ mỗi ô tới mỗi dock
+    Bảng khoảng cách được tính một lần mỗi bố cục level bằng BFS kéo ngược box từ từng dock (xem LevelAnalysis)
+    method: "hungarian" - ghép cặp box/dock chi phí nhỏ nhất (mỗi dock nhận một box)
+            "greedy"    - cận dưới nhanh: tổng khoảng cách từ mỗi box tới dock gần nhất
+    Cả hai đều admissible cho cả số nước đẩy lẫn số bước đi
+    """
+
+    def __init__(self, level, method=HEURISTIC_METHODS[0]):
+        if method not in HEURISTIC_METHODS:
+            raise ValueError(f"Unknown heuristic method: {method}")
+        self.level = level
+        self.method = method
+
+        # Bảng tính sẵn một lần cho mỗi bố cục (LevelAnalysis.heuristic_tables):
+        # push_distances[j][cell]: số nước đẩy ít nhất để đưa box từ cell tới dock thứ j,
+        # costs[cell]: tuple khoảng cách tới từng dock, nearest[cell]: khoảng cách tới dock gần nhất
+        self.push_distances, self.costs, self.nearest = level.analysis.heuristic_tables()
+
+    @property
+    def tables(self):
+        """Các bảng tính sẵn của level (để đo bộ nhớ)"""
+        return self.push_distances, self.costs, self.nearest
+
+    def initial(self, boxes):
+        """
+        Tính h từ đầu cho tập box và trả về (h, info) để cập nhật tăng dần ở các node con
+        info = (contributions, assignment): chi phí và dock được ghép của từng box, cùng thứ tự với boxes
+        """
+        if self.method == "greedy":
+            contributions = tuple(self.nearest[box] for box in boxes)
+            return min(sum(contributions), INFINITE_COST), (contributions, None)
+        total, assignment = self.min_cost_assignment(boxes)
+        if assignment is None:
+            return INFINITE_COST, None
+        contributions = tuple(self.costs[box][dock] for box, dock in zip(boxes, assignment))
+        return total, (contributions, tuple(assignment))
+
+    def update(self, boxes, h, info, moved, new_boxes):
+        """
+        Tính h của node con từ h của node cha khi chỉ một box bị đẩy (một nước đẩy hoặc một macro)
+        moved = (ô cũ, ô mới) của box bị đẩy, None nếu không có box nào di chuyển
+        greedy: luôn O(boxes). hungarian: giữ nguyên cách ghép nếu box được đẩy một ô và tiến gần dock của nó
+        một nước, ngược lại mới giải lại bài toán ghép cặp
+        """
+        if moved is None:
+            return h, info
+        old, new = moved
+        contributions, assignment = info
+        i = boxes.index(old)
+        j = new_boxes.index(new)
+
+        if self.method == "greedy":
+            cost = self.nearest[new]
+            return min(h - contributions[i] + cost, INFINITE_COST), (_move_item(contributions, i, j, cost), None)
+
+        dock = assignment[i]
+        cost = self.costs[new][dock]
+        # Mỗi nước đẩy đơn làm chi phí của mọi cách ghép giảm nhiều nhất 1, nên khi cách ghép cũ
+        # giảm đúng 1 thì nó vẫn là tối ưu và không cần chạy lại Hungarian. Macro đẩy box k ô có thể làm
+        # cách ghép khác giảm tới k nên luôn được giải lại
+        if cost + 1 == contributions[i] and new in self.level.neighbours[old]:
+            return h - 1, (_move_item(contributions, i, j, cost), _move_item(assignment, i, j, dock))
+        return self.initial(new_boxes)
+
+    def evaluate(self, boxes):
+        """Trả về h cho tập box, INFINITE_COST nếu không có cách ghép box nào vào dock"""
+        if self.method == "greedy":
+            nearest = self.nearest
+            total = 0
+            for box in boxes:
+                total += nearest[box]
+            return min(total, INFINITE_COST)
+        total, _ = self.min_cost_assignment(boxes)
+        return total
+
+    def min_cost_assignment(self, boxes):
+        """
+        Thuật toán Hungarian (dạng thế vị, O(n^2 * m)) cho ma trận box x dock, n <= m
+        Trả về (tổng chi phí, assignment[i] = chỉ số dock ghép với box thứ i)
+        """
+        rows = [self.costs[box] for box in boxes]
+        n = len(rows)
+        m = len(self.level.dock_cells)
+        if n == 0:
+            return 0, []
+        if n > m:
+            return INFINITE_COST, None
+
+        unbounded = INFINITE_COST * (n + 1)
+        u = [0] * (n + 1)
+        v = [0] * (m + 1)
+        owner = [0] * (m + 1)  # owner[j]: box (đánh số từ 1) đang giữ dock j
+        way = [0] * (m + 1)
+        for i in range(1, n + 1):
+            owner[0] = i
+            j0 = 0
+            min_values = [unbounded] * (m + 1)
+            used = [False] * (m + 1)
+            while True:
+                used[j0] = True
+                i0 = owner[j0]
+                row = rows[i0 - 1]
+                delta = unbounded
+                j1 = 0
+                for j in range(1, m + 1):
+                    if used[j]:
+                        continue
+                    current = row[j - 1] - u[i0] - v[j]
+                    if current < min_values[j]:
+                        min_values[j] = current
+                        way[j] = j0
+                    if min_values[j] < delta:
+                        delta = min_values[j]
+                        j1 = j
+                for j in range(m + 1):
+                    if used[j]:
+                        u[owner[j]] += delta
+                        v[j] -= delta
+                    else:
+                        min_values[j] -= delta
+                j0 = j1
+                if owner[j0] == 0:
+                    break
+            while j0:
+                j1 = way[j0]
+                owner[j0] = owner[j1]
+                j0 = j1
+
+        assignment = [0] * n
+        total = 0
+        for j in range(1, m + 1):
+            if owner[j]:
+                assignment[owner[j] - 1] = j - 1
+                total += rows[owner[j] - 1][j - 1]
+        if total >= INFINITE_COST:
+            return INFINITE_COST, None
+        return total, assignment
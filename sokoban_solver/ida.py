@@ -0,0 +1,119 @@
+"""
+IDA* (iterative deepening A*) với bộ nhớ tuyến tính theo độ sâu lời giải
+Mỗi vòng lặp là một DFS cắt ở ngưỡng f, ngưỡng vòng sau là f nhỏ nhất đã bị cắt. Chỉ đường đi hiện tại
+được giữ trong bộ nhớ; bảng chuyển vị kích thước cố định (tùy chọn) giảm việc duyệt lại các trạng thái
+gặp nhiều lần trong cùng một vòng
+"""
+import time
+
+from .constants import HEURISTIC_METHODS, INFINITE_COST, SEARCH_MODES
+from .heuristic import HeuristicEngine
+from .memory import MemoryMonitor
+from .search import SearchLimits, _finish, _start
+from .state import TranspositionTable
+
+# Bộ nhớ (MB) của bảng chuyển vị mặc định khi không có memory_limit
+DEFAULT_TABLE_MEMORY = 32
+
+
+def _children(level, engine, successors, state, h_score, h_info):
+    """Các successor kèm h (bỏ trạng thái không thể ghép box vào dock), successor h nhỏ được thử trước"""
+    children = []
+    for action, succ_state in successors(state):
+        succ_h, succ_info = engine.update(state.boxes, h_score, h_info,
+                                          level.pushed_box(state, action, succ_state), succ_state.boxes)
+        if succ_h < INFINITE_COST:
+            children.append((succ_h, action, succ_state, succ_info))
+    children.sort(key=lambda child: child[0])
+    return children
+
+
+def solve_ida(matrix, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+              time_limit=None, node_limit=None, table_size=None, memory_limit=None):
+    """
+    Thuật toán IDA* tối ưu như A* nhưng không giữ open/closed list
+    table_size: số slot của bảng chuyển vị (0 = không dùng, None = theo bộ nhớ: một nửa memory_limit
+    hoặc DEFAULT_TABLE_MEMORY MB)
+    memory_limit: trần bộ nhớ (MB) của lần giải; bảng chuyển vị được thu nhỏ để chiếm tối đa một nửa,
+    tính cả trạng thái đầy đủ lưu trong bảng khi exact
+    time_limit (giây), node_limit: dừng tìm kiếm khi vượt giới hạn
+    """
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    level, initial_state, successors = _start(matrix, mode)
+    engine = HeuristicEngine(level, heuristic_method)
+    entry_bytes = TranspositionTable.entry_bytes(exact, initial_state)
+    table_bytes = (memory_limit / 2 if memory_limit else DEFAULT_TABLE_MEMORY) * 1024 * 1024
+    if table_size is None:
+        table_size = int(table_bytes / entry_bytes)
+    elif memory_limit:
+        table_size = min(table_size, int(table_bytes / entry_bytes))
+    table = TranspositionTable(table_size, exact) if table_size > 0 else None
+
+    limits = SearchLimits(time_limit, node_limit, memory_limit, monitor)
+    nodes_explored = 0
+    solution_path = None
+    status = None
+    iteration = 0
+    stack, on_path = [], set()
+
+    h_score, h_info = engine.initial(initial_state.boxes)
+    threshold = h_score
+    if h_score >= INFINITE_COST or level.is_deadlock(initial_state.boxes):
+        threshold = INFINITE_COST
+    elif level.is_goal(initial_state.boxes):
+        solution_path = []
+
+    while solution_path is None and status is None and threshold < INFINITE_COST:
+        iteration += 1
+        next_threshold = INFINITE_COST
+        # Mỗi frame: [state, g, children, chỉ số child kế tiếp]; actions/on_path là đường đi hiện tại
+        stack = [[initial_state, 0, _children(level, engine, successors, initial_state, h_score, h_info), 0]]
+        actions = []
+        on_path = {initial_state}
+        if table is not None:
+            table.prune(initial_state, 0, iteration)
+
+        while stack:
+            frame = stack[-1]
+            state, g, children, index = frame
+            if index == len(children):
+                stack.pop()
+                on_path.discard(state)
+                if actions:
+                    actions.pop()
+                continue
+            frame[3] = index + 1
+            succ_h, action, succ_state, succ_info = children[index]
+            succ_g = g + 1
+            f_score = succ_g + succ_h
+            if f_score > threshold:
+                next_threshold = min(next_threshold, f_score)
+                continue
+            # Tránh chu trình trên đường đi hiện tại và trạng thái đã duyệt với g không lớn hơn
+            if succ_state in on_path:
+                continue
+            if table is not None and table.prune(succ_state, succ_g, iteration):
+                continue
+
+            nodes_explored += 1
+            status = limits.exceeded(nodes_explored)
+            if status:
+                nodes_explored -= 1  # node này chưa được mở rộng
+                break
+            if level.is_goal(succ_state.boxes):
+                actions.append(action)
+                solution_path = level.solution_moves(actions, mode)
+                break
+            actions.append(action)
+            on_path.add(succ_state)
+            stack.append([succ_state, succ_g,
+                          _children(level, engine, successors, succ_state, succ_h, succ_info), 0])
+
+        threshold = next_threshold
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status,
+                    {"frontier": (stack, on_path), "closed": table, "heuristic": engine.tables})
+    stats["iterations"] = iteration
+    return solution_path, stats
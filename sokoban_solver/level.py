@@ -0,0 +1,282 @@
+"""
+Phần tĩnh của level trên chỉ số ô đã làm phẳng và bộ sinh nước đi/nước đẩy
+"""
+from collections import deque
+from itertools import combinations
+
+from .analysis import analyze
+from .constants import DIRECTIONS, OPPOSITE, ZOBRIST_SEED
+from .deadlock import DeadlockDetector
+from .macros import MACRO, MacroPlanner
+from .state import SearchState, ZobristTable
+
+
+class LevelMap:
+    """
+    Phần tĩnh của một level (tường, dock, ô chết...) lấy từ LevelAnalysis dùng chung của bố cục
+    và trạng thái đầu, trên các chỉ số ô đã làm phẳng của lưới đã cắt (xem LevelAnalysis)
+    macros: tạo MacroPlanner (self.macros) cho các nước đẩy gộp ở chế độ "push"
+    """
+
+    def __init__(self, matrix, seed=ZOBRIST_SEED, macros=False):
+        pieces = [(x, y, char) for y, row in enumerate(matrix) for x, char in enumerate(row) if char in '$*@+']
+        self.analysis = analysis = analyze(matrix, [(x, y) for x, y, _ in pieces])
+        self.width = analysis.width
+        self.height = analysis.height
+        self.walls = analysis.walls
+        self.docks = analysis.docks
+        self.dock_cells = analysis.dock_cells
+        self.neighbours = analysis.neighbours
+        # Ô chết (simple deadlock): box đứng ở đây không bao giờ tới được dock nào
+        self.dead_squares = analysis.dead_squares
+        self.deadlocks = DeadlockDetector(self)
+
+        boxes = []
+        player = 0
+        for x, y, char in pieces:
+            if char in '$*':
+                boxes.append(analysis.cell_of(x, y))
+            else:
+                player = analysis.cell_of(x, y)
+
+        self.zobrist = ZobristTable(self.width * self.height, seed)
+        self.initial_state = self.make_state(tuple(sorted(boxes)), player)
+        self.macros = MacroPlanner(self) if macros else None
+
+    def make_state(self, boxes, player):
+        """Tạo SearchState và tính khóa Zobrist từ đầu"""
+        box_hash = self.zobrist.hash_boxes(boxes)
+        return SearchState(boxes, player, box_hash, box_hash ^ self.zobrist.player_keys[player])
+
+    def coords(self, cell):
+        """Chuyển chỉ số ô thành tọa độ (x, y) trong matrix"""
+        return self.analysis.coords(cell)
+
+    def index(self, x, y):
+        """Chuyển tọa độ (x, y) trong matrix thành chỉ số ô, -1 nếu ô nằm ngoài phần bên trong"""
+        return self.analysis.cell_of(x, y)
+
+    def is_goal(self, boxes):
+        """Tất cả box đều nằm trên dock"""
+        docks = self.docks
+        for box in boxes:
+            if not docks[box]:
+                return False
+        return True
+
+    def is_deadlock(self, boxes):
+        """Có box nào nằm ở ô chết (không thể đẩy tới dock nào)"""
+        dead_squares = self.dead_squares
+        for box in boxes:
+            if dead_squares[box]:
+                return True
+        return False
+
+    def move_successors(self, state):
+        """
+        Sinh các trạng thái kế tiếp theo từng bước đi của player
+        Trả về list (direction_index, new_state), bỏ qua các nước đẩy gây deadlock
+        """
+        successors = []
+        boxes = state.boxes
+        box_set = set(boxes)
+        neighbours = self.neighbours
+        box_keys = self.zobrist.box_keys
+        player_keys = self.zobrist.player_keys
+
+        for d, target in enumerate(neighbours[state.player]):
+            if target < 0:
+                continue
+
+            if target in box_set:
+                behind = neighbours[target][d]
+                if behind < 0 or behind in box_set or self.dead_squares[behind]:
+                    continue
+                new_box_set = set(box_set)
+                new_box_set.discard(target)
+                new_box_set.add(behind)
+                if self.deadlocks.is_deadlock(new_box_set, behind):
+                    continue
+                new_boxes = tuple(sorted(new_box_set))
+                box_hash = state.box_hash ^ box_keys[target] ^ box_keys[behind]
+                successors.append((d, SearchState(new_boxes, target, box_hash, box_hash ^ player_keys[target])))
+            else:
+                successors.append((d, SearchState(boxes, target, state.box_hash, state.box_hash ^ player_keys[target])))
+
+        return successors
+
+    # ----- Push-level search -----
+    def reachable(self, box_set, start):
+        """
+        Flood fill vùng player đi được từ start mà không đẩy box
+        Trả về (set các ô đi được, ô trên-trái nhất của vùng) - ô trên-trái dùng làm vị trí chuẩn hóa
+        """
+        seen = {start}
+        stack = [start]
+        neighbours = self.neighbours
+        while stack:
+            cell = stack.pop()
+            for target in neighbours[cell]:
+                if target >= 0 and target not in seen and target not in box_set:
+                    seen.add(target)
+                    stack.append(target)
+        return seen, min(seen)
+
+    def normalize(self, state):
+        """Thay vị trí player bằng ô chuẩn hóa của vùng player đi được"""
+        _, canonical = self.reachable(set(state.boxes), state.player)
+        return SearchState(state.boxes, canonical, state.box_hash,
+                           state.box_hash ^ self.zobrist.player_keys[canonical])
+
+    def push_successors(self, state):
+        """
+        Sinh các trạng thái kế tiếp theo từng nước đẩy box hợp lệ
+        Trả về list ((box_cell, direction_index), new_state), player của new_state đã chuẩn hóa
+        """
+        successors = []
+        boxes = state.boxes
+        box_set = set(boxes)
+        neighbours = self.neighbours
+        dead_squares = self.dead_squares
+        deadlocks = self.deadlocks
+        box_keys = self.zobrist.box_keys
+        player_keys = self.zobrist.player_keys
+        reach, _ = self.reachable(box_set, state.player)
+
+        for box in boxes:
+            box_neighbours = neighbours[box]
+            for d in range(4):
+                behind = box_neighbours[d]
+                if behind < 0 or behind in box_set or dead_squares[behind]:
+                    continue
+                # Player phải đứng ở phía đối diện và đi tới được ô đó
+                if box_neighbours[OPPOSITE[d]] not in reach:
+                    continue
+                new_box_set = set(box_set)
+                new_box_set.discard(box)
+                new_box_set.add(behind)
+                if deadlocks.is_deadlock(new_box_set, behind):
+                    continue
+                _, canonical = self.reachable(new_box_set, box)
+                box_hash = state.box_hash ^ box_keys[box] ^ box_keys[behind]
+                successors.append(((box, d), SearchState(tuple(sorted(new_box_set)), canonical,
+                                                         box_hash, box_hash ^ player_keys[canonical])))
+
+        return successors
+
+    # ----- Tìm kiếm ngược (kéo box từ đích) -----
+    def goal_states(self):
+        """
+        Các trạng thái đích cho tìm kiếm ngược: mọi cách đặt box lên dock, với mỗi vùng player
+        nằm cạnh ít nhất một box (player đã chuẩn hóa)
+        """
+        states = []
+        box_count = len(self.initial_state.boxes)
+        if box_count > len(self.dock_cells):
+            return states
+        for boxes in combinations(self.dock_cells, box_count):
+            box_set = set(boxes)
+            box_hash = self.zobrist.hash_boxes(boxes)
+            seen = set()
+            for box in boxes:
+                for start in self.neighbours[box]:
+                    if start < 0 or start in box_set or start in seen:
+                        continue
+                    region, canonical = self.reachable(box_set, start)
+                    seen |= region
+                    states.append(SearchState(boxes, canonical, box_hash,
+                                              box_hash ^ self.zobrist.player_keys[canonical]))
+        return states
+
+    def pull_successors(self, state):
+        """
+        Sinh các trạng thái đứng trước state một nước đẩy (kéo box ngược lại)
+        Player đứng cạnh box theo hướng d và lùi tiếp một ô theo hướng d, box theo player tới ô cạnh đó
+        Trả về list ((box_cell, direction_index), prev_state): action là nước đẩy xuôi từ prev_state về state
+        """
+        predecessors = []
+        boxes = state.boxes
+        box_set = set(boxes)
+        neighbours = self.neighbours
+        box_keys = self.zobrist.box_keys
+        player_keys = self.zobrist.player_keys
+        reach, _ = self.reachable(box_set, state.player)
+
+        for box in boxes:
+            for d in range(4):
+                target = neighbours[box][d]
+                if target not in reach:  # Chỗ player đứng kéo (cũng là chỗ box tới)
+                    continue
+                back = neighbours[target][d]
+                if back < 0 or back in box_set:
+                    continue
+                new_box_set = set(box_set)
+                new_box_set.discard(box)
+                new_box_set.add(target)
+                _, canonical = self.reachable(new_box_set, back)
+                box_hash = state.box_hash ^ box_keys[box] ^ box_keys[target]
+                predecessors.append(((target, OPPOSITE[d]), SearchState(tuple(sorted(new_box_set)), canonical,
+                                                                        box_hash, box_hash ^ player_keys[canonical])))
+
+        return predecessors
+
+    def walk_path(self, box_set, start, goal):
+        """BFS đường đi của player từ start đến goal không đẩy box, trả về list chỉ số hướng"""
+        if start == goal:
+            return []
+        parents = {start: None}
+        queue = deque([start])
+        neighbours = self.neighbours
+        while queue:
+            cell = queue.popleft()
+            for d, target in enumerate(neighbours[cell]):
+                if target < 0 or target in parents or target in box_set:
+                    continue
+                parents[target] = (cell, d)
+                if target == goal:
+                    path = []
+                    while parents[target] is not None:
+                        target, d = parents[target]
+                        path.append(d)
+                    path.reverse()
+                    return path
+                queue.append(target)
+        return None
+
+    def pushed_box(self, state, action, succ_state):
+        """
+        Trả về (ô cũ, ô mới) của box bị đẩy khi đi từ state tới succ_state bằng action, None nếu không đẩy
+        Ở chế độ "push" action là (box, d) hoặc macro (box, MACRO + d); ở chế độ "move" có đẩy khi khóa Zobrist
+        của box thay đổi
+        """
+        if isinstance(action, tuple):
+            box, d = action
+            if d >= MACRO:
+                old_boxes = set(state.boxes)
+                return box, next(cell for cell in succ_state.boxes if cell not in old_boxes)
+            return box, self.neighbours[box][d]
+        if succ_state.box_hash == state.box_hash:
+            return None
+        return succ_state.player, self.neighbours[succ_state.player][action]
+
+    def solution_moves(self, actions, mode):
+        """
+        Chuyển lời giải của solver thành list các bước đi (dx, dy) để auto-play
+        Ở chế độ "push", đường đi bộ giữa các nước đẩy được dựng lại bằng walk_path, macro được tách lại
+        thành các nước đẩy đơn
+        """
+        if mode != "push":
+            return [DIRECTIONS[d] for d in actions]
+
+        box_set = set(self.initial_state.boxes)
+        player = self.initial_state.player
+        moves = []
+        for action in actions:
+            pushes = self.macros.expand(box_set, action) if self.macros is not None else [action]
+            for box, d in pushes:
+                moves.extend(self.walk_path(box_set, player, self.neighbours[box][OPPOSITE[d]]))
+                moves.append(d)
+                box_set.discard(box)
+                box_set.add(self.neighbours[box][d])
+                player = box
+        return [DIRECTIONS[d] for d in moves]
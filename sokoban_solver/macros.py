@@ -0,0 +1,204 @@
+"""
+Nước đẩy gộp (macro) cho tìm kiếm ở chế độ "push": các vị trí trung gian không có lựa chọn nào khác
+không còn là node riêng của cây tìm kiếm
+
+- Macro đường hầm (thay cho nước đẩy đơn): box bị đẩy vào một ô đường hầm (hành lang rộng một ô theo đúng trục
+  đẩy, không phải dock) được đẩy tiếp tới ô cuối của đường hầm (hoặc tới dock/chỗ bị chặn). Box nằm ở ô nào trong
+  đường hầm cũng chặn cùng một lối đi nên không làm mất lời giải, nhưng box có thể bị đẩy sâu hơn mức cần nên
+  lời giải có thể nhiều nước đẩy hơn tối ưu; nước đẩy ra khỏi đường hầm vẫn là một nước đẩy riêng
+- Macro phòng đích (thêm bên cạnh nước đẩy thường): box bị đẩy qua lối vào duy nhất của một phòng có dock
+  được đưa thẳng tới dock trống xa nhất của phòng (lấp từ trong ra ngoài), khi mọi box đang ở trong phòng
+  đều đã nằm trên dock. Nước đẩy vào phòng từng bước vẫn được sinh nên level cần đặt box lên dock gần trước
+  vẫn giải được
+
+Action của macro là (box, MACRO + d) (đường hầm) hoặc (box, ROOM_MACRO + d) (có vào phòng đích) với (box, d)
+là nước đẩy đầu tiên; các nước đẩy còn lại được tính lại một cách tất định từ tập box bằng plan(), nên cây
+tìm kiếm vẫn chỉ lưu một hướng kiểu signed byte
+"""
+from collections import deque
+
+from .analysis import HORIZONTAL_TUNNEL, VERTICAL_TUNNEL
+from .constants import OPPOSITE
+from .state import SearchState
+
+# Mã hướng của action macro: MACRO + d (chỉ đường hầm), ROOM_MACRO + d (đường hầm rồi vào phòng đích)
+MACRO = 4
+ROOM_MACRO = 8
+# Số đường đẩy trong phòng đích được nhớ (xóa hết khi đầy)
+ROOM_MEMO_SIZE = 4096
+
+# Cờ đường hầm theo trục của từng hướng đẩy (left, right, up, down)
+_AXIS = (HORIZONTAL_TUNNEL, HORIZONTAL_TUNNEL, VERTICAL_TUNNEL, VERTICAL_TUNNEL)
+
+
+class MacroPlanner:
+    """Sinh nước đẩy gộp trên LevelMap, dùng thay cho level.push_successors bằng successors()"""
+
+    def __init__(self, level):
+        self.level = level
+        analysis = level.analysis
+        self.tunnels = analysis.tunnels
+        self.entrances = analysis.goal_room_entrances
+        self.room_cells = {room: frozenset(analysis.rooms[room]) for room in set(self.entrances.values())}
+        self.room_paths = {}
+
+    def plan(self, box_set, box, d, rooms=True):
+        """
+        Các nước đẩy (ô box, hướng) của macro bắt đầu bằng nước đẩy (box, d) hợp lệ từ trạng thái có tập box
+        box_set; None nếu nước đẩy này không mở đầu macro nào
+        rooms: False thì chỉ đẩy qua đường hầm, không đi tiếp vào phòng đích
+        """
+        neighbours = self.level.neighbours
+        docks = self.level.docks
+        dead_squares = self.level.dead_squares
+        axis = _AXIS[d]
+        pushes = []
+        cell = box
+        while True:
+            room = self.entrances.get((cell, d)) if rooms else None
+            if room is not None:
+                path = self.room_path(box_set, cell, d, room)
+                if path:
+                    pushes.extend(path)
+                    break
+            target = neighbours[cell][d]
+            if pushes:
+                # Chỉ đẩy tiếp khi box đang ở và vẫn còn ở trong đường hầm theo trục đẩy
+                if docks[cell] or not self.tunnels[cell] & axis:
+                    break
+                if target < 0 or target in box_set or dead_squares[target] or not self.tunnels[target] & axis:
+                    break
+            pushes.append((cell, d))
+            cell = target
+        return pushes if len(pushes) > 1 else None
+
+    def room_path(self, box_set, entrance, d, room):
+        """
+        Các nước đẩy đưa box từ ô entrance (player đứng sau theo hướng d) vào phòng room tới dock trống xa nhất,
+        player chỉ đi trong phòng và ô entrance; None nếu trong phòng có box chưa nằm trên dock
+        hoặc không đẩy được tới dock nào
+        """
+        cells = self.room_cells[room]
+        others = frozenset(box for box in box_set if box in cells)
+        docks = self.level.docks
+        if any(not docks[box] for box in others):
+            return None
+        key = (others, entrance, d)
+        if key in self.room_paths:
+            return self.room_paths[key]
+        if len(self.room_paths) >= ROOM_MEMO_SIZE:
+            self.room_paths.clear()
+        path = self._search_room(cells, others, entrance, d)
+        self.room_paths[key] = path
+        return path
+
+    def _search_room(self, cells, others, entrance, d):
+        """BFS theo nước đẩy của một box trong phòng, trả về đường tới dock trống có khoảng cách đẩy lớn nhất"""
+        neighbours = self.level.neighbours
+        docks = self.level.docks
+        dead_squares = self.level.dead_squares
+        first = neighbours[entrance][d]
+        if first in others:
+            return None
+        walkable = (cells | {entrance}) - others
+
+        def region(box, player):
+            # Vùng player đi được trong phòng khi box ở ô box
+            seen = {player}
+            stack = [player]
+            while stack:
+                cell = stack.pop()
+                for target in neighbours[cell]:
+                    if target in walkable and target != box and target not in seen:
+                        seen.add(target)
+                        stack.append(target)
+            return seen
+
+        start = (first, min(region(first, entrance)))
+        parents = {start: None}
+        pushes = {start: (entrance, d)}
+        best = start if docks[first] else None
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            box, player = state
+            reach = region(box, player)
+            for direction, target in enumerate(neighbours[box]):
+                if target not in cells or target in others or dead_squares[target]:
+                    continue
+                if neighbours[box][OPPOSITE[direction]] not in reach:
+                    continue
+                child = (target, min(region(target, box)))
+                if child in parents:
+                    continue
+                parents[child] = state
+                pushes[child] = (box, direction)
+                queue.append(child)
+                # BFS: trạng thái tới sau có khoảng cách đẩy không nhỏ hơn, dock tới sau cùng là xa nhất
+                if docks[target]:
+                    best = child
+        if best is None:
+            return None
+        path = []
+        while best is not None:
+            path.append(pushes[best])
+            best = parents[best]
+        path.reverse()
+        return tuple(path)
+
+    def successors(self, state):
+        """
+        Như level.push_successors nhưng nước đẩy vào đường hầm được thay bằng cả macro đường hầm,
+        và có thêm successor của macro phòng đích (nước đẩy thường vào phòng vẫn được giữ)
+        """
+        successors = []
+        box_set = None
+        for action, new_state in self.level.push_successors(state):
+            box, d = action
+            if box_set is None:
+                box_set = set(state.boxes)
+            pushes = self.plan(box_set, box, d, rooms=False)
+            if pushes is not None:
+                macro_state = self.apply(state, box_set, box, pushes)
+                # Macro kết thúc ở deadlock thì vẫn giữ nước đẩy đơn: box còn có thể bị đẩy ra lại
+                if macro_state is not None:
+                    action, new_state = (box, MACRO + d), macro_state
+            successors.append((action, new_state))
+            if self.entrances:
+                room_pushes = self.plan(box_set, box, d)
+                if room_pushes is not None and room_pushes != pushes:
+                    room_state = self.apply(state, box_set, box, room_pushes)
+                    if room_state is not None:
+                        successors.append(((box, ROOM_MACRO + d), room_state))
+        return successors
+
+    def apply(self, state, box_set, box, pushes):
+        """Trạng thái sau các nước đẩy pushes của box (player đã chuẩn hóa), None nếu kết thúc ở deadlock"""
+        level = self.level
+        last, d = pushes[-1]
+        final = level.neighbours[last][d]
+        new_box_set = set(box_set)
+        new_box_set.discard(box)
+        new_box_set.add(final)
+        if level.deadlocks.is_deadlock(new_box_set, final):
+            return None
+        _, canonical = level.reachable(new_box_set, last)
+        box_keys = level.zobrist.box_keys
+        box_hash = state.box_hash ^ box_keys[box] ^ box_keys[final]
+        return SearchState(tuple(sorted(new_box_set)), canonical, box_hash,
+                           box_hash ^ level.zobrist.player_keys[canonical])
+
+    def expand(self, box_set, action):
+        """Các nước đẩy đơn của action (box, d), (box, MACRO + d) hoặc (box, ROOM_MACRO + d) từ tập box box_set"""
+        box, d = action
+        if d < MACRO:
+            return [(box, d)]
+        if d < ROOM_MACRO:
+            return self.plan(box_set, box, d - MACRO, rooms=False)
+        return self.plan(box_set, box, d - ROOM_MACRO)
+
+    def cost(self, state, action):
+        """Số nước đẩy của action từ state (chi phí cạnh của A*)"""
+        if action[1] < MACRO:
+            return 1
+        return len(self.expand(set(state.boxes), action))
@@ -0,0 +1,137 @@
+"""
+Mô hình level dạng ma trận ký tự (như trong file level) và các thao tác di chuyển trên ma trận
+Các ký tự: ' ' sàn, '#' tường, '@' player, '+' player trên dock, '$' box, '*' box trên dock, '.' dock
+"""
+from .constants import DIRECTIONS
+
+# Ký hiệu LURD chuẩn của Sokoban, chữ hoa là nước đẩy box
+LURD = {(-1, 0): 'l', (1, 0): 'r', (0, -1): 'u', (0, 1): 'd'}
+
+
+def load_levels(filename):
+    """Đọc tất cả levels từ file ("Level N" hoặc XSB/SOK); dùng LevelCollection để chỉ đọc level cần dùng"""
+    from .collection import LevelCollection
+    return list(LevelCollection(filename))
+
+
+def find_player(matrix):
+    """Tìm vị trí người chơi (x, y) trong matrix, None nếu không có"""
+    for y, row in enumerate(matrix):
+        for x, cell in enumerate(row):
+            if cell in ['@', '+']:  # @ = player on floor, + = player on dock
+                return (x, y)
+    return None
+
+
+def is_level_completed(matrix):
+    """Kiểm tra xem level đã hoàn thành chưa"""
+    for row in matrix:
+        for cell in row:
+            if cell == '$':  # Còn box chưa đặt vào dock
+                return False
+    return True
+
+
+def get_valid_moves(matrix, player_pos):
+    """Lấy danh sách các nước đi hợp lệ từ vị trí hiện tại"""
+    moves = []
+    px, py = player_pos
+
+    for dx, dy in DIRECTIONS:
+        new_x, new_y = px + dx, py + dy
+
+        # Kiểm tra biên
+        if 0 <= new_y < len(matrix) and 0 <= new_x < len(matrix[new_y]):
+            target_cell = matrix[new_y][new_x]
+
+            # Nếu ô đích là tường thì không thể di chuyển
+            if target_cell == '#':
+                continue
+
+            # Nếu ô đích là box
+            if target_cell in ['$', '*']:
+                # Kiểm tra ô phía sau box
+                box_new_x, box_new_y = new_x + dx, new_y + dy
+                if (0 <= box_new_y < len(matrix) and
+                        0 <= box_new_x < len(matrix[box_new_y])):
+                    behind_box = matrix[box_new_y][box_new_x]
+                    # Box chỉ có thể đẩy nếu ô phía sau trống hoặc là dock
+                    if behind_box in [' ', '.']:
+                        moves.append((dx, dy))
+            else:
+                # Di chuyển bình thường (không có box)
+                moves.append((dx, dy))
+
+    return moves
+
+
+def apply_move(matrix, player_pos, move):
+    """Áp dụng một nước đi và trả về matrix mới cùng vị trí player mới"""
+    new_matrix = [row[:] for row in matrix]
+    px, py = player_pos
+    dx, dy = move
+    new_x, new_y = px + dx, py + dy
+
+    target_cell = new_matrix[new_y][new_x]
+
+    # Xử lý vị trí cũ của player
+    if new_matrix[py][px] == '@':
+        new_matrix[py][px] = ' '
+    elif new_matrix[py][px] == '+':
+        new_matrix[py][px] = '.'
+
+    # Nếu đẩy box
+    if target_cell in ['$', '*']:
+        box_new_x, box_new_y = new_x + dx, new_y + dy
+        behind_box = new_matrix[box_new_y][box_new_x]
+
+        # Di chuyển box
+        if behind_box == ' ':
+            new_matrix[box_new_y][box_new_x] = '$'
+        elif behind_box == '.':
+            new_matrix[box_new_y][box_new_x] = '*'
+
+        # Đặt player vào vị trí box cũ
+        if target_cell == '$':
+            new_matrix[new_y][new_x] = '@'
+        elif target_cell == '*':
+            new_matrix[new_y][new_x] = '+'
+    else:
+        # Di chuyển bình thường
+        if target_cell == ' ':
+            new_matrix[new_y][new_x] = '@'
+        elif target_cell == '.':
+            new_matrix[new_y][new_x] = '+'
+
+    return new_matrix, (new_x, new_y)
+
+
+def matrix_to_string(matrix):
+    """Chuyển matrix thành string để hash"""
+    return ''.join(''.join(row) for row in matrix)
+
+
+def moves_to_lurd(matrix, moves):
+    """
+    Chuyển list các bước (dx, dy) thành chuỗi LURD, chữ hoa ở các bước đẩy box
+    Chỉ theo dõi vị trí player và tập box thay vì chép cả matrix mỗi bước (apply_move)
+    """
+    px, py = find_player(matrix)
+    boxes = {(x, y) for y, row in enumerate(matrix) for x, cell in enumerate(row) if cell in ['$', '*']}
+    letters = []
+    for move in moves:
+        dx, dy = move
+        px, py = px + dx, py + dy
+        letter = LURD[(dx, dy)]
+        if (px, py) in boxes:
+            boxes.remove((px, py))
+            boxes.add((px + dx, py + dy))
+            letter = letter.upper()
+        letters.append(letter)
+    return ''.join(letters)
+
+
+def lurd_to_moves(lurd):
+    """Chuyển chuỗi LURD (không phân biệt hoa thường) thành list các bước (dx, dy)"""
+    moves_by_letter = {letter: move for move, letter in LURD.items()}
+    return [moves_by_letter[letter.lower()] for letter in lurd]
@@ -0,0 +1,127 @@
+"""
+Đo bộ nhớ của một lần giải: RSS đỉnh (thread nền lấy mẫu định kỳ) thay cho hiệu RSS trước/sau,
+đỉnh cấp phát Python theo tracemalloc khi đang bật, và ước lượng kích thước từng cấu trúc dữ liệu của solver
+"""
+import os
+import sys
+import threading
+import tracemalloc
+import weakref
+from collections import deque
+from itertools import islice
+
+# Khoảng thời gian giữa hai lần lấy mẫu RSS (giây)
+SAMPLE_INTERVAL = 0.01
+# Số phần tử được đo sâu của mỗi container lớn, phần còn lại ước lượng theo trung bình
+SIZE_SAMPLE = 64
+_MB = 1024 * 1024
+
+
+def _current_process():
+    """psutil chỉ được import khi bắt đầu giải để lệnh import sokoban_solver khởi động nhanh"""
+    import psutil
+    return psutil.Process(os.getpid())
+
+
+def _memory_mb(process):
+    """RSS hiện tại của tiến trình (MB)"""
+    return process.memory_info().rss / _MB
+
+
+def _sample_loop(monitor_ref, stopped, interval):
+    """Thread nền: chỉ giữ weakref tới monitor nên tự dừng khi solver kết thúc (kể cả khi có exception)"""
+    while not stopped.wait(interval):
+        monitor = monitor_ref()
+        if monitor is None:
+            return
+        monitor.sample()
+        del monitor
+
+
+class MemoryMonitor:
+    """
+    Theo dõi bộ nhớ từ lúc tạo tới stop(): RSS đỉnh được lấy mẫu mỗi SAMPLE_INTERVAL giây bởi thread nền
+    và mỗi lần solver gọi sample() (SearchLimits kiểm tra bộ nhớ)
+    Nếu tracemalloc đang chạy (python -X tracemalloc) thì đo thêm đỉnh cấp phát của Python trong lần giải;
+    tracemalloc không tự bật vì làm chậm mọi phép cấp phát
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.process = _current_process()
+        self.start_memory = _memory_mb(self.process)
+        self.peak = self.start_memory
+        self.traced = tracemalloc.is_tracing()
+        if self.traced:
+            tracemalloc.reset_peak()
+            self.traced_start = tracemalloc.get_traced_memory()[0]
+        self.stopped = threading.Event()
+        if interval:
+            threading.Thread(target=_sample_loop, args=(weakref.ref(self), self.stopped, interval),
+                             daemon=True).start()
+
+    def sample(self):
+        """Đọc RSS hiện tại (MB) và cập nhật đỉnh"""
+        memory = _memory_mb(self.process)
+        if memory > self.peak:
+            self.peak = memory
+        return memory
+
+    def stop(self):
+        self.stopped.set()
+
+    def stats(self):
+        """
+        "memory": RSS đỉnh trừ RSS lúc bắt đầu (MB, không âm), "peak_rss": RSS đỉnh tuyệt đối (MB)
+        "traced_peak": đỉnh cấp phát Python trong lần giải (MB), chỉ có khi tracemalloc đang chạy
+        """
+        self.sample()
+        stats = {"memory": self.peak - self.start_memory, "peak_rss": self.peak}
+        if self.traced and tracemalloc.is_tracing():
+            stats["traced_peak"] = (tracemalloc.get_traced_memory()[1] - self.traced_start) / _MB
+        return stats
+
+
+def _sampled_size(items, count, seen):
+    """
+    Kích thước các phần tử của một container: đo sâu SIZE_SAMPLE phần tử đầu rồi nhân theo số phần tử
+    (object dùng chung như True hay số nhỏ chỉ được tính một lần nên gần như không đáng kể)
+    """
+    sample = list(islice(items, SIZE_SAMPLE))
+    if not sample:
+        return 0
+    return sum(_deep_size(item, seen) for item in sample) * count // len(sample)
+
+
+def _deep_size(obj, seen):
+    """Kích thước (byte) của obj và các object nó chứa, mỗi object chỉ tính một lần"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + _sampled_size(obj.keys(), len(obj), seen) + _sampled_size(obj.values(), len(obj), seen)
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + _sampled_size(obj, len(obj), seen)
+    if hasattr(obj, '__slots__'):
+        values = [getattr(obj, name) for name in obj.__slots__ if hasattr(obj, name)]
+        return size + sum(_deep_size(value, seen) for value in values)
+    return size  # số, chuỗi, array...: getsizeof đã gồm dữ liệu
+
+
+def estimate_size_mb(*objects):
+    """Ước lượng tổng bộ nhớ (MB) của các cấu trúc dữ liệu, phần dùng chung giữa chúng chỉ tính một lần"""
+    seen = set()
+    return sum(_deep_size(obj, seen) for obj in objects if obj is not None) / _MB
+
+
+def structure_sizes(**structures):
+    """
+    Kích thước ước lượng (MB) của từng cấu trúc, ví dụ frontier=queue, closed=visited, tree=tree
+    Giá trị là một object hoặc tuple nhiều object được tính chung
+    """
+    sizes = {}
+    for name, objects in structures.items():
+        if not isinstance(objects, tuple):
+            objects = (objects,)
+        sizes[name] = estimate_size_mb(*objects)
+    return sizes
@@ -0,0 +1,279 @@
+"""
+A* song song kiểu HDA* (hash-distributed A*) cho một level khó
+
+Mỗi trạng thái thuộc về worker có chỉ số key % số worker (khóa Zobrist giống nhau ở mọi worker vì
+seed cố định). Mỗi worker giữ open list, bảng g_score và cây con trỏ cha của riêng phần trạng thái
+của mình; successor thuộc worker khác được gom thành lô rồi gửi qua hàng đợi (pipe) của worker đó.
+
+Kết thúc đúng và vẫn tối ưu: lời giải tốt nhất (incumbent) được phát cho mọi worker, worker "rảnh" khi
+open list rỗng hoặc mọi node còn lại có f >= incumbent. Tiến trình điều phối gửi các đợt thăm dò, mỗi
+worker trả lời số lô đã gửi/đã nhận; dừng khi hai đợt liên tiếp đều thấy mọi worker rảnh, tổng gửi bằng
+tổng nhận và các bộ đếm không đổi (phương pháp bốn bộ đếm của Mattern) - khi đó không còn node nào có
+f < incumbent ở đâu cả, kể cả trong các lô đang trên đường gửi.
+"""
+import heapq
+import multiprocessing
+import os
+import queue
+import time
+from array import array
+
+from .constants import HEURISTIC_METHODS, INFINITE_COST, SEARCH_MODES
+from .heuristic import HeuristicEngine
+from .memory import MemoryMonitor
+from .search import _finish, _start
+from .state import SearchState, StateTable
+
+# Loại message
+STATES, INCUMBENT, PROBE, TRACE, STOP, STATUS, SOLUTION = range(7)
+
+# Số node mở rộng giữa hai lần đọc hàng đợi, sau mỗi lượt các lô successor được gửi đi
+EXPANSIONS_PER_POLL = 32
+# Lô gửi sớm khi đủ lớn
+BATCH_SIZE = 256
+# Thời gian chờ hàng đợi khi worker rảnh / khi điều phối (giây)
+POLL_TIMEOUT = 0.02
+
+
+def _hda_worker(worker_id, worker_count, matrix, mode, exact, heuristic_method, inboxes, results):
+    """Vòng lặp của một worker: nhận lô trạng thái, mở rộng phần open list của mình, trả lời thăm dò"""
+    level, _, successors = _start(matrix, mode)
+    engine = HeuristicEngine(level, heuristic_method)
+    push_mode = mode == "push"
+    monitor = MemoryMonitor()
+    inbox = inboxes[worker_id]
+
+    g_scores = StateTable(exact)
+    open_list = []
+    # Cây con trỏ cha: cha của một node có thể nằm ở worker khác nên lưu cả chỉ số worker (-1 là gốc)
+    parent_workers = array('b')
+    parent_nodes = array('I')
+    directions = array('b')
+    pushed = array('I')
+    outboxes = [[] for _ in range(worker_count)]
+    sent = received = expanded = 0
+    incumbent = INFINITE_COST
+
+    def insert(entry):
+        boxes, player, box_hash, key, g, h, h_info, parent_worker, parent_node, action = entry
+        state = SearchState(boxes, player, box_hash, key)
+        old_g = g_scores.get(state)
+        if old_g is not None and old_g <= g:
+            return
+        g_scores.set(state, g)
+        node = len(parent_nodes)
+        parent_workers.append(parent_worker)
+        parent_nodes.append(parent_node)
+        if action is None:
+            directions.append(-1)
+            pushed.append(0)
+        elif push_mode:
+            pushed.append(action[0])
+            directions.append(action[1])
+        else:
+            pushed.append(0)
+            directions.append(action)
+        heapq.heappush(open_list, (g + h, g, node, state, h_info))
+
+    def flush(owner):
+        nonlocal sent
+        inboxes[owner].put((STATES, outboxes[owner]))
+        outboxes[owner] = []
+        sent += 1
+
+    def flush_all():
+        for owner in range(worker_count):
+            if outboxes[owner]:
+                flush(owner)
+
+    while True:
+        # 1. Đọc hàng đợi: chờ khi không có việc, không chờ khi còn node cần mở rộng
+        busy = open_list and open_list[0][0] < incumbent
+        messages = []
+        try:
+            if not busy:
+                messages.append(inbox.get(timeout=POLL_TIMEOUT))
+            while True:
+                messages.append(inbox.get_nowait())
+        except queue.Empty:
+            pass
+
+        for message in messages:
+            kind = message[0]
+            if kind == STATES:
+                received += 1
+                for entry in message[1]:
+                    insert(entry)
+            elif kind == INCUMBENT:
+                incumbent = min(incumbent, message[1])
+            elif kind == PROBE:
+                flush_all()
+                idle = not open_list or open_list[0][0] >= incumbent
+                results.put((STATUS, worker_id, message[1], idle, sent, received, expanded, monitor.stats()))
+            elif kind == TRACE:
+                node = message[1]
+                if directions[node] < 0:
+                    action = None
+                elif push_mode:
+                    action = (pushed[node], directions[node])
+                else:
+                    action = directions[node]
+                results.put((TRACE, worker_id, node, parent_workers[node], parent_nodes[node], action))
+            elif kind == STOP:
+                return
+
+        # 2. Mở rộng tối đa EXPANSIONS_PER_POLL node có f < incumbent
+        for _ in range(EXPANSIONS_PER_POLL):
+            if not open_list or open_list[0][0] >= incumbent:
+                break
+            current_f, current_g, node, current_state, current_h_info = heapq.heappop(open_list)
+            if current_g > g_scores.get(current_state):
+                continue  # Đã có đường tốt hơn tới trạng thái này
+            expanded += 1
+
+            if level.is_goal(current_state.boxes):
+                if current_g < incumbent:
+                    incumbent = current_g
+                    results.put((SOLUTION, worker_id, node, current_g))
+                continue
+            if parent_workers[node] < 0 and level.is_deadlock(current_state.boxes):
+                continue
+
+            current_h = current_f - current_g
+            new_g_score = current_g + 1
+            for action, succ_state in successors(current_state):
+                h_score, h_info = engine.update(current_state.boxes, current_h, current_h_info,
+                                                level.pushed_box(current_state, action, succ_state),
+                                                succ_state.boxes)
+                if h_score >= INFINITE_COST or new_g_score + h_score >= incumbent:
+                    continue
+                entry = (succ_state.boxes, succ_state.player, succ_state.box_hash, succ_state.key,
+                         new_g_score, h_score, h_info, worker_id, node, action)
+                owner = succ_state.key % worker_count
+                if owner == worker_id:
+                    insert(entry)
+                else:
+                    outboxes[owner].append(entry)
+                    if len(outboxes[owner]) >= BATCH_SIZE:
+                        flush(owner)
+
+        # 3. Gửi các lô còn lại để worker khác không phải chờ
+        flush_all()
+
+
+def _trace_solution(inboxes, results, worker, node):
+    """Lần ngược con trỏ cha qua các worker, trả về list action từ gốc tới node"""
+    actions = []
+    while True:
+        inboxes[worker].put((TRACE, node))
+        while True:
+            message = results.get()
+            if message[0] == TRACE:
+                break
+        _, _, _, parent_worker, parent_node, action = message
+        if parent_worker < 0:
+            break
+        actions.append(action)
+        worker, node = parent_worker, parent_node
+    actions.reverse()
+    return actions
+
+
+def solve_parallel_astar(matrix, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+                         time_limit=None, node_limit=None, workers=None):
+    """
+    A* song song trên nhiều tiến trình, trả về (solution_path, stats) giống solve_astar
+    workers: số tiến trình worker, mặc định một worker mỗi core
+    """
+    start_time = time.time()
+    monitor = MemoryMonitor()
+    worker_count = workers or os.cpu_count()
+
+    level, initial_state, _ = _start(matrix, mode)
+    engine = HeuristicEngine(level, heuristic_method)
+    h_score, h_info = engine.initial(initial_state.boxes)
+    if h_score >= INFINITE_COST:
+        return None, _finish(start_time, monitor, 0, None, None)
+
+    inboxes = [multiprocessing.Queue() for _ in range(worker_count)]
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_hda_worker, daemon=True,
+                                args=(worker_id, worker_count, matrix, mode, exact, heuristic_method,
+                                      inboxes, results))
+        for worker_id in range(worker_count)
+    ]
+    for worker in processes:
+        worker.start()
+
+    # Gốc được gửi như một lô bình thường để tổng gửi/nhận cân bằng
+    root = (initial_state.boxes, initial_state.player, initial_state.box_hash, initial_state.key,
+            0, h_score, h_info, -1, 0, None)
+    inboxes[initial_state.key % worker_count].put((STATES, [root]))
+    coordinator_sent = 1
+
+    deadline = start_time + time_limit if time_limit else None
+    best = None  # (g, worker, node) của lời giải tốt nhất
+    status = None
+    wave = 0
+    replies = {}
+    previous = None
+    nodes_explored = 0
+    worker_memory = {"memory": 0.0, "peak_rss": 0.0}
+
+    def send_probes():
+        for inbox in inboxes:
+            inbox.put((PROBE, wave))
+
+    send_probes()
+    while True:
+        if deadline and time.time() > deadline:
+            status = "timeout"
+            break
+        try:
+            message = results.get(timeout=POLL_TIMEOUT)
+        except queue.Empty:
+            continue
+
+        if message[0] == SOLUTION:
+            _, worker, node, g = message
+            if best is None or g < best[0]:
+                best = (g, worker, node)
+                for inbox in inboxes:
+                    inbox.put((INCUMBENT, g))
+        elif message[0] == STATUS and message[2] == wave:
+            replies[message[1]] = message
+            if len(replies) < worker_count:
+                continue
+            nodes_explored = sum(reply[6] for reply in replies.values())
+            worker_memory = {name: sum(reply[7][name] for reply in replies.values()) for name in worker_memory}
+            if node_limit and nodes_explored > node_limit:
+                status = "node_limit"
+                break
+            all_idle = all(reply[3] for reply in replies.values())
+            counts = (coordinator_sent + sum(reply[4] for reply in replies.values()),
+                      sum(reply[5] for reply in replies.values()))
+            if all_idle and counts[0] == counts[1] and counts == previous:
+                break
+            previous = counts if all_idle else None
+            wave += 1
+            replies = {}
+            send_probes()
+
+    solution_path = None
+    if status is None and best is not None:
+        solution_path = level.solution_moves(_trace_solution(inboxes, results, best[1], best[2]), mode)
+
+    for inbox in inboxes:
+        inbox.put((STOP,))
+    for worker in processes:
+        worker.join(timeout=1)
+        if worker.is_alive():
+            worker.terminate()
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status)
+    # Đỉnh của các worker được cộng dồn: cận trên của bộ nhớ cần cho cả lần giải
+    for name, memory in worker_memory.items():
+        stats[name] += memory
+    stats["workers"] = worker_count
+    return solution_path, stats
@@ -0,0 +1,84 @@
+"""
+Đo thời gian theo pha của vòng lặp tìm kiếm (sinh successor, flood fill, deadlock, heuristic, kiểm tra đích)
+và ghi profile cProfile của một lần giải
+
+SearchProfiler bọc các hàm của LevelMap/HeuristicEngine của riêng lần giải đó bằng hàm đếm giờ, vòng lặp
+của solver không có thêm lệnh nào nên khi tắt (profile=False) không tốn gì. Các bộ đếm trùng lặp/mở lại
+được suy ra từ kích thước các bảng khi kết thúc thay vì đếm trong vòng lặp
+"""
+import cProfile
+import time
+
+from .constants import INFINITE_COST
+
+
+class SearchProfiler:
+    """
+    phases: tên pha -> [số lần gọi, tổng thời gian (giây)], thời gian của pha gồm cả các pha con
+    (successors gồm reachable và deadlock); counters: tên -> số lần
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timed(self, name, func, result_counter=None):
+        """
+        Bọc func để cộng dồn số lần gọi và thời gian vào pha name
+        result_counter(result) -> (tên bộ đếm, số lượng) hoặc None: đếm thêm theo kết quả trả về
+        """
+        phase = self.phases.setdefault(name, [0, 0.0])
+        clock = time.perf_counter
+
+        def wrapper(*args):
+            start = clock()
+            result = func(*args)
+            phase[1] += clock() - start
+            phase[0] += 1
+            if result_counter is not None:
+                counted = result_counter(result)
+                if counted:
+                    self.count(*counted)
+            return result
+
+        return wrapper
+
+    def instrument(self, level, successors, engine=None):
+        """
+        Cài hàm đếm giờ lên level (và engine) của lần giải, trả về bộ sinh successor đã bọc
+        Chỉ dùng cho LevelMap/HeuristicEngine tạo riêng cho một lần giải vì thuộc tính của chúng bị thay thế
+        """
+        for name in ("generated", "deadlock_pruned") + (("heuristic_pruned",) if engine is not None else ()):
+            self.counters.setdefault(name, 0)
+        level.reachable = self.timed("reachable", level.reachable)
+        level.deadlocks.is_deadlock = self.timed("deadlock", level.deadlocks.is_deadlock,
+                                                 lambda dead: ("deadlock_pruned", 1) if dead else None)
+        level.is_goal = self.timed("goal_test", level.is_goal)
+        level.solution_moves = self.timed("path", level.solution_moves)
+        if engine is not None:
+            engine.update = self.timed("heuristic", engine.update,
+                                       lambda result: ("heuristic_pruned", 1) if result[0] >= INFINITE_COST else None)
+        return self.timed("successors", successors, lambda children: ("generated", len(children)))
+
+    def report(self, **counters):
+        """Dict cho stats["profile"]: các pha (calls, time, µs mỗi lần gọi) và bộ đếm"""
+        counts = dict(self.counters)
+        counts.update(counters)
+        return {
+            "phases": {name: {"calls": calls, "time": seconds,
+                              "per_call_us": seconds * 1e6 / calls if calls else 0.0}
+                       for name, (calls, seconds) in self.phases.items()},
+            "counters": counts,
+        }
+
+
+def profile_call(path, func, *args, **kwargs):
+    """Chạy func(*args, **kwargs) dưới cProfile và ghi kết quả (định dạng pstats) vào path"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,148 @@
+"""
+Phát lại một lời giải trên ma trận level bằng delta của từng nước đi thay cho bản sao ma trận ở mỗi bước
+
+Mỗi nước đi chỉ lưu vị trí player trước nước đi và một byte (hướng, có đẩy box hay không); cứ KEYFRAME_INTERVAL
+bước lưu thêm một keyframe là tập ô box. Tiến/lùi một bước chỉ sửa 2-3 ô của ma trận, nhảy tới bước xa thì dựng
+lại từ keyframe gần nhất rồi đi tiếp từng bước
+"""
+from array import array
+
+from .constants import DIRECTIONS
+from .matrix import find_player
+
+# Số bước giữa hai keyframe
+KEYFRAME_INTERVAL = 64
+
+# Ký tự của ô theo (có dock, vật trên ô): None là ô trống
+_CELL_CHARS = {
+    (False, None): ' ', (False, '@'): '@', (False, '$'): '$',
+    (True, None): '.', (True, '@'): '+', (True, '$'): '*',
+}
+
+
+class SolutionReplay:
+    """
+    Trạng thái của level sau index nước đi đầu tiên của lời giải moves (list (dx, dy))
+    matrix là một ma trận duy nhất được sửa tại chỗ khi step_forward()/step_backward()/seek(), nên có thể
+    gán thẳng cho ma trận đang hiển thị; nước đi không hợp lệ trong moves gây ValueError khi khởi tạo
+    """
+
+    def __init__(self, matrix, moves, keyframe_interval=KEYFRAME_INTERVAL):
+        start = find_player(matrix)
+        if start is None:
+            raise ValueError("Level has no player")
+        self.width = width = max(len(row) for row in matrix)
+        self.height = len(matrix)
+        self.keyframe_interval = keyframe_interval
+        self.matrix = [row[:] for row in matrix]
+
+        # Phần tĩnh: tường và dock theo ô phẳng (cell = y * width + x)
+        self.walls = set()
+        self.docks = set()
+        boxes = set()
+        for y, row in enumerate(matrix):
+            for x, char in enumerate(row):
+                cell = y * width + x
+                if char == '#':
+                    self.walls.add(cell)
+                elif char in ('.', '+', '*'):
+                    self.docks.add(cell)
+                if char in ('$', '*'):
+                    boxes.add(cell)
+        self.offsets = [dy * width + dx for dx, dy in DIRECTIONS]
+
+        # players[i]: ô của player sau i nước đi, codes[i]: hướng * 2 + 1 nếu nước thứ i đẩy box
+        player = start[1] * width + start[0]
+        self.players = array('i', [player])
+        self.codes = bytearray()
+        self.keyframes = [tuple(sorted(boxes))]
+        for step, move in enumerate(moves):
+            if move not in DIRECTIONS:
+                raise ValueError(f"Invalid move {move} at step {step + 1}")
+            direction = DIRECTIONS.index(move)
+            offset = self.offsets[direction]
+            target = player + offset
+            if not self.is_open(target):
+                raise ValueError(f"Move {move} at step {step + 1} walks into a wall")
+            pushed = target in boxes
+            if pushed:
+                behind = target + offset
+                if not self.is_open(behind) or behind in boxes:
+                    raise ValueError(f"Move {move} at step {step + 1} pushes a blocked box")
+                boxes.remove(target)
+                boxes.add(behind)
+            player = target
+            self.players.append(player)
+            self.codes.append(direction * 2 + pushed)
+            if (step + 1) % keyframe_interval == 0:
+                self.keyframes.append(tuple(sorted(boxes)))
+        self.index = 0
+
+    def __len__(self):
+        return len(self.codes)
+
+    def is_open(self, cell):
+        """Ô nằm trong ma trận và không phải tường"""
+        x, y = cell % self.width, cell // self.width
+        return 0 <= y < self.height and x < len(self.matrix[y]) and cell not in self.walls
+
+    @property
+    def player_pos(self):
+        """Vị trí (x, y) của player ở bước hiện tại"""
+        player = self.players[self.index]
+        return player % self.width, player // self.width
+
+    def _put(self, cell, piece):
+        """Đặt piece ('@', '$' hoặc None) lên ô, giữ nguyên dock bên dưới"""
+        self.matrix[cell // self.width][cell % self.width] = _CELL_CHARS[cell in self.docks, piece]
+
+    def step_forward(self):
+        """Thực hiện nước đi tiếp theo, False nếu đã ở cuối lời giải"""
+        if self.index >= len(self.codes):
+            return False
+        player, code = self.players[self.index], self.codes[self.index]
+        target = player + self.offsets[code >> 1]
+        if code & 1:
+            self._put(target + self.offsets[code >> 1], '$')
+        self._put(player, None)
+        self._put(target, '@')
+        self.index += 1
+        return True
+
+    def step_backward(self):
+        """Hoàn tác nước đi vừa thực hiện, False nếu đang ở đầu lời giải"""
+        if self.index == 0:
+            return False
+        self.index -= 1
+        player, code = self.players[self.index], self.codes[self.index]
+        target = player + self.offsets[code >> 1]
+        if code & 1:
+            self._put(target + self.offsets[code >> 1], None)
+            self._put(target, '$')
+        else:
+            self._put(target, None)
+        self._put(player, '@')
+        return True
+
+    def seek(self, step):
+        """Chuyển tới trạng thái sau step nước đi (bị giới hạn trong [0, len]), từ keyframe gần nhất nếu ở xa"""
+        step = max(0, min(step, len(self.codes)))
+        if abs(step - self.index) > self.keyframe_interval:
+            self._restore(min(round(step / self.keyframe_interval), len(self.keyframes) - 1))
+        while self.index < step:
+            self.step_forward()
+        while self.index > step:
+            self.step_backward()
+
+    def _restore(self, keyframe):
+        """Dựng lại ma trận (tại chỗ) từ keyframe thứ keyframe"""
+        self.index = keyframe * self.keyframe_interval
+        for row in self.matrix:
+            for x, char in enumerate(row):
+                if char in ('@', '$'):
+                    row[x] = ' '
+                elif char in ('+', '*'):
+                    row[x] = '.'
+        for box in self.keyframes[keyframe]:
+            self._put(box, '$')
+        self._put(self.players[self.index], '@')
@@ -0,0 +1,326 @@
+"""
+Các thuật toán tìm kiếm BFS và A* trên trạng thái gọn, không phụ thuộc pygame
+Mỗi solver trả về (solution_path, stats): solution_path là list các bước (dx, dy) hoặc None,
+stats là dict {"time", "memory", "nodes", "solution_length", "status"} như bfs_stats/astar_stats của GUI,
+thêm "peak_rss" và "structures" (xem memory.py)
+status: "solved", "no_solution", "timeout", "node_limit" hoặc "memory_limit"
+"""
+import heapq
+import time
+from collections import deque
+
+from .constants import ALGORITHMS, HEURISTIC_METHODS, INFINITE_COST, SEARCH_MODES
+from .heuristic import HeuristicEngine
+from .level import LevelMap
+from .memory import MemoryMonitor, structure_sizes
+from .profiling import SearchProfiler, profile_call
+from .state import SearchTree, StateTable
+
+
+class SearchLimits:
+    """
+    Giới hạn thời gian (giây), số node và bộ nhớ (MB, so với lúc bắt đầu) cho một lần giải
+    Thời gian và bộ nhớ chỉ được đọc mỗi CHECK_INTERVAL node; mỗi lần đọc bộ nhớ cũng cập nhật đỉnh của monitor
+    progress(nodes_explored): được gọi cùng nhịp đó để báo tiến độ (xem _progress_reporter)
+    """
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, time_limit=None, node_limit=None, memory_limit=None, monitor=None, progress=None):
+        self.deadline = time.time() + time_limit if time_limit else None
+        self.node_limit = node_limit
+        self.memory_ceiling = monitor.start_memory + memory_limit if memory_limit else None
+        self.monitor = monitor
+        self.progress = progress
+
+    def exceeded(self, nodes_explored):
+        """Trả về "timeout"/"node_limit"/"memory_limit" nếu vượt giới hạn, ngược lại None"""
+        if self.node_limit and nodes_explored > self.node_limit:
+            return "node_limit"
+        if nodes_explored % self.CHECK_INTERVAL:
+            return None
+        if self.progress is not None:
+            self.progress(nodes_explored)
+        if self.deadline and time.time() > self.deadline:
+            return "timeout"
+        if self.monitor is not None:
+            memory = self.monitor.sample()
+            if self.memory_ceiling and memory > self.memory_ceiling:
+                return "memory_limit"
+        return None
+
+
+def _progress_reporter(progress, start_time, monitor, frontier_info):
+    """
+    Hàm cho SearchLimits: gọi progress(dict) với "nodes", "time", "nodes_per_sec", "memory" (MB),
+    "frontier" và các giá trị của frontier_info() (độ sâu của BFS, f nhỏ nhất của A*); None nếu không báo
+    """
+    if progress is None:
+        return None
+
+    def report(nodes_explored):
+        elapsed = time.time() - start_time
+        info = {
+            "nodes": nodes_explored,
+            "time": elapsed,
+            "nodes_per_sec": nodes_explored / elapsed if elapsed > 0 else 0.0,
+            "memory": monitor.sample() - monitor.start_memory,
+        }
+        info.update(frontier_info())
+        progress(info)
+
+    return report
+
+
+def _finish(start_time, monitor, nodes_explored, solution_path, status, structures=None, final=True):
+    """
+    Thống kê chung của các solver
+    structures: dict tên -> cấu trúc dữ liệu (frontier, closed, tree, heuristic...) để ước lượng kích thước
+    final=False: thống kê giữa chừng (anytime), monitor tiếp tục lấy mẫu
+    """
+    if status is None:
+        status = "solved" if solution_path is not None else "no_solution"
+    stats = {
+        "time": time.time() - start_time,
+        "nodes": nodes_explored,
+        "solution_length": len(solution_path) if solution_path is not None else 0,
+        "status": status
+    }
+    stats.update(monitor.stats())
+    if final:
+        monitor.stop()
+    if structures:
+        stats["structures"] = structure_sizes(**structures)
+    return stats
+
+
+def _start(matrix, mode, macros=False):
+    """
+    Dựng bản đồ tĩnh và trạng thái đầu/bộ sinh successor theo chế độ tìm kiếm
+    macros: sinh cả nước đẩy gộp qua đường hầm/vào phòng đích (chỉ chế độ "push", xem macros.py)
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    level = LevelMap(matrix, macros=macros and mode == "push")
+    if mode == "push":
+        successors = level.macros.successors if level.macros is not None else level.push_successors
+        return level, level.normalize(level.initial_state), successors
+    return level, level.initial_state, level.move_successors
+
+
+def solve_bfs(matrix, mode=SEARCH_MODES[0], exact=False, time_limit=None, node_limit=None, profile=False,
+              progress=None, macros=False):
+    """
+    Thuật toán BFS để tìm đường đi trong Sokoban
+    mode: "push" (mỗi node là một nước đẩy) hoặc "move" (mỗi node là một bước đi)
+    exact: so sánh đầy đủ trạng thái khi trùng khóa Zobrist
+    time_limit (giây), node_limit: dừng tìm kiếm khi vượt giới hạn
+    profile: đo thời gian từng pha, kết quả trong stats["profile"] (xem SearchProfiler)
+    progress: hàm nhận dict tiến độ mỗi SearchLimits.CHECK_INTERVAL node, có thêm "depth" của tầng đang duyệt
+    macros: dùng nước đẩy gộp (chế độ "push"); BFS khi đó ít action nhất, không còn chắc ít nước đẩy nhất
+    (stats["macros"] = True đánh dấu lời giải không được coi là tối ưu)
+    """
+    # phần chuẩn bị thông số để đo thời gian và bộ nhớ
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    nodes_explored = 0
+    solution_path = None
+    status = None
+
+    # Bản đồ tĩnh tính một lần, mỗi trạng thái chỉ gồm (boxes, player)
+    level, initial_state, successors = _start(matrix, mode, macros)
+    profiler = SearchProfiler() if profile else None
+    if profiler is not None:
+        successors = profiler.instrument(level, successors)
+    # visited dùng khóa Zobrist (int) thay vì chuỗi matrix
+    visited = StateTable(exact)
+    # queue chỉ giữ (node id, state), đường đi được lưu bằng con trỏ cha trong tree
+    tree = SearchTree(mode == "push")
+    queue = deque()
+    queue.append((0, initial_state))
+    visited.add(initial_state)
+    limits = SearchLimits(time_limit, node_limit, monitor=monitor, progress=_progress_reporter(
+        progress, start_time, monitor,
+        lambda: {"frontier": len(queue), "depth": tree.depth(queue[0][0]) if queue else 0}))
+
+    while queue:
+        nodes_explored += 1
+        status = limits.exceeded(nodes_explored)
+        if status:
+            nodes_explored -= 1  # node này chưa được mở rộng
+            break
+        node, current_state = queue.popleft()
+        if level.is_goal(current_state.boxes):
+            # dựng lại các bước đi (kể cả đoạn đi bộ giữa các nước đẩy) để auto-play
+            solution_path = level.solution_moves(tree.actions(node), mode)
+            break
+        # kiểm tra deadlock (trạng thái đầu), các successor đã được lọc khi sinh
+        if nodes_explored == 1 and level.is_deadlock(current_state.boxes):
+            continue
+        for action, new_state in successors(current_state):
+            # tránh lặp trạng thái đã visited nếu chưa có thì thêm vào visited
+            if visited.add(new_state):
+                queue.append((tree.add(node, action), new_state))
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status,
+                    {"frontier": queue, "closed": visited, "tree": tree})
+    if level.macros is not None:
+        stats["macros"] = True
+    if profiler is not None:
+        # Mỗi successor sinh ra hoặc thành node mới của tree hoặc đã có trong visited
+        stats["profile"] = profiler.report(duplicates=profiler.counters.get("generated", 0) - (len(tree) - 1))
+    return solution_path, stats
+
+
+def solve_astar(matrix, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+                time_limit=None, node_limit=None, profile=False, progress=None, macros=False):
+    """
+    Thuật toán A* để tìm đường đi tối ưu trong Sokoban
+    mode: "push" (tối ưu số nước đẩy) hoặc "move" (tối ưu số bước đi)
+    exact: so sánh đầy đủ trạng thái khi trùng khóa Zobrist
+    heuristic_method: "hungarian" hoặc "greedy"
+    time_limit (giây), node_limit: dừng tìm kiếm khi vượt giới hạn
+    profile: đo thời gian từng pha, kết quả trong stats["profile"] (xem SearchProfiler)
+    progress: hàm nhận dict tiến độ mỗi SearchLimits.CHECK_INTERVAL node, có thêm "f_bound": f nhỏ nhất còn mở
+    macros: dùng nước đẩy gộp (chế độ "push"), chi phí của macro là số nước đẩy của nó; macro đường hầm
+    có thể đẩy box sâu hơn mức cần nên lời giải không còn chắc tối ưu (stats["macros"] = True)
+    """
+    start_time = time.time()
+    monitor = MemoryMonitor()
+
+    # Khởi tạo: bản đồ tĩnh tính một lần, mỗi trạng thái chỉ gồm (boxes, player)
+    level, initial_state, successors = _start(matrix, mode, macros)
+    action_cost = level.macros.cost if level.macros is not None else None
+    visited = StateTable(exact)  # Set of visited vertices (theo khóa Zobrist)
+    open_list = []  # Priority queue (heap)
+
+    # Bảng lưu trữ g_score (distance from start), predecessor được lưu bằng con trỏ cha trong tree
+    g_scores = StateTable(exact)
+    g_scores.set(initial_state, 0)
+    tree = SearchTree(mode == "push")
+
+    # Bảng khoảng cách đẩy tính một lần cho level
+    engine = HeuristicEngine(level, heuristic_method)
+    profiler = SearchProfiler() if profile else None
+    if profiler is not None:
+        successors = profiler.instrument(level, successors, engine)
+
+    # Tính f_score cho trạng thái đầu, h_info (chi phí từng box) đi kèm node để cập nhật tăng dần
+    h_score, h_info = engine.initial(initial_state.boxes)
+    f_score = 0 + h_score
+
+    # Push start node vào open_list với priority = f_score
+    # node id tăng dần nên cũng dùng để phá hòa, tránh so sánh trực tiếp các SearchState
+    # h = INFINITE_COST nghĩa là không thể ghép box vào dock: không có lời giải
+    if h_score < INFINITE_COST:
+        heapq.heappush(open_list, (f_score, 0, 0, initial_state, h_info))
+
+    limits = SearchLimits(time_limit, node_limit, monitor=monitor, progress=_progress_reporter(
+        progress, start_time, monitor,
+        lambda: {"frontier": len(open_list), "f_bound": open_list[0][0] if open_list else None}))
+    nodes_explored = 0
+    solution_path = None
+    status = None
+
+    while open_list:
+        # Pop node có f_score thấp nhất
+        current_f, current_g, node, current_state, current_h_info = heapq.heappop(open_list)
+        current_h = current_f - current_g
+
+        # Kiểm tra nếu đã visited thì skip
+        if current_state in visited:
+            continue
+        visited.set(current_state)
+        nodes_explored += 1
+        status = limits.exceeded(nodes_explored)
+        if status:
+            nodes_explored -= 1  # node này chưa được mở rộng
+            break
+
+        # Kiểm tra goal state
+        if level.is_goal(current_state.boxes):
+            solution_path = level.solution_moves(tree.actions(node), mode)
+            break
+
+        # Skip deadlock states để tối ưu (early pruning)
+        # Các successor đã được lọc deadlock khi sinh, chỉ cần kiểm tra trạng thái đầu
+        if current_g == 0 and level.is_deadlock(current_state.boxes):
+            continue
+
+        # Expand các successor (neighbor states)
+        for action, succ_state in successors(current_state):
+            # Kiểm tra nếu successor đã visited thì skip
+            if succ_state in visited:
+                continue
+
+            # Tính g_score mới (distance from start)
+            # cost = 1 cho mỗi move (hoặc mỗi push), macro tính theo số nước đẩy
+            new_g_score = current_g + (action_cost(current_state, action) if action_cost else 1)
+
+            # Tính h_score (heuristic) tăng dần từ node cha theo box vừa bị đẩy,
+            # bỏ qua trạng thái không thể ghép box vào dock
+            h_score, h_info = engine.update(current_state.boxes, current_h, current_h_info,
+                                            level.pushed_box(current_state, action, succ_state),
+                                            succ_state.boxes)
+            if h_score >= INFINITE_COST:
+                continue
+
+            # Tính f_score = g + h
+            f_score = new_g_score + h_score
+
+            # Chỉ thêm vào open_list nếu successor chưa có g_score hoặc tìm được đường tốt hơn
+            old_g_score = g_scores.get(succ_state)
+            if old_g_score is None or new_g_score < old_g_score:
+                g_scores.set(succ_state, new_g_score)
+                heapq.heappush(open_list, (f_score, new_g_score, tree.add(node, action), succ_state, h_info))
+
+    stats = _finish(start_time, monitor, nodes_explored, solution_path, status,
+                    {"frontier": open_list, "closed": (visited, g_scores), "tree": tree,
+                     "heuristic": engine.tables})
+    if level.macros is not None:
+        stats["macros"] = True
+    if profiler is not None:
+        # Mỗi node của tree là một lần push vào open_list: trạng thái mới hoặc trạng thái cũ có g tốt hơn (mở lại)
+        pushed = len(tree) - 1
+        stats["profile"] = profiler.report(
+            duplicates=profiler.counters.get("generated", 0) - profiler.counters.get("heuristic_pruned", 0) - pushed,
+            reopened=len(tree) - len(g_scores))
+    return solution_path, stats
+
+
+def solve(matrix, algorithm, mode=SEARCH_MODES[0], exact=False, heuristic_method=HEURISTIC_METHODS[0],
+          time_limit=None, node_limit=None, workers=None, table_size=None, memory_limit=None, work_dir=None,
+          profile=False, profile_path=None, progress=None, macros=False):
+    """
+    Chạy solver theo tên thuật toán (một trong ALGORITHMS), trả về (solution_path, stats)
+    workers: số tiến trình của "hda"
+    table_size, memory_limit: bảng chuyển vị và trần bộ nhớ (MB) của "ida"
+    work_dir: thư mục file tạm của "external"
+    profile: bộ đếm theo pha của "bfs"/"astar" trong stats["profile"]
+    profile_path: chạy dưới cProfile và ghi file pstats (mọi thuật toán, với "hda" chỉ tiến trình điều phối)
+    progress: hàm nhận dict tiến độ định kỳ của "bfs"/"astar" (xem _progress_reporter)
+    macros: nước đẩy gộp qua đường hầm/vào phòng đích của "bfs"/"astar" ở chế độ "push"
+    """
+    if profile_path:
+        return profile_call(profile_path, solve, matrix, algorithm, mode, exact, heuristic_method, time_limit,
+                            node_limit, workers, table_size, memory_limit, work_dir, profile, None, progress, macros)
+    if algorithm == "bfs":
+        return solve_bfs(matrix, mode, exact, time_limit, node_limit, profile, progress, macros)
+    if algorithm == "astar":
+        return solve_astar(matrix, mode, exact, heuristic_method, time_limit, node_limit, profile, progress, macros)
+    if algorithm == "hda":
+        from .parallel import solve_parallel_astar  # parallel.py dùng lại các hàm của module này
+        return solve_parallel_astar(matrix, mode, exact, heuristic_method, time_limit, node_limit, workers)
+    if algorithm == "bidir":
+        from .bidirectional import solve_bidirectional
+        return solve_bidirectional(matrix, mode, exact, time_limit, node_limit)
+    if algorithm == "ida":
+        from .ida import solve_ida
+        return solve_ida(matrix, mode, exact, heuristic_method, time_limit, node_limit, table_size, memory_limit)
+    if algorithm == "anytime":
+        from .anytime import solve_anytime
+        return solve_anytime(matrix, mode, exact, heuristic_method, time_limit, node_limit)
+    if algorithm == "external":
+        from .external import solve_external_bfs
+        return solve_external_bfs(matrix, mode, time_limit, node_limit, work_dir)
+    raise ValueError(f"Unknown algorithm: {algorithm} (expected one of {', '.join(ALGORITHMS)})")
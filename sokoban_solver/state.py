@@ -0,0 +1,204 @@
+"""
+Trạng thái gọn của solver: SearchState, khóa Zobrist, bảng trạng thái, cây tìm kiếm và bảng chuyển vị
+"""
+import random
+import sys
+from array import array
+
+from .constants import ZOBRIST_SEED
+
+
+class SearchState:
+    """
+    Trạng thái gọn cho solver: tuple chỉ số các box (đã sắp xếp) và chỉ số ô của player
+    box_hash: khóa Zobrist của riêng các box, key: box_hash ^ khóa của player
+    """
+    __slots__ = ('boxes', 'player', 'box_hash', 'key')
+
+    def __init__(self, boxes, player, box_hash, key):
+        self.boxes = boxes
+        self.player = player
+        self.box_hash = box_hash
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key and self.player == other.player and self.boxes == other.boxes
+
+    def __hash__(self):
+        return self.key
+
+
+class ZobristTable:
+    """
+    Khóa Zobrist 64-bit ngẫu nhiên cho mỗi (ô, box) và (ô, player), tạo một lần mỗi level
+    Một bước đi/nước đẩy chỉ cần vài phép XOR để cập nhật khóa
+    """
+
+    def __init__(self, size, seed=ZOBRIST_SEED):
+        rng = random.Random(seed)
+        self.box_keys = [rng.getrandbits(64) for _ in range(size)]
+        self.player_keys = [rng.getrandbits(64) for _ in range(size)]
+
+    def hash_boxes(self, boxes):
+        """Tính khóa đầy đủ của tập box (chỉ dùng cho trạng thái đầu)"""
+        box_hash = 0
+        for box in boxes:
+            box_hash ^= self.box_keys[box]
+        return box_hash
+
+
+class StateTable:
+    """
+    Bảng trạng thái (visited/closed, g_scores) dùng khóa Zobrist kiểu int thay cho chuỗi matrix
+    exact=True: lưu thêm (boxes, player) để so sánh đầy đủ, trạng thái trùng khóa được
+    đưa sang bảng phụ nên không bao giờ bị gộp nhầm
+    """
+    __slots__ = ('exact', 'values', 'states', 'overflow')
+
+    def __init__(self, exact=False):
+        self.exact = exact
+        self.values = {}  # key -> value
+        self.states = {}  # key -> (boxes, player), chỉ dùng khi exact
+        self.overflow = {}  # (boxes, player) -> value cho các trạng thái trùng khóa
+
+    def _collides(self, state):
+        return self.states[state.key] != (state.boxes, state.player)
+
+    def __contains__(self, state):
+        if state.key not in self.values:
+            return False
+        if self.exact and self._collides(state):
+            return (state.boxes, state.player) in self.overflow
+        return True
+
+    def __len__(self):
+        return len(self.values) + len(self.overflow)
+
+    def get(self, state, default=None):
+        key = state.key
+        if key not in self.values:
+            return default
+        if self.exact and self._collides(state):
+            return self.overflow.get((state.boxes, state.player), default)
+        return self.values[key]
+
+    def set(self, state, value=True):
+        key = state.key
+        if self.exact:
+            if key not in self.states:
+                self.states[key] = (state.boxes, state.player)
+            elif self._collides(state):
+                self.overflow[(state.boxes, state.player)] = value
+                return
+        self.values[key] = value
+
+    def add(self, state):
+        """Thêm trạng thái vào tập, trả về False nếu đã có"""
+        if state in self:
+            return False
+        self.set(state)
+        return True
+
+
+class SearchTree:
+    """
+    Cây tìm kiếm lưu bằng các mảng song song đánh chỉ số theo node id:
+    parents[id] là node cha, directions[id] là hướng đi/đẩy dẫn tới node,
+    pushed[id] là ô của box bị đẩy (chỉ dùng ở chế độ "push")
+    Mỗi node chỉ tốn vài byte thay vì cả list đường đi, đường đi được dựng lại một lần khi tới đích
+    """
+    __slots__ = ('parents', 'directions', 'pushed', 'push_mode')
+
+    def __init__(self, push_mode):
+        self.push_mode = push_mode
+        # Node 0 là gốc (trạng thái đầu), cha của gốc là chính nó
+        self.parents = array('I', [0])
+        self.directions = array('b', [-1])
+        self.pushed = array('I', [0]) if push_mode else None
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent, action):
+        """Thêm node con của parent ứng với action, trả về node id mới"""
+        node = len(self.parents)
+        self.parents.append(parent)
+        if self.push_mode:
+            box, d = action
+            self.pushed.append(box)
+            self.directions.append(d)
+        else:
+            self.directions.append(action)
+        return node
+
+    def depth(self, node):
+        """Số action giữa node và gốc của nó (gốc có hướng -1)"""
+        depth = 0
+        while self.directions[node] >= 0:
+            node = self.parents[node]
+            depth += 1
+        return depth
+
+    def actions(self, node):
+        """Dựng lại danh sách action từ gốc tới node theo con trỏ cha"""
+        actions = []
+        while node != 0:
+            if self.push_mode:
+                actions.append((self.pushed[node], self.directions[node]))
+            else:
+                actions.append(self.directions[node])
+            node = self.parents[node]
+        actions.reverse()
+        return actions
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị kích thước cố định cho IDA*: slot key % size giữ khóa, g và vòng lặp ghi nhận
+    Bộ nhớ cấp phát một lần (ENTRY_BYTES mỗi slot) nên không tăng theo số node đã duyệt
+    Thay thế: slot của vòng lặp trước hoặc có g lớn hơn bị ghi đè (giữ node gần gốc, cây con lớn hơn)
+    exact=True: lưu thêm (boxes, player) để không bao giờ cắt nhầm trạng thái trùng khóa
+    """
+    __slots__ = ('size', 'keys', 'g_scores', 'iterations', 'states')
+    ENTRY_BYTES = 16
+
+    def __init__(self, size, exact=False):
+        self.size = size
+        self.keys = array('Q', bytes(8 * size))
+        self.g_scores = array('I', bytes(4 * size))
+        self.iterations = array('I', bytes(4 * size))  # 0 = slot trống, vòng lặp đánh số từ 1
+        self.states = [None] * size if exact else None
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def entry_bytes(cls, exact=False, state=None):
+        """
+        Bộ nhớ (byte) của một slot; exact: cộng thêm con trỏ trong states, tuple (boxes, player)
+        cùng tuple boxes và các số của nó, ước lượng theo một trạng thái mẫu state
+        """
+        if not exact or state is None:
+            return cls.ENTRY_BYTES
+        return (cls.ENTRY_BYTES + 8 + sys.getsizeof((state.boxes, state.player)) + sys.getsizeof(state.boxes)
+                + sum(sys.getsizeof(cell) for cell in state.boxes) + sys.getsizeof(state.player))
+
+    def prune(self, state, g, iteration):
+        """
+        True nếu state đã được duyệt trong vòng lặp này với g không lớn hơn (cây con đã xét đủ)
+        Ngược lại ghi nhận (state, g) theo chính sách thay thế và trả về False
+        """
+        slot = state.key % self.size
+        same_iteration = self.iterations[slot] == iteration
+        if same_iteration and self.keys[slot] == state.key and (
+                self.states is None or self.states[slot] == (state.boxes, state.player)):
+            if self.g_scores[slot] <= g:
+                return True
+        elif same_iteration and self.g_scores[slot] < g:
+            return False  # Giữ node gần gốc hơn đang chiếm slot
+        self.keys[slot] = state.key
+        self.g_scores[slot] = g
+        self.iterations[slot] = iteration
+        if self.states is not None:
+            self.states[slot] = (state.boxes, state.player)
+        return False
@@ -0,0 +1,48 @@
+"""
+Fixture và hàm dùng chung cho các test của sokoban_solver (chạy bằng `python -m pytest` ở thư mục gốc)
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sokoban_solver import LevelCollection, apply_move, find_player, get_valid_moves, is_level_completed  # noqa: E402
+
+
+def make_level(*rows):
+    """Ma trận ký tự từ các dòng chuỗi"""
+    return [list(row) for row in rows]
+
+
+def play(matrix, moves):
+    """Đi lần lượt moves (mỗi bước phải hợp lệ), trả về ma trận cuối"""
+    player = find_player(matrix)
+    for step, move in enumerate(moves):
+        assert tuple(move) in [tuple(valid) for valid in get_valid_moves(matrix, player)], f"invalid step {step}"
+        matrix, player = apply_move(matrix, player, move)
+    return matrix
+
+
+def push_count(matrix, moves):
+    """Số nước đẩy box của lời giải moves"""
+    count = 0
+    player = find_player(matrix)
+    for move in moves:
+        x, y = player[0] + move[0], player[1] + move[1]
+        count += matrix[y][x] in ('$', '*')
+        matrix, player = apply_move(matrix, player, move)
+    return count
+
+
+def assert_solves(matrix, moves):
+    assert moves is not None
+    assert is_level_completed(play(matrix, moves))
+
+
+@pytest.fixture(scope="session")
+def microcosmos():
+    return LevelCollection(os.path.join(ROOT, "MicroCosmos.txt"))
@@ -0,0 +1,67 @@
+"""Phân tích tĩnh của level (LevelAnalysis): khung đã cắt, ô chết, đường hầm, điểm khớp, phòng"""
+from sokoban_solver.analysis import HORIZONTAL_TUNNEL, VERTICAL_TUNNEL, LevelAnalysis, analyze
+
+from conftest import make_level
+
+# Hai phòng nối bằng đường hầm ngang (4..6, 2), phòng phải có dock và một lối vào duy nhất
+TWO_ROOMS = make_level("###########",
+                       "#   ###   #",
+                       "# @$     .#",
+                       "#   ###   #",
+                       "###########")
+# Đường hầm dọc (4, 3..4) nối phòng của player với phòng dưới có dock
+VERTICAL = make_level("  #####",
+                      "  #   #",
+                      "  # @ #",
+                      "#### ##",
+                      "#### ##",
+                      "#  $  #",
+                      "# .   #",
+                      "#     #",
+                      "#######")
+
+
+def test_trimmed_frame_and_coordinates():
+    analysis = analyze(TWO_ROOMS)
+    assert (analysis.left, analysis.top) == (0, 0)
+    padded = [list("   ") + row for row in TWO_ROOMS]
+    shifted = LevelAnalysis([''.join(row) for row in padded])
+    assert shifted.left == 3
+    assert shifted.coords(shifted.cell_of(5, 2)) == (5, 2)
+    assert shifted.cell_of(1, 2) == -1  # ngoài tường
+    assert len(shifted.cells) == len(analysis.cells)
+
+
+def test_dead_squares():
+    analysis = analyze(TWO_ROOMS)
+    assert analysis.dead_squares[analysis.cell_of(1, 1)]  # góc
+    assert analysis.dead_squares[analysis.cell_of(2, 1)]  # sát tường trên, không có dock
+    assert not analysis.dead_squares[analysis.cell_of(5, 2)]
+    assert not analysis.dead_squares[analysis.cell_of(9, 2)]  # dock
+
+
+def test_tunnels():
+    analysis = analyze(TWO_ROOMS)
+    for x in (4, 5, 6):
+        assert analysis.tunnels[analysis.cell_of(x, 2)] == HORIZONTAL_TUNNEL
+    assert not analysis.tunnels[analysis.cell_of(3, 2)]
+    vertical = analyze(VERTICAL)
+    for y in (3, 4):
+        assert vertical.tunnels[vertical.cell_of(4, y)] == VERTICAL_TUNNEL
+
+
+def test_articulation_points_and_rooms():
+    analysis = analyze(TWO_ROOMS)
+    for x in (3, 4, 5, 6, 7):
+        assert analysis.cell_of(x, 2) in analysis.articulation_points
+    assert analysis.cell_of(2, 2) not in analysis.articulation_points
+    assert len(analysis.rooms) == 2
+    left, right = (analysis.room_of[analysis.cell_of(x, 2)] for x in (1, 9))
+    assert left != right and left >= 0 and right >= 0
+    assert analysis.room_of[analysis.cell_of(5, 2)] == -1  # đường hầm không thuộc phòng nào
+
+
+def test_analysis_is_shared_per_static_layout():
+    moved = [row[:] for row in TWO_ROOMS]
+    moved[2][2], moved[2][1] = ' ', '@'
+    assert analyze(moved) is analyze(TWO_ROOMS)
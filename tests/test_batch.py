@@ -0,0 +1,29 @@
+"""solve_batch: mỗi level trả về đúng một bản ghi qua process pool, giới hạn của từng level không làm treo pool"""
+import pytest
+
+from sokoban_solver.batch import solve_batch
+
+# Chỉ số (từ 0) của các level MicroCosmos giải nhanh, và của các level cần hơn CHECK_INTERVAL node
+EASY = [0, 3, 12]
+LARGE = [5, 13]
+
+
+def test_results_stream_back_once_per_level(microcosmos):
+    records = list(solve_batch(microcosmos, EASY, "astar", "push", jobs=2))
+    assert sorted(record["level"] for record in records) == [index + 1 for index in EASY]
+    for record in records:
+        assert record["status"] == "solved"
+        assert record["solved"] is True
+        assert record["moves"] == len(record["solution"]) > 0
+        assert record["pushes"] == sum(letter.isupper() for letter in record["solution"])
+
+
+@pytest.mark.parametrize("limits, status", [({"node_limit": 50}, "node_limit"),
+                                            ({"time_limit": 1e-6}, "timeout")])
+def test_limits_end_each_level_without_stopping_the_pool(microcosmos, limits, status):
+    records = list(solve_batch(microcosmos, LARGE, "astar", "push", jobs=2, **limits))
+    assert sorted(record["level"] for record in records) == [index + 1 for index in LARGE]
+    for record in records:
+        assert record["status"] == status
+        assert record["solved"] is False
+        assert record["solution"] is None
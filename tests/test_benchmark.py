@@ -0,0 +1,62 @@
+"""compare() và mã thoát của benchmark khi có regression so với baseline"""
+import json
+import os
+
+from sokoban_solver.benchmark import BENCHMARK_FORMAT, compare, main
+
+LEVEL_FILE = """\
+Level 1
+######
+#@$ .#
+######
+"""
+
+
+def result(level, status="solved", **metrics):
+    values = {"time": 1.0, "nodes": 100, "peak_memory": 50.0, "solution_length": 20}
+    values.update(metrics)
+    return dict(values, level_file="set.txt", level=level, algorithm="astar", status=status)
+
+
+def benchmark(*results):
+    return {"format": BENCHMARK_FORMAT, "results": list(results)}
+
+
+def test_compare_reports_regressions_over_the_threshold():
+    baseline = benchmark(result(1), result(2), result(3), result(4, status="timeout"))
+    current = benchmark(result(1, nodes=150, time=1.1), result(2, status="timeout"),
+                        result(3, nodes=119, time=1.04, peak_memory=54.0), result(4, nodes=1000),
+                        result(5, nodes=1000))
+    regressions = compare(current, baseline, threshold=0.2)
+    assert [(regression["level"], regression["metric"]) for regression in regressions] == [(1, "nodes"), (2, "status")]
+    assert regressions[0]["ratio"] == 1.5
+    assert regressions[1]["current"] == "timeout"
+
+
+def test_small_absolute_changes_are_ignored():
+    # Thời gian và bộ nhớ tăng hơn ngưỡng tương đối nhưng chênh lệch tuyệt đối quá nhỏ để tính
+    baseline = benchmark(result(1, time=0.01, peak_memory=1.0))
+    current = benchmark(result(1, time=0.04, peak_memory=4.0))
+    assert compare(current, baseline) == []
+
+
+def test_exit_code_is_non_zero_only_when_something_regressed(tmp_path):
+    level_file = os.path.join(tmp_path, "set.txt")
+    with open(level_file, 'w', encoding='utf-8') as file:
+        file.write(LEVEL_FILE)
+    baseline_file = os.path.join(tmp_path, "baseline.json")
+    arguments = ["--level-files", level_file, "-a", "astar", "--time-limit", "10"]
+    assert main(arguments + ["-o", baseline_file]) == 0
+    output = os.path.join(tmp_path, "current.json")
+    assert main(arguments + ["-o", output, "--baseline", baseline_file]) == 0
+
+    with open(baseline_file, encoding='utf-8') as file:
+        baseline = json.load(file)
+    baseline["results"][0]["nodes"] = 0
+    baseline["results"][0]["solution_length"] = 1
+    with open(baseline_file, 'w', encoding='utf-8') as file:
+        json.dump(baseline, file)
+    assert main(arguments + ["-o", output, "--baseline", baseline_file]) == 1
+    with open(output, encoding='utf-8') as file:
+        regressions = json.load(file)["baseline"]["regressions"]
+    assert {regression["metric"] for regression in regressions} == {"nodes", "solution_length"}
@@ -0,0 +1,78 @@
+"""SolutionCache: tra trúng, khóa theo tùy chọn và xóa bản ghi lâu không dùng nhất (LRU)"""
+import os
+import time
+
+import pytest
+
+from sokoban_solver import SolutionCache, solve_cached
+
+from conftest import assert_solves, make_level
+
+LEVEL = make_level("######",
+                   "#@$ .#",
+                   "######")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SolutionCache(os.path.join(tmp_path, "solutions.sqlite"), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def level_with_gap(gap):
+    """Level một box cách dock gap ô, mỗi gap là một bố cục (khóa cache) khác nhau"""
+    return make_level("#" * (gap + 5), "#@$" + " " * gap + ".#", "#" * (gap + 5))
+
+
+def test_hit_returns_the_stored_solution(cache):
+    solution_path, stats = solve_cached(cache, LEVEL, "astar")
+    assert "cached" not in stats
+    cached_path, cached_stats = solve_cached(cache, LEVEL, "astar")
+    assert cached_stats["cached"] is True
+    assert cached_path == solution_path
+    assert_solves(LEVEL, cached_path)
+
+
+def test_layout_is_canonical_and_options_are_part_of_the_key(cache):
+    solve_cached(cache, LEVEL, "astar")
+    padded = [row + [' ', ' '] for row in LEVEL] + [[]]
+    assert cache.get(padded, "astar") is not None
+    assert cache.get(LEVEL, "bfs") is None
+    assert cache.get(LEVEL, "astar", "move") is None
+    assert cache.get(LEVEL, "astar", heuristic_method="greedy") is None
+    _, stats = solve_cached(cache, LEVEL, "astar", macros=True)
+    assert "cached" not in stats
+
+
+def test_limited_results_are_not_stored(cache):
+    _, stats = solve_cached(cache, level_with_gap(3), "bfs", node_limit=1)
+    assert stats["status"] == "node_limit"
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    first, second, third = (level_with_gap(gap) for gap in (1, 2, 3))
+    solve_cached(cache, first, "astar")
+    time.sleep(0.01)
+    solve_cached(cache, second, "astar")
+    time.sleep(0.01)
+    assert cache.get(first, "astar") is not None  # first được dùng gần hơn second
+    time.sleep(0.01)
+    solve_cached(cache, third, "astar")
+    assert len(cache) == 2
+    assert cache.get(second, "astar") is None
+    assert cache.get(first, "astar") is not None
+    assert cache.get(third, "astar") is not None
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = os.path.join(tmp_path, "solutions.sqlite")
+    cache = SolutionCache(path)
+    solve_cached(cache, LEVEL, "bfs")
+    cache.close()
+    cache = SolutionCache(path)
+    try:
+        assert cache.get(LEVEL, "bfs") is not None
+    finally:
+        cache.close()
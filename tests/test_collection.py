@@ -0,0 +1,126 @@
+"""Đọc bộ level dạng "Level N", XSB/SOK và run-length qua LevelCollection"""
+import json
+import os
+
+from sokoban_solver import LevelCollection
+from sokoban_solver.collection import INDEX_SUFFIX, board_rows, expand_row
+
+from conftest import make_level
+
+SOK_FILE = """\
+; Bộ level thử
+Author: someone
+
+Title: First
+#####
+#@$.#
+#####
+Comment:
+#### không phải bàn chơi ####
+Comment-End:
+
+; Second
+4#|#p-#|#bB#|#.-#|4#
+
+Third
+-###
+##.#
+#@$#
+####
+Title: Third renamed
+"""
+
+LEVEL_N_FILE = """\
+Level 1
+#####
+#@$.#
+#####
+
+Level 2
+######
+#@ $.#
+######
+"""
+
+
+def write(tmp_path, name, content):
+    path = os.path.join(tmp_path, name)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return path
+
+
+def test_expand_row_run_length():
+    assert expand_row("3#-2$") == ["### $$"]
+    assert expand_row("3#|#.#") == ["###", "#.#"]
+    assert expand_row("#pPbB_#") == ["#@+$* #"]
+
+
+def test_sok_levels_titles_and_rle(tmp_path):
+    levels = LevelCollection(write(tmp_path, "set.sok", SOK_FILE))
+    assert len(levels) == 3
+    assert levels[0] == make_level("#####", "#@$.#", "#####")
+    assert levels[1] == make_level("####", "#@ #", "#$*#", "#. #", "####")
+    assert levels[2] == make_level(" ###", "##.#", "#@$#", "####")
+    assert [levels.title(index) for index in range(3)] == ["First", "Second", "Third renamed"]
+
+
+def test_level_n_format(tmp_path):
+    levels = LevelCollection(write(tmp_path, "set.txt", LEVEL_N_FILE))
+    assert list(levels) == [make_level("#####", "#@$.#", "#####"), make_level("######", "#@ $.#", "######")]
+    assert levels.title(1) == "Level 2"
+
+
+WALL_TITLES_FILE = """\
+; ###
+#####
+#@$.#
+#####
+#3
+  ####
+###  #
+#@$. #
+######
+###
+
+#####
+#@*.#
+#####
+"""
+
+
+def test_board_rows_are_wall_bounded():
+    assert board_rows("  #@$.#  ") == ["  #@$.#"]
+    assert board_rows("4#|#p-#") == ["####", "#@ #"]
+    assert board_rows("#3") is None
+    assert board_rows("3#|") is None
+    assert board_rows("#@$. ") is None
+    assert board_rows(" 12 ") is None
+
+
+def test_titles_made_of_board_characters_stay_out_of_the_boards(tmp_path):
+    levels = LevelCollection(write(tmp_path, "walls.sok", WALL_TITLES_FILE))
+    assert list(levels) == [make_level("#####", "#@$.#", "#####"),
+                            make_level("  ####", "###  #", "#@$. #", "######"),
+                            make_level("#####", "#@*.#", "#####")]
+    assert [levels.title(index) for index in range(3)] == ["###", "#3", "###"]
+
+
+def test_reference_loads_the_same_level(tmp_path):
+    levels = LevelCollection(write(tmp_path, "set.txt", LEVEL_N_FILE))
+    assert levels.reference(1).load() == levels[1]
+
+
+def test_index_is_cached_and_rebuilt_when_the_file_changes(tmp_path):
+    path = write(tmp_path, "set.txt", LEVEL_N_FILE)
+    assert len(LevelCollection(path)) == 2
+    with open(path + INDEX_SUFFIX, encoding='utf-8') as file:
+        assert len(json.load(file)["levels"]) == 2
+    write(tmp_path, "set.txt", LEVEL_N_FILE + "\nLevel 3\n####\n#@*#\n####\n")
+    assert len(LevelCollection(path)) == 3
+
+
+def test_bundled_collections(microcosmos):
+    assert len(microcosmos) == 40
+    for matrix in microcosmos:
+        assert sum(row.count('@') + row.count('+') for row in matrix) == 1
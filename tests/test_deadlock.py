@@ -0,0 +1,90 @@
+"""Deadlock freeze và khối 2x2 quanh box vừa bị đẩy (DeadlockDetector)"""
+from sokoban_solver import LevelMap
+
+from conftest import make_level
+
+
+def boxes_of(*rows):
+    """LevelMap của level và tập ô box của trạng thái đầu"""
+    level = LevelMap(make_level(*rows))
+    return level, set(level.initial_state.boxes)
+
+
+def check(level, box_set, x, y):
+    box = level.index(x, y)
+    detector = level.deadlocks
+    return detector.is_freeze_deadlock(box_set, box), detector.is_block_deadlock(box_set, box)
+
+
+def test_pair_against_a_wall_is_frozen():
+    level, box_set = boxes_of("########",
+                              "#. $$ .#",
+                              "#      #",
+                              "#  @   #",
+                              "########")
+    assert check(level, box_set, 3, 1) == (True, True)
+    assert level.deadlocks.is_deadlock(box_set, level.index(4, 1))
+
+
+def test_single_box_against_a_wall_can_still_move():
+    level, box_set = boxes_of("########",
+                              "#. $  .#",
+                              "#      #",
+                              "#  @   #",
+                              "########")
+    assert check(level, box_set, 3, 1) == (False, False)
+
+
+def test_frozen_boxes_on_docks_are_not_a_deadlock():
+    level, box_set = boxes_of("########",
+                              "#  **  #",
+                              "#      #",
+                              "#  @   #",
+                              "########")
+    assert check(level, box_set, 3, 1) == (False, False)
+
+
+def test_pair_in_open_floor_is_not_frozen():
+    level, box_set = boxes_of("########",
+                              "#.    .#",
+                              "#  $$  #",
+                              "#  @   #",
+                              "########")
+    assert check(level, box_set, 3, 2) == (False, False)
+
+
+def test_two_by_two_block_of_boxes():
+    level, box_set = boxes_of("#########",
+                              "#.      #",
+                              "#  $$   #",
+                              "#  $$  .#",
+                              "#  @  ..#",
+                              "#########")
+    assert check(level, box_set, 4, 3) == (True, True)
+
+
+def test_l_shape_is_not_a_block():
+    level, box_set = boxes_of("#########",
+                              "#.      #",
+                              "#  $$   #",
+                              "#  $   .#",
+                              "#  @   .#",
+                              "#########")
+    assert check(level, box_set, 3, 2) == (False, False)
+
+
+def test_freeze_chain_through_other_boxes():
+    # Box (2, 2) bị chặn theo trục dọc bởi box phía trên đã đóng băng vào tường, chỉ là deadlock
+    # khi trục ngang cũng bị chặn
+    level, box_set = boxes_of("#######",
+                              "#.$$ .#",
+                              "# $   #",
+                              "#  @ .#",
+                              "#######")
+    assert level.deadlocks.is_freeze_deadlock(box_set, level.index(2, 2)) is False
+    level, box_set = boxes_of("#######",
+                              "#.$$$.#",
+                              "##$#  #",
+                              "#  @ .#",
+                              "#######")
+    assert level.deadlocks.is_freeze_deadlock(box_set, level.index(2, 2)) is True
@@ -0,0 +1,109 @@
+"""HeuristicEngine: Hungarian so với vét cạn trên ma trận chi phí nhỏ, h tăng dần so với tính lại từ đầu"""
+import random
+from itertools import permutations
+from types import SimpleNamespace
+
+import pytest
+
+from sokoban_solver import HEURISTIC_METHODS, INFINITE_COST, HeuristicEngine, LevelMap
+from sokoban_solver.macros import MACRO
+
+from conftest import make_level
+
+INF = INFINITE_COST
+
+
+def assign(costs):
+    """Chạy Hungarian trên ma trận box x dock costs (box thứ i ở "ô" i)"""
+    engine = HeuristicEngine.__new__(HeuristicEngine)
+    engine.costs = costs
+    engine.level = SimpleNamespace(dock_cells=range(len(costs[0]) if costs else 0))
+    return engine.min_cost_assignment(range(len(costs)))
+
+
+def brute_force(costs):
+    best = min((sum(row[dock] for row, dock in zip(costs, docks)) for docks in
+                permutations(range(len(costs[0])), len(costs))), default=INF)
+    return best if best < INF else INF
+
+
+def check(costs):
+    total, assignment = assign(costs)
+    expected = brute_force(costs)
+    assert total == expected
+    if expected >= INF:
+        assert assignment is None
+    else:
+        assert len(set(assignment)) == len(costs)
+        assert sum(row[dock] for row, dock in zip(costs, assignment)) == total
+    return total
+
+
+def test_square_matrix():
+    assert check([[4, 1, 3], [2, 0, 5], [3, 2, 2]]) == 5
+
+
+def test_spare_docks():
+    assert check([[7, 3, 9, 1], [2, 8, 1, 6]]) == 2
+    assert check([[5, 5, 0]]) == 0
+
+
+def test_infinite_entries_are_avoided():
+    assert check([[INF, 4, INF], [1, 2, INF], [INF, INF, 3]]) == 8
+
+
+@pytest.mark.parametrize("costs", [
+    [[1, 2], [INF, INF]],             # một box không tới được dock nào
+    [[1, INF, INF], [2, INF, INF]],   # hai box chỉ tới được cùng một dock
+    [[1], [2]],                       # nhiều box hơn dock
+])
+def test_unassignable_boxes(costs):
+    assert assign(costs) == (INF, None)
+
+
+def test_no_boxes():
+    assert assign([]) == (0, [])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_matrices_match_brute_force(seed):
+    generator = random.Random(seed)
+    n = generator.randint(1, 5)
+    m = generator.randint(n, 6)
+    costs = [[INF if generator.random() < 0.3 else generator.randint(0, 9) for _ in range(m)] for _ in range(n)]
+    check(costs)
+
+
+# Hai box, đường hầm (4..6, 3) dẫn vào phòng đích bên phải: có cả macro đường hầm lẫn macro phòng đích
+TUNNEL_ROOM = make_level("###########",
+                         "#   #######",
+                         "# $ ###   #",
+                         "# @$     .#",
+                         "#   ###  .#",
+                         "#   #######",
+                         "###########")
+
+
+@pytest.mark.parametrize("method", HEURISTIC_METHODS)
+@pytest.mark.parametrize("number", [None, 2, 6, 17])
+def test_incremental_update_matches_full_evaluation(microcosmos, method, number):
+    """Đi ngẫu nhiên theo nước đẩy đơn và macro, h cập nhật tăng dần phải bằng evaluate() của tập box mới"""
+    matrix = TUNNEL_ROOM if number is None else microcosmos[number - 1]
+    level = LevelMap(matrix, macros=True)
+    engine = HeuristicEngine(level, method)
+    generator = random.Random(number or 0)
+    macros = 0
+    for _ in range(20):
+        state = level.normalize(level.initial_state)
+        h, info = engine.initial(state.boxes)
+        for _ in range(30):
+            successors = level.macros.successors(state)
+            if not successors or h >= INF:
+                break
+            action, succ_state = generator.choice(successors)
+            macros += action[1] >= MACRO
+            h, info = engine.update(state.boxes, h, info, level.pushed_box(state, action, succ_state),
+                                    succ_state.boxes)
+            assert h == engine.evaluate(succ_state.boxes)
+            state = succ_state
+    assert number is not None or macros > 0
@@ -0,0 +1,81 @@
+"""Nước đẩy gộp qua đường hầm và vào phòng đích (MacroPlanner, --macros)"""
+import pytest
+
+from sokoban_solver import LevelMap, solve_astar, solve_bfs
+from sokoban_solver.analysis import analyze
+from sokoban_solver.macros import MACRO, ROOM_MACRO
+
+from conftest import assert_solves, make_level, push_count
+
+# Đường hầm ngang (4..6, 2) dẫn vào phòng đích bên phải, lối vào duy nhất của phòng là (6, 2) -> (7, 2)
+TWO_ROOMS = make_level("###########",
+                       "#   ###   #",
+                       "# @$     .#",
+                       "#   ###   #",
+                       "###########")
+# Phòng dưới có dock, lối vào duy nhất từ đường hầm dọc (4, 3..4), box đang ở đầu đường hầm
+VERTICAL = make_level("  #####",
+                      "  #   #",
+                      "  # @ #",
+                      "####$##",
+                      "#### ##",
+                      "#     #",
+                      "# .   #",
+                      "#     #",
+                      "#######")
+
+
+def test_goal_room_entrances():
+    analysis = analyze(TWO_ROOMS)
+    right = analysis.room_of[analysis.cell_of(9, 2)]
+    assert analysis.goal_room_entrances == {(analysis.cell_of(6, 2), 1): right}
+    vertical = analyze(VERTICAL)
+    lower = vertical.room_of[vertical.cell_of(2, 6)]
+    assert vertical.goal_room_entrances == {(vertical.cell_of(4, 4), 3): lower}
+
+
+def test_tunnel_macro_replaces_the_single_push_and_room_macro_is_added():
+    level = LevelMap(TWO_ROOMS, macros=True)
+    state = level.normalize(level.initial_state)
+    box = level.index(3, 2)
+    successors = dict(level.macros.successors(state))
+    assert (box, 1) not in successors
+    # Macro đường hầm dừng ở ô cuối của đường hầm
+    assert successors[(box, MACRO + 1)].boxes == (level.index(6, 2),)
+    # Macro phòng đích đưa box thẳng tới dock, nằm bên cạnh macro đường hầm
+    assert successors[(box, ROOM_MACRO + 1)].boxes == (level.index(9, 2),)
+    assert level.macros.cost(state, (box, ROOM_MACRO + 1)) == 6
+
+
+def test_room_macro_is_skipped_when_a_box_in_the_room_is_off_dock():
+    rows = [row[:] for row in TWO_ROOMS]
+    rows[1][8] = '$'
+    rows[1][9] = '.'
+    level = LevelMap(rows, macros=True)
+    state = level.normalize(level.initial_state)
+    actions = [action for action, _ in level.macros.successors(state)]
+    assert all(d < ROOM_MACRO for _, d in actions)
+
+
+@pytest.mark.parametrize("matrix", [TWO_ROOMS, VERTICAL], ids=["horizontal", "vertical"])
+@pytest.mark.parametrize("solver", [solve_bfs, solve_astar])
+def test_macro_solutions_expand_to_single_moves(matrix, solver):
+    solution_path, stats = solver(matrix, macros=True)
+    assert stats["macros"] is True
+    assert_solves(matrix, solution_path)
+
+
+@pytest.mark.parametrize("number", [2, 6, 17])
+def test_macros_keep_levels_solvable(microcosmos, number):
+    matrix = microcosmos[number - 1]
+    optimal, _ = solve_astar(matrix)
+    solution_path, stats = solve_astar(matrix, macros=True)
+    assert stats["status"] == "solved"
+    assert_solves(matrix, solution_path)
+    assert push_count(matrix, solution_path) >= push_count(matrix, optimal)
+
+
+def test_macros_are_ignored_in_move_mode():
+    solution_path, stats = solve_bfs(TWO_ROOMS, "move", macros=True)
+    assert "macros" not in stats
+    assert_solves(TWO_ROOMS, solution_path)
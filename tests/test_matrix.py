@@ -0,0 +1,23 @@
+"""Chuỗi LURD của lời giải: chữ hoa đúng ở các bước đẩy box, đổi qua lại với list bước đi"""
+from sokoban_solver import lurd_to_moves, moves_to_lurd, solve_astar
+
+from conftest import make_level, push_count
+
+
+def test_pushes_are_upper_case():
+    matrix = make_level("#######",
+                        "#@ $ .#",
+                        "# *.  #",
+                        "#######")
+    assert moves_to_lurd(matrix, lurd_to_moves("rrrl")) == "rRRl"
+    # Box trên dock ('*') cũng là nước đẩy, box đã bị đẩy đi thì ô cũ chỉ còn là sàn
+    assert moves_to_lurd(matrix, lurd_to_moves("drlr")) == "dRlr"
+    assert moves_to_lurd(matrix, []) == ""
+
+
+def test_solution_round_trip(microcosmos):
+    matrix = microcosmos[1]
+    solution_path, _ = solve_astar(matrix)
+    lurd = moves_to_lurd(matrix, solution_path)
+    assert lurd_to_moves(lurd) == [tuple(move) for move in solution_path]
+    assert sum(letter.isupper() for letter in lurd) == push_count(matrix, solution_path)
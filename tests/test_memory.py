@@ -0,0 +1,47 @@
+"""MemoryMonitor: RSS đỉnh, kích thước từng cấu trúc trong stats và thread lấy mẫu dừng sau khi giải"""
+import threading
+
+import pytest
+
+from sokoban_solver import solve
+from sokoban_solver.memory import MemoryMonitor, estimate_size_mb
+
+
+def new_threads(before):
+    return [thread for thread in threading.enumerate() if thread not in before]
+
+
+@pytest.mark.parametrize("algorithm, structures", [("bfs", {"frontier", "closed", "tree"}),
+                                                   ("astar", {"frontier", "closed", "tree", "heuristic"})])
+def test_stats_report_peak_rss_and_structures(microcosmos, algorithm, structures):
+    _, stats = solve(microcosmos[3], algorithm)
+    assert stats["peak_rss"] >= 0
+    assert stats["memory"] >= 0
+    assert set(stats["structures"]) == structures
+    assert all(size > 0 for size in stats["structures"].values())
+
+
+def test_sampler_thread_is_stopped_after_the_solve(microcosmos):
+    before = set(threading.enumerate())
+    solve(microcosmos[3], "astar")
+    for thread in new_threads(before):
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+
+
+def test_monitor_samples_in_the_background_until_stopped():
+    before = set(threading.enumerate())
+    monitor = MemoryMonitor(interval=0.001)
+    (sampler,) = new_threads(before)
+    assert sampler.daemon
+    assert monitor.stats()["peak_rss"] >= monitor.start_memory
+    monitor.stop()
+    sampler.join(timeout=1)
+    assert not sampler.is_alive()
+
+
+def test_shared_objects_are_counted_once():
+    items = [(index, str(index)) for index in range(1000)]
+    single = estimate_size_mb(items)
+    assert single > 0
+    assert estimate_size_mb(items, items) == single
@@ -0,0 +1,33 @@
+"""SearchProfiler: stats["profile"] có đủ các pha và bộ đếm đã ghi trong README, và chỉ có khi bật profile"""
+import pytest
+
+from sokoban_solver import solve
+
+PHASES = {"successors", "reachable", "deadlock", "goal_test", "path"}
+COUNTERS = {"generated", "deadlock_pruned", "duplicates"}
+
+
+@pytest.mark.parametrize("algorithm, phases, counters", [
+    ("bfs", PHASES, COUNTERS),
+    ("astar", PHASES | {"heuristic"}, COUNTERS | {"heuristic_pruned", "reopened"}),
+])
+def test_profile_reports_phases_and_counters(microcosmos, algorithm, phases, counters):
+    solution_path, stats = solve(microcosmos[3], algorithm, profile=True)
+    assert solution_path is not None
+    profile = stats["profile"]
+    assert set(profile["phases"]) == phases
+    assert set(profile["counters"]) == counters
+    for phase in profile["phases"].values():
+        assert phase["calls"] > 0
+        assert phase["time"] >= 0
+    counts = profile["counters"]
+    assert counts["generated"] >= stats["nodes"]
+    assert 0 <= counts["duplicates"] <= counts["generated"]
+    # Node đích được đếm nhưng không sinh successor
+    assert profile["phases"]["successors"]["calls"] == stats["nodes"] - 1
+    assert profile["phases"]["path"]["calls"] == 1
+
+
+def test_profile_is_off_by_default(microcosmos):
+    _, stats = solve(microcosmos[3], "astar")
+    assert "profile" not in stats
@@ -0,0 +1,65 @@
+"""SolutionReplay: tiến/lùi/nhảy bằng delta và keyframe cho cùng ma trận như đi lại từ đầu"""
+import random
+
+import pytest
+
+from sokoban_solver import SolutionReplay, apply_move, find_player, solve_astar
+
+from conftest import make_level
+
+
+@pytest.fixture(scope="module")
+def solution(microcosmos):
+    matrix = microcosmos[1]
+    solution_path, _ = solve_astar(matrix)
+    # Trạng thái sau từng bước, tính bằng apply_move
+    history = [matrix]
+    player = find_player(matrix)
+    for move in solution_path:
+        next_matrix, player = apply_move(history[-1], player, move)
+        history.append(next_matrix)
+    return matrix, solution_path, history
+
+
+def test_step_forward_and_backward(solution):
+    matrix, moves, history = solution
+    replay = SolutionReplay(matrix, moves)
+    assert len(replay) == len(moves)
+    for step in range(1, len(moves) + 1):
+        assert replay.step_forward()
+        assert replay.matrix == history[step]
+    assert not replay.step_forward()
+    for step in range(len(moves) - 1, -1, -1):
+        assert replay.step_backward()
+        assert replay.matrix == history[step]
+    assert not replay.step_backward()
+
+
+@pytest.mark.parametrize("interval", [1, 7, 64])
+def test_random_seeks_match_history(solution, interval):
+    matrix, moves, history = solution
+    replay = SolutionReplay(matrix, moves, keyframe_interval=interval)
+    generator = random.Random(interval)
+    for _ in range(200):
+        step = generator.randint(-5, len(moves) + 5)
+        replay.seek(step)
+        step = max(0, min(step, len(moves)))
+        assert replay.index == step
+        assert replay.matrix == history[step]
+        assert replay.player_pos == find_player(history[step])
+
+
+def test_keyframes(solution):
+    matrix, moves, _ = solution
+    replay = SolutionReplay(matrix, moves, keyframe_interval=10)
+    assert len(replay.keyframes) == len(moves) // 10 + 1
+
+
+def test_invalid_moves_are_rejected():
+    matrix = make_level("#####", "#@$.#", "#####")
+    with pytest.raises(ValueError):
+        SolutionReplay(matrix, [(-1, 0)])
+    with pytest.raises(ValueError):
+        SolutionReplay(matrix, [(1, 0), (1, 0)])
+    with pytest.raises(ValueError):
+        SolutionReplay(matrix, [(2, 0)])
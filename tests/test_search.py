@@ -0,0 +1,96 @@
+"""Mọi thuật toán trả về lời giải hợp lệ, cùng số nước đẩy tối ưu, và xử lý đúng các level đặc biệt"""
+import pytest
+
+from sokoban_solver import ALGORITHMS, solve, solve_anytime, solve_astar, solve_bfs
+
+from conftest import assert_solves, make_level, push_count
+
+# Level nhỏ của MicroCosmos (đánh số từ 1) mà mọi thuật toán giải nhanh
+LEVELS = (1, 4, 13)
+
+SOLVED = make_level("#####",
+                    "#@* #",
+                    "#####")
+UNSOLVABLE = make_level("######",
+                        "#@ $.#",
+                        "#   ##",
+                        "#$  .#",
+                        "######")
+MORE_BOXES_THAN_DOCKS = make_level("######",
+                                   "#@$$.#",
+                                   "######")
+MORE_DOCKS_THAN_BOXES = make_level("######",
+                                   "#@$..#",
+                                   "######")
+
+
+def run(matrix, algorithm, mode="push"):
+    return solve(matrix, algorithm, mode, time_limit=60, workers=2)
+
+
+@pytest.fixture(scope="module")
+def astar_pushes(microcosmos):
+    pushes = {}
+    for number in LEVELS:
+        matrix = microcosmos[number - 1]
+        solution_path, stats = solve_astar(matrix)
+        assert stats["status"] == "solved"
+        pushes[number] = push_count(matrix, solution_path)
+    return pushes
+
+
+# Mọi thuật toán đều tối ưu theo số nước đẩy ở chế độ "push" (anytime chạy tới vòng trọng số 1)
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("number", LEVELS)
+def test_algorithms_match_astar_push_count(microcosmos, astar_pushes, algorithm, number):
+    matrix = microcosmos[number - 1]
+    solution_path, stats = run(matrix, algorithm)
+    assert stats["status"] == "solved"
+    assert_solves(matrix, solution_path)
+    assert push_count(matrix, solution_path) == astar_pushes[number]
+
+
+@pytest.mark.parametrize("number", LEVELS[:2])
+def test_move_mode_bfs_and_astar_agree_on_steps(microcosmos, number):
+    matrix = microcosmos[number - 1]
+    bfs_path, _ = solve_bfs(matrix, "move")
+    astar_path, _ = solve_astar(matrix, "move")
+    assert_solves(matrix, bfs_path)
+    assert_solves(matrix, astar_path)
+    assert len(bfs_path) == len(astar_path)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_already_solved_level_returns_empty_solution(algorithm):
+    solution_path, stats = run(SOLVED, algorithm)
+    assert solution_path == []
+    assert stats["status"] == "solved"
+
+
+def test_anytime_already_solved_yields_a_solution():
+    solution_path, stats = solve_anytime(SOLVED)
+    assert solution_path == []
+    assert stats["bound"] == 1.0
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("matrix", [UNSOLVABLE, MORE_BOXES_THAN_DOCKS], ids=["unsolvable", "more_boxes"])
+def test_no_solution(algorithm, matrix):
+    solution_path, stats = run(matrix, algorithm)
+    assert solution_path is None
+    assert stats["status"] == "no_solution"
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_spare_docks_are_allowed(algorithm):
+    solution_path, stats = run(MORE_DOCKS_THAN_BOXES, algorithm)
+    assert stats["status"] == "solved"
+    assert_solves(MORE_DOCKS_THAN_BOXES, solution_path)
+    assert push_count(MORE_DOCKS_THAN_BOXES, solution_path) == 1
+
+
+def test_unknown_algorithm_and_mode():
+    with pytest.raises(ValueError):
+        solve(SOLVED, "dfs")
+    with pytest.raises(ValueError):
+        solve_bfs(SOLVED, "walk")
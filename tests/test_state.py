@@ -0,0 +1,64 @@
+"""StateTable: trạng thái khác nhau trùng khóa Zobrist không bị gộp nhầm khi exact=True"""
+import pytest
+
+from sokoban_solver import SearchState, StateTable, ZobristTable, solve_astar, solve_bfs
+from sokoban_solver import level as level_module
+
+
+def colliding_states():
+    """Ba trạng thái khác nhau cùng khóa 42"""
+    return SearchState((1, 2), 5, 0, 42), SearchState((1, 3), 5, 0, 42), SearchState((1, 2), 6, 0, 42)
+
+
+def test_exact_table_keeps_colliding_states_apart():
+    first, second, third = colliding_states()
+    table = StateTable(exact=True)
+    assert table.add(first)
+    assert table.add(second)
+    assert not table.add(second)
+    assert len(table) == 2
+    assert first in table and second in table
+    assert third not in table
+    assert table.get(third, "missing") == "missing"
+
+
+def test_lookup_and_update_of_the_overflow_entry():
+    first, second, third = colliding_states()
+    table = StateTable(exact=True)
+    table.set(first, 7)
+    table.set(second, 5)
+    assert table.overflow == {(second.boxes, second.player): 5}
+    table.set(second, 3)
+    table.set(third, 9)
+    assert table.get(first) == 7
+    assert table.get(second) == 3
+    assert table.get(third) == 9
+    assert len(table) == 3
+
+
+def test_keyed_table_merges_colliding_states():
+    first, second, _ = colliding_states()
+    table = StateTable()
+    assert table.add(first)
+    assert not table.add(second)
+    assert len(table) == 1
+
+
+class ZeroZobrist(ZobristTable):
+    """Mọi trạng thái có cùng khóa 0"""
+
+    def __init__(self, size, seed=0):
+        super().__init__(size, seed)
+        self.box_keys = [0] * size
+        self.player_keys = [0] * size
+
+
+@pytest.mark.parametrize("solver", [solve_bfs, solve_astar])
+@pytest.mark.parametrize("mode", ["push", "move"])
+def test_exact_search_survives_all_keys_colliding(microcosmos, monkeypatch, solver, mode):
+    matrix = microcosmos[0]
+    expected, _ = solver(matrix, mode)
+    monkeypatch.setattr(level_module, "ZobristTable", ZeroZobrist)
+    solution_path, stats = solver(matrix, mode, exact=True)
+    assert stats["status"] == "solved"
+    assert len(solution_path) == len(expected)